@@ -0,0 +1,93 @@
+import datetime
+import random
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from events import dedup
+from events.ingestion import ingest_tournament_rows
+from events.models import Tournament
+
+pytestmark = [pytest.mark.django_db, pytest.mark.benchmark(group="events")]
+
+
+@pytest.mark.parametrize("url_name", ["tournaments-list", "exhibitions-list"])
+def test_event_list(measure, dataset, client, url_name):
+    client.force_login(
+        get_user_model().objects.create_user(
+            email="benchmark@example.com", password="12345"
+        )
+    )
+    url = reverse(f"events:{url_name}")
+
+    def render():
+        assert client.get(url).status_code == 200
+
+    measure(render)
+
+
+@pytest.mark.parametrize("rows", [50, 500])
+def test_tournament_listing_ingestion(measure, dataset, rows):
+    association = dataset.associations[0]
+    start = timezone.now().date()
+    listing = [
+        {
+            "Sanction Number": f"INGEST-{number}",
+            "Tournament Name": f"Ingestion Classic {number}",
+            "Centre": "Arena",
+            "Divisions": "U11, U13",
+            "Start Date": start,
+            "End Date": start + timezone.timedelta(days=2),
+        }
+        for number in range(rows)
+    ]
+
+    def clear():
+        Tournament.objects.filter(sanction_number__startswith="INGEST-").delete()
+
+    # Every round ingests a listing that is entirely new.
+    measure(ingest_tournament_rows, association, listing, setup=clear)
+
+
+@pytest.mark.parametrize("query", ["classic", "tor cla", "BM0"])
+def test_tournament_search(measure, dataset, query):
+    measure(
+        lambda: list(
+            Tournament.objects.search(query).order_by("-search_rank", "pk")[:25]
+        )
+    )
+
+
+def test_find_duplicate_tournaments(measure, dataset):
+    measure(lambda: dedup.find_duplicates(dedup.load_candidates()))
+
+
+@pytest.mark.parametrize("count", [10_000, 100_000])
+def test_find_duplicates_in_bulk(measure, count):
+    generator = random.Random(count)
+    words = [
+        "Spring",
+        "Classic",
+        "Cup",
+        "Winter",
+        "Blizzard",
+        "Memorial",
+        "Invitational",
+    ]
+    towns = ["North Bay", "Sudbury", "Barrie", "Oshawa", "Kingston", "Sarnia"]
+    start = datetime.date(2022, 9, 1)
+    candidates = [
+        dedup.Candidate(
+            number,
+            generator.randrange(30),
+            start + datetime.timedelta(days=generator.randrange(1000)),
+            f"{generator.choice(towns)} {' '.join(generator.sample(words, 2))}",
+            generator.choice(towns),
+            generator.choice(["", f"S-{number}"]),
+        )
+        for number in range(count)
+    ]
+
+    measure(dedup.find_duplicates, candidates)
@@ -0,0 +1,52 @@
+import pytest
+
+from core.perms import has_perm, permission_matrix_cache
+from team.helpers import permissable_teams
+from team.models import Staff
+
+pytestmark = [pytest.mark.django_db, pytest.mark.benchmark(group="permissions")]
+
+
+@pytest.fixture
+def vp(dataset):
+    """Staff assigned to a League, the widest scope generated."""
+    return (
+        Staff.objects.filter(
+            season=dataset.season_objects[-1],
+            league__isnull=False,
+            division__isnull=True,
+            subdivision__isnull=True,
+            team__isnull=True,
+        )
+        .select_related("user")
+        .first()
+    )
+
+
+def test_has_perm(measure, dataset, vp):
+    teams = [team for team in dataset.team_objects if team.season_id == vp.season_id]
+
+    def check():
+        for team in teams:
+            has_perm(vp.user, team, "team_can_edit")
+
+    measure(check)
+
+
+def test_has_perm_cached(measure, dataset, vp):
+    teams = [team for team in dataset.team_objects if team.season_id == vp.season_id]
+
+    def check():
+        with permission_matrix_cache():
+            for team in teams:
+                has_perm(vp.user, team, "team_can_edit")
+
+    measure(check)
+
+
+def test_permissable_teams(measure, vp):
+    measure(lambda: list(permissable_teams(vp.user, season=vp.season)))
+
+
+def test_permissable_teams_ids_only(measure, vp):
+    measure(lambda: list(permissable_teams(vp.user, season=vp.season, ids_only=True)))
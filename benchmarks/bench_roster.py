@@ -0,0 +1,24 @@
+import pytest
+
+from team.models import Player, Staff, Team
+
+pytestmark = [pytest.mark.django_db, pytest.mark.benchmark(group="roster")]
+
+
+@pytest.fixture
+def team(dataset):
+    return Team.objects.get(pk=dataset.team_objects[-1].pk)
+
+
+def test_team_save(measure, team):
+    measure(team.save)
+
+
+def test_player_save(measure, team):
+    player = Player.objects.filter(team=team).first()
+    measure(player.save)
+
+
+def test_staff_save(measure, team):
+    staff = Staff.objects.filter(team=team).first()
+    measure(staff.save)
@@ -0,0 +1,123 @@
+"""Parsing throughput of the association profiles, without network access.
+
+Listings are replayed from events.replay recordings. Synthetic listings of
+every enabled profile are always measured; pages recorded from the live
+sites with `manage.py get_tournament_listing --record` are measured as well
+when their directory is given with --listing-recordings.
+"""
+
+import datetime
+from pathlib import Path
+
+import pytest
+
+from events import scraping
+from events.association_profiles import get_profile
+from events.models import Association
+from events.replay import Recordings, ReplayBrowser, ReplaySession
+
+pytestmark = pytest.mark.benchmark(group="scrapers")
+
+PROFILES = ["GTHL", "NOHA", "OMHA"]
+
+LISTING_URL = "https://example.com/tournaments/List.aspx"
+
+
+def pytest_generate_tests(metafunc):
+    if "recorded" in metafunc.fixturenames:
+        directory = metafunc.config.getoption("listing_recordings")
+        recorded = []
+        if directory:
+            recorded = sorted(
+                path.parent for path in Path(directory).glob("*/association.json")
+            )
+        metafunc.parametrize("recorded", recorded, ids=[path.name for path in recorded])
+
+
+def _synthetic_listing(profile, rows):
+    start = datetime.date(2022, 1, 7)
+    header = "".join(f"<th>{column}</th>" for column in profile.COLUMNS)
+    body = []
+    for number in range(rows):
+        values = {
+            "Sanction Number": f"{profile.name}-{number}",
+            "Start Date": (start + datetime.timedelta(days=number)).strftime(
+                "%d-%b-%Y"
+            ),
+            "End Date": (start + datetime.timedelta(days=number + 2)).strftime(
+                "%d-%b-%Y"
+            ),
+        }
+        cells = "".join(
+            f"<td>{values.get(column, f'{column} {number}')}</td>"
+            for column in profile.COLUMNS
+        )
+        body.append(f"<tr>{cells}</tr>")
+
+    return (
+        f'<html><body><table class="{profile.TABLE_CLASS}"><tbody>'
+        f"<tr>{header}</tr>{''.join(body)}</tbody></table></body></html>"
+    )
+
+
+@pytest.fixture(params=[(name, rows) for name in PROFILES for rows in (50, 500)])
+def synthetic(request, tmp_path):
+    """Records a synthetic listing of rows tournaments for a profile.
+
+    Returns:
+        (profile, association, recordings)
+    """
+    name, rows = request.param
+    profile = get_profile(name)
+    association = Association(name=name, tournament_listing_url=LISTING_URL)
+    recordings = Recordings(tmp_path / name)
+
+    form = (
+        '<html><body><form method="post" action="List.aspx">'
+        '<input type="hidden" name="__VIEWSTATE" value="state" />'
+        f'<input type="submit" name="{profile.BUTTON}" value="List" />'
+        "</form></body></html>"
+    )
+    recordings.save("GET", LISTING_URL, form)
+    method, url, data = scraping.form_request(form, LISTING_URL, profile.BUTTON)
+    recordings.save(method, url, _synthetic_listing(profile, rows), data)
+
+    return profile, association, recordings
+
+
+def _scan(profile, association, recordings):
+    browser = ReplayBrowser(recordings)
+    browser.load_url(association.tournament_listing_url)
+    return profile.scan(browser, association)
+
+
+def _fetch(profile, association, recordings):
+    return profile.fetch(ReplaySession(recordings), association)
+
+
+def test_parse(benchmark, synthetic):
+    profile, association, recordings = synthetic
+    method, url, data = scraping.form_request(
+        recordings.load("GET", LISTING_URL)[1], LISTING_URL, profile.BUTTON
+    )
+    html = recordings.load(method, url, data)[1]
+
+    assert benchmark(profile.parse, html, association)
+
+
+def test_fetch(benchmark, synthetic):
+    assert benchmark(_fetch, *synthetic)
+
+
+def test_scan(benchmark, synthetic):
+    pytest.importorskip("selenium")
+    assert benchmark(_scan, *synthetic)
+
+
+def test_recorded_scan(benchmark, recorded):
+    pytest.importorskip("selenium")
+    recordings = Recordings(recorded)
+    association = recordings.load_association()
+    profile = get_profile(association.name)
+
+    assert benchmark(_scan, profile, association, recordings) is not None
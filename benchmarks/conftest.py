@@ -0,0 +1,207 @@
+"""Fixtures shared by the benchmarks.
+
+Wall times are measured by pytest-benchmark, which stores runs and compares
+them against a saved one, see --benchmark-save and --benchmark-compare-fail.
+
+Query counts do not vary between runs, so they are compared exactly against
+query_baseline.json instead of through a percentage.
+
+Both baselines are committed, a run fails when the one it compares against
+is missing rather than comparing against nothing.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.benchmark_data import BenchmarkDataGenerator
+from core.caches import current_season_cache, lookup_cache
+from core.perms import clear_permission_matrix_cache
+
+# BenchmarkDataGenerator arguments of each dataset the hot paths are measured at.
+DATASETS = {
+    "small": dict(
+        leagues_per_season=1,
+        divisions_per_league=2,
+        subdivisions_per_division=2,
+        teams_per_subdivision=2,
+        players_per_team=10,
+        tournaments=20,
+        exhibitions=20,
+    ),
+    "medium": dict(tournaments=200, exhibitions=200),
+    "large": dict(
+        seasons=2,
+        leagues_per_season=4,
+        divisions_per_league=6,
+        subdivisions_per_division=4,
+        teams_per_subdivision=6,
+        players_per_team=18,
+        tournaments=2000,
+        exhibitions=2000,
+    ),
+}
+
+QUERY_BASELINE = Path(__file__).parent / "query_baseline.json"
+
+query_counts_key = pytest.StashKey[dict]()
+query_regressions_key = pytest.StashKey[list]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("sportsnet benchmarks")
+    group.addoption(
+        "--query-baseline",
+        type=Path,
+        default=QUERY_BASELINE,
+        help="Query counts to compare against, defaults to %(default)s.",
+    )
+    group.addoption(
+        "--save-query-baseline",
+        action="store_true",
+        help="Write the query counts of this run to --query-baseline.",
+    )
+    group.addoption(
+        "--listing-recordings",
+        type=Path,
+        default=None,
+        help="Directory of tournament listings recorded with "
+        "get_tournament_listing --record, parsed by bench_scrapers.py.",
+    )
+
+
+def pytest_configure(config):
+    config.stash[query_counts_key] = {}
+    config.stash[query_regressions_key] = []
+
+
+def pytest_sessionstart(session):
+    config = session.config
+
+    path = config.getoption("query_baseline")
+    if not config.getoption("save_query_baseline") and not path.exists():
+        raise pytest.UsageError(
+            f"No query baseline found at {path}, record one with "
+            "--save-query-baseline and commit it."
+        )
+
+    compare = config.getoption("benchmark_compare", None)
+    if compare:
+        storage = config._benchmarksession.storage
+        if not list(storage.load(*([] if compare is True else [compare]))):
+            raise pytest.UsageError(
+                f"No saved benchmark run to compare against in {storage}, record "
+                "one with --benchmark-save=baseline and commit it."
+            )
+
+
+def clear_caches():
+    current_season_cache.clear()
+    lookup_cache.clear()
+    clear_permission_matrix_cache()
+
+
+@pytest.fixture(scope="module", params=list(DATASETS))
+def dataset(request, django_db_setup, django_db_blocker):
+    """Generates and commits a dataset once per module and size, the database
+    is flushed afterwards.
+
+    The data is committed as in production: the caches of core/caches.py do
+    not store what a transaction with uncommitted changes to their models
+    reads, a dataset left uncommitted would only measure their misses. Each
+    benchmark still runs in a transaction of its own, rolled back after it.
+
+    Returns:
+        The BenchmarkDataGenerator, see its *_objects attributes.
+    """
+    with django_db_blocker.unblock():
+        clear_caches()
+        generator = BenchmarkDataGenerator(**DATASETS[request.param])
+        generator.generate()
+        try:
+            yield generator
+        finally:
+            # flush sends no post_delete for core/signals.py to act on.
+            call_command("flush", interactive=False, verbosity=0)
+            clear_caches()
+
+
+@pytest.fixture
+def measure(benchmark, request):
+    """Benchmarks a callable and records the number of queries a single call makes.
+
+    Args:
+        setup: Called before every round, for callables that can only run
+            once against the same data. Rounds then default to 5.
+
+    Usage:
+        def test_something(measure):
+            measure(function, *args, **kwargs)
+    """
+
+    def run(function, *args, setup=None, **kwargs):
+        if setup:
+            setup()
+        with CaptureQueriesContext(connection) as queries:
+            function(*args, **kwargs)
+
+        benchmark.extra_info["queries"] = len(queries)
+        request.config.stash[query_counts_key][request.node.nodeid] = len(queries)
+
+        if setup:
+            return benchmark.pedantic(
+                function, args=args, kwargs=kwargs, setup=setup, rounds=5
+            )
+        return benchmark(function, *args, **kwargs)
+
+    return run
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    counts = config.stash[query_counts_key]
+    if not counts:
+        return
+
+    path = config.getoption("query_baseline")
+    if config.getoption("save_query_baseline"):
+        baseline = json.loads(path.read_text()) if path.exists() else {}
+        baseline.update(counts)
+        path.write_text(json.dumps(baseline, indent=4, sort_keys=True) + "\n")
+        return
+
+    baseline = json.loads(path.read_text())
+    regressions = config.stash[query_regressions_key]
+    for nodeid, queries in sorted(counts.items()):
+        if nodeid in baseline and queries > baseline[nodeid]:
+            regressions.append((nodeid, baseline[nodeid], queries))
+
+    if regressions:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    counts = config.stash[query_counts_key]
+    if not counts:
+        return
+
+    path = config.getoption("query_baseline")
+    baseline = json.loads(path.read_text()) if path.exists() else {}
+
+    terminalreporter.section("query counts")
+    for nodeid, queries in sorted(counts.items()):
+        previous = baseline.get(nodeid)
+        if previous is None:
+            change = "new"
+        else:
+            change = f"{queries - previous:+d}"
+        terminalreporter.write_line(f"{nodeid}: {queries} ({change})")
+
+    for nodeid, previous, queries in config.stash[query_regressions_key]:
+        terminalreporter.write_line(
+            f"REGRESSION {nodeid}: {queries} queries, baseline {previous}", red=True
+        )
@@ -4,5 +4,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     name = "core"
 
-    # def ready(self):
-    #     from . import signals  # noqa
+    def ready(self):
+        from . import ordering, signals  # noqa
+
+        ordering.install()
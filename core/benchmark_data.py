@@ -0,0 +1,441 @@
+import itertools
+import random
+
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.translation import gettext
+
+from .ordering import suspend_position_fields
+
+# fmt: off
+FIRST_NAMES = [
+    "Liam", "Noah", "Oliver", "Lucas", "Ethan", "Mason", "Logan", "Owen",
+    "Emma", "Olivia", "Ava", "Charlotte", "Amelia", "Sophia", "Chloe", "Ella",
+]
+LAST_NAMES = [
+    "Smith", "Brown", "Tremblay", "Martin", "Roy", "Wilson", "MacDonald",
+    "Gagnon", "Johnson", "Taylor", "Campbell", "Anderson", "Leblanc", "Lee",
+]
+TEAM_NAMES = [
+    "Hawks", "Wolves", "Bears", "Flyers", "Knights", "Storm", "Rebels",
+    "Lions", "Kings", "Blades", "Raiders", "Titans", "Sabres", "Comets",
+]
+CITIES = [
+    "Toronto", "Ottawa", "Hamilton", "London", "Barrie", "Kingston",
+    "Guelph", "Sudbury", "Oshawa", "Windsor", "Waterloo", "Peterborough",
+]
+# fmt: on
+
+
+def _lookup(app_label, model_name, name, **defaults):
+    model = apps.get_model(app_label, model_name)
+    return model.objects.get_or_create(
+        name__iexact=name, defaults={"name": name, **defaults}
+    )[0]
+
+
+class BenchmarkDataGenerator:
+    """Builds a synthetic hierarchy with members, staff, players, documents
+    and events, sized by the constructor arguments.
+
+    Every table is written with bulk_create, the same seed always produces the
+    same names, dates and assignments. New seasons are added after the
+    latest existing one so the generator can be run against a non empty
+    database.
+    """
+
+    def __init__(
+        self,
+        seasons=1,
+        leagues_per_season=2,
+        divisions_per_league=4,
+        subdivisions_per_division=2,
+        teams_per_subdivision=4,
+        players_per_team=15,
+        staff_per_team=2,
+        documents_per_staff=2,
+        tournaments=100,
+        exhibitions=100,
+        seed=0,
+        batch_size=5000,
+        stdout=None,
+    ):
+        self.seasons = seasons
+        self.leagues_per_season = leagues_per_season
+        self.divisions_per_league = divisions_per_league
+        self.subdivisions_per_division = subdivisions_per_division
+        self.teams_per_subdivision = teams_per_subdivision
+        self.players_per_team = players_per_team
+        self.staff_per_team = staff_per_team
+        self.documents_per_staff = documents_per_staff
+        self.tournaments = tournaments
+        self.exhibitions = exhibitions
+        self.batch_size = batch_size
+        self.stdout = stdout
+
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.counts = {}
+
+    def log(self, message):
+        if self.stdout:
+            self.stdout.write(message)
+
+    def bulk_create(self, model, objs):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise ValueError(
+                gettext("%(vendor)s does not return ids from bulk inserts")
+                % {"vendor": connection.vendor}
+            )
+
+        with suspend_position_fields(model):
+            created = model.objects.bulk_create(objs, batch_size=self.batch_size)
+
+        label = model._meta.label
+        self.counts[label] = self.counts.get(label, 0) + len(created)
+        return created
+
+    def load_lookups(self):
+        """Gets or creates the lookup rows the generated data refers to."""
+        self.gender = [
+            _lookup("core", "Gender", "Male"),
+            _lookup("core", "Gender", "Female"),
+        ]
+        self.member_status = _lookup("core", "MemberStatus", "Approved")
+
+        self.team_status = _lookup("team", "TeamStatus", "Approved")
+        self.team_status_reason = self.team_status.default_reason() or (
+            self.team_status.reasons.create(name="Approved", default=True)
+        )
+
+        self.player_status = _lookup("team", "PlayerStatus", "Approved")
+        self.player_status_reason = self.player_status.default_reason() or (
+            self.player_status.reasons.create(name="Approved", default=True)
+        )
+        self.player_type = _lookup("team", "PlayerType", "Player")
+        self.positions = [
+            _lookup("team", "PlayerPosition", name)
+            for name in ["Forward", "Defense", "Goalie"]
+        ]
+
+        self.staff_status = _lookup("team", "StaffStatus", "Approved")
+        self.staff_types = {
+            "team": _lookup("team", "StaffType", "Coach"),
+            "subdivision": _lookup("team", "StaffType", "Convenor", team_can_vote=True),
+            "league": _lookup("team", "StaffType", "VP", team_can_vote=True),
+        }
+
+        category = _lookup("qualifications", "DocumentCategory", "Certification")
+        document_type = _lookup(
+            "qualifications", "DocumentType", "Coaching", category=category
+        )
+        self.document_levels = [
+            _lookup("qualifications", "DocumentLevel", name, type=document_type)
+            for name in ["Level 1", "Level 2", "Level 3"]
+        ]
+
+        self.associations = [
+            _lookup("events", "Association", name, full_name=f"{name} Hockey")
+            for name in ["OMHA", "GTHL", "NOHA", "OTHER"]
+        ]
+        self.rinks = [
+            _lookup("events", "Rink", f"{city} Arena", city=city, province="Ontario")
+            for city in CITIES
+        ]
+
+    def first_year(self):
+        Season = apps.get_model("core", "Season")
+        last_end = Season.objects.aggregate(end=Max("end"))["end"]
+        if last_end is None:
+            return timezone.now().year - self.seasons + 1
+        return last_end.year if last_end.month < 9 else last_end.year + 1
+
+    def build_hierarchy(self):
+        Season = apps.get_model("core", "Season")
+        League = apps.get_model("core", "League")
+        Division = apps.get_model("core", "Division")
+        SubDivision = apps.get_model("core", "SubDivision")
+        Team = apps.get_model("team", "Team")
+
+        year = self.first_year()
+        self.season_objects = self.bulk_create(
+            Season,
+            [
+                Season(
+                    name=f"{start}-{start + 1}",
+                    start=timezone.datetime(start, 9, 1).date(),
+                    end=timezone.datetime(start + 1, 8, 31).date(),
+                )
+                for start in range(year, year + self.seasons)
+            ],
+        )
+
+        self.league_objects = self.bulk_create(
+            League,
+            [
+                League(season=season, name=f"League {number + 1}", weight=number)
+                for season in self.season_objects
+                for number in range(self.leagues_per_season)
+            ],
+        )
+
+        divisions = []
+        for league in self.league_objects:
+            for number in range(self.divisions_per_league):
+                divisions.append(
+                    Division(
+                        season_id=league.season_id,
+                        league=league,
+                        name=f"U{9 + number}",
+                        age_from=8 + number,
+                        age_to=9 + number,
+                    )
+                )
+        divisions = self.bulk_create(Division, self._weigh(divisions))
+
+        subdivisions = []
+        for division in divisions:
+            for number in range(self.subdivisions_per_division):
+                subdivisions.append(
+                    SubDivision(
+                        season_id=division.season_id,
+                        league_id=division.league_id,
+                        division=division,
+                        name="A" * (number + 1),
+                        body_checking=number > 0,
+                    )
+                )
+        self.subdivision_objects = self.bulk_create(
+            SubDivision, self._weigh(subdivisions)
+        )
+
+        teams = []
+        for subdivision in self.subdivision_objects:
+            for number in range(self.teams_per_subdivision):
+                teams.append(
+                    Team(
+                        season_id=subdivision.season_id,
+                        league_id=subdivision.league_id,
+                        division_id=subdivision.division_id,
+                        subdivision=subdivision,
+                        name=self.random.choice(TEAM_NAMES),
+                        number=number + 1,
+                        status=self.team_status,
+                        status_reason=self.team_status_reason,
+                    )
+                )
+        self.team_objects = self.bulk_create(Team, self._weigh(teams))
+
+    def _weigh(self, objs):
+        """Numbers objs from 0 within their season, the collection of every
+        positioned hierarchy model."""
+        weights = {}
+        for obj in objs:
+            obj.weight = weights.get(obj.season_id, 0)
+            weights[obj.season_id] = obj.weight + 1
+        return objs
+
+    def build_members(self, count):
+        Member = apps.get_model("core", "Member")
+
+        born_after = timezone.datetime(1970, 1, 1).date()
+        members = []
+        for _ in range(count):
+            first_name = self.random.choice(FIRST_NAMES)
+            last_name = self.random.choice(LAST_NAMES)
+            members.append(
+                Member(
+                    first_name=first_name,
+                    last_name=last_name,
+                    date_of_birth=born_after
+                    + timezone.timedelta(days=self.random.randint(0, 45 * 365)),
+                    city=self.random.choice(CITIES),
+                    province="Ontario",
+                    status=self.member_status,
+                    gender=self.random.choice(self.gender),
+                )
+            )
+        return self.bulk_create(Member, members)
+
+    def build_staff(self):
+        User = apps.get_model("core", "User")
+        Staff = apps.get_model("team", "Staff")
+
+        # Every staff member of a team, convenors per subdivision and VPs per league.
+        scopes = [
+            ("team", team)
+            for team in self.team_objects
+            for _ in range(self.staff_per_team)
+        ]
+        scopes += [
+            ("subdivision", subdivision) for subdivision in self.subdivision_objects
+        ]
+        scopes += [("league", league) for league in self.league_objects]
+
+        members = self.build_members(len(scopes))
+        password = make_password(None)
+        users = self.bulk_create(
+            User,
+            [
+                User(
+                    username=f"benchmark-{self.seed}-{member.pk}@example.com",
+                    email=f"benchmark-{self.seed}-{member.pk}@example.com",
+                    first_name=member.first_name,
+                    last_name=member.last_name,
+                    password=password,
+                )
+                for member in members
+            ],
+        )
+
+        staff = []
+        for (level, node), member, user in zip(scopes, members, users):
+            ids = {"season_id": node.season_id, f"{level}_id": node.pk}
+            for parent in ("league", "division", "subdivision"):
+                if parent == level:
+                    break
+                ids[f"{parent}_id"] = getattr(node, f"{parent}_id")
+
+            staff.append(
+                Staff(
+                    user=user,
+                    member=member,
+                    type=self.staff_types[level],
+                    status=self.staff_status,
+                    **ids,
+                )
+            )
+        self.bulk_create(Staff, staff)
+        self.build_documents(members)
+
+    def build_documents(self, members):
+        MemberDocument = apps.get_model("core", "MemberDocument")
+
+        documents = []
+        for member in members:
+            for level in self.document_levels[: self.documents_per_staff]:
+                year = self.random.randint(2010, timezone.now().year)
+                documents.append(
+                    MemberDocument(
+                        member=member,
+                        document_category_id=level.type.category_id,
+                        document_type_id=level.type_id,
+                        document_level=level,
+                        effective_date=timezone.datetime(year, 9, 1).date(),
+                        season_year=year,
+                        attained=True,
+                        passed=True,
+                        certified=self.random.random() < 0.8,
+                    )
+                )
+        self.bulk_create(MemberDocument, documents)
+
+    def build_players(self):
+        Player = apps.get_model("team", "Player")
+
+        # Inserted a batch of teams at a time, keeping memory flat at any size.
+        teams_per_batch = max(1, self.batch_size // max(1, self.players_per_team))
+        remaining = iter(self.team_objects)
+        while teams := list(itertools.islice(remaining, teams_per_batch)):
+            members = iter(self.build_members(len(teams) * self.players_per_team))
+
+            players = []
+            for team in teams:
+                for member in itertools.islice(members, self.players_per_team):
+                    players.append(
+                        Player(
+                            season_id=team.season_id,
+                            league_id=team.league_id,
+                            division_id=team.division_id,
+                            subdivision_id=team.subdivision_id,
+                            team=team,
+                            member=member,
+                            position=self.random.choice(self.positions),
+                            type=self.player_type,
+                            status=self.player_status,
+                            status_reason=self.player_status_reason,
+                            hand=self.random.choice(["Left", "Right"]),
+                        )
+                    )
+            self.bulk_create(Player, players)
+
+    def build_events(self):
+        Tournament = apps.get_model("events", "Tournament")
+        Exhibition = apps.get_model("events", "Exhibition")
+
+        start = min(season.start for season in self.season_objects)
+        days = (max(season.end for season in self.season_objects) - start).days
+
+        tournaments = []
+        for number in range(self.tournaments):
+            start_date = start + timezone.timedelta(days=self.random.randint(0, days))
+            city = self.random.choice(CITIES)
+            tournaments.append(
+                Tournament(
+                    association=self.random.choice(self.associations),
+                    sanction_number=f"BM{self.seed}-{start.year}-{number}",
+                    name=f"{city} {self.random.choice(TEAM_NAMES)} Classic",
+                    location=f"{city} Arena",
+                    start_date=start_date,
+                    end_date=start_date + timezone.timedelta(days=2),
+                    divisions=", ".join(
+                        f"U{age}" for age in range(9, 9 + self.random.randint(1, 8))
+                    ),
+                    source="generate_benchmark_data",
+                )
+            )
+        self.bulk_create(Tournament, tournaments)
+
+        exhibitions = []
+        for _ in range(self.exhibitions):
+            start_date = timezone.make_aware(
+                timezone.datetime.combine(
+                    start + timezone.timedelta(days=self.random.randint(0, days)),
+                    timezone.datetime.min.time(),
+                )
+                + timezone.timedelta(hours=self.random.randint(8, 20))
+            )
+            rink = self.random.choice(self.rinks)
+            exhibitions.append(
+                Exhibition(
+                    other_team=f"{rink.city} {self.random.choice(TEAM_NAMES)}",
+                    other_team_association=self.random.choice(self.associations),
+                    destination=rink.city,
+                    rink=rink,
+                    start_date=start_date,
+                    end_datetime=start_date + timezone.timedelta(hours=1, minutes=30),
+                    source="generate_benchmark_data",
+                )
+            )
+        self.bulk_create(Exhibition, exhibitions)
+
+    def generate(self):
+        """Writes everything in one transaction.
+
+        Returns:
+            {model label: number of rows created}
+
+        Raises:
+            ValueError: When the database cannot return the ids of bulk
+                inserted rows, e.g. MySQL.
+        """
+        with transaction.atomic():
+            self.load_lookups()
+
+            self.build_hierarchy()
+            self.log(
+                f"{len(self.season_objects)} seasons, {len(self.team_objects)} teams"
+            )
+
+            self.build_staff()
+            self.log("Staff created")
+
+            self.build_players()
+            self.log("Players created")
+
+            self.build_events()
+
+        return self.counts
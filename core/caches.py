@@ -0,0 +1,87 @@
+import copy
+import threading
+
+from django.db import connection, transaction
+
+
+class ModelCache:
+    """Process-wide cache of values loaded from rarely changing tables.
+
+    Entries are dropped with clear(), which core/signals.py calls whenever
+    one of the underlying models is saved or deleted.
+
+    Values read inside a transaction are stored too, unless the transaction
+    changed one of the underlying models before: it may still roll back
+    those changes. A change made in a transaction clears the cache again
+    once it commits, for values other threads read in the meantime.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        # on_commit hook of the changes made by this thread's transaction.
+        self._local = threading.local()
+
+    def get(self, key, loader):
+        """Returns the cached value for key, calling loader() on a miss.
+
+        Model instances are copied on the way out so callers can never
+        modify the cached object.
+        """
+        try:
+            return copy.copy(self._values[key])
+        except KeyError:
+            pass
+
+        generation = self._generation
+        value = loader()
+
+        with self._lock:
+            # Skip storing when the value may be stale: either a save/delete
+            # happened while loading or it reads uncommitted changes.
+            if generation == self._generation and not self._uncommitted_changes():
+                self._values[key] = value
+
+        return copy.copy(value)
+
+    def _uncommitted_changes(self):
+        """Whether the current transaction changed the underlying models.
+
+        Django drops the on_commit hooks of a transaction, or savepoint, on
+        rollback and runs them on commit, a hook still pending means the
+        changes are too.
+        """
+        hook = getattr(self._local, "on_commit", None)
+        return hook is not None and any(
+            pending[1] is hook for pending in connection.run_on_commit
+        )
+
+    def _changed(self):
+        with self._lock:
+            self._generation += 1
+
+        if connection.in_atomic_block and not self._uncommitted_changes():
+
+            def committed():
+                self._local.on_commit = None
+                self.clear()
+
+            self._local.on_commit = committed
+            transaction.on_commit(committed)
+
+    def pop(self, key):
+        self._changed()
+        with self._lock:
+            self._values.pop(key, None)
+
+    def clear(self):
+        self._changed()
+        with self._lock:
+            self._values.clear()
+
+
+current_season_cache = ModelCache()
+
+# Default rows of the status and type lookup tables, keyed by model label.
+lookup_cache = ModelCache()
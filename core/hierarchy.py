@@ -0,0 +1,159 @@
+from functools import lru_cache
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import OuterRef, Q
+
+# Levels below Season, ordered from the widest scope to the narrowest.
+SCOPE_LEVELS = ("league", "division", "subdivision", "team")
+
+# Season and every level below it, ordered from the widest to the narrowest.
+HIERARCHY_LEVELS = ("season",) + SCOPE_LEVELS
+
+# Every row below Season stores the id of each of its ancestors in its own
+# season_id, league_id, division_id and subdivision_id columns, which makes
+# those columns a materialized path. Reading up or down the hierarchy is then
+# a single indexed lookup on one column; keeping them correct when a node is
+# moved is handled by cascade_ancestors() through core/signals.py.
+
+
+def _ancestor_levels(level):
+    return HIERARCHY_LEVELS[: HIERARCHY_LEVELS.index(level)]
+
+
+def ancestors(node):
+    """Returns the Season, League, Division and SubDivision above node, widest first.
+
+    Read through the foreign keys of node, use select_related() on the
+    queryset node came from to load them without further queries.
+
+    Args:
+        node: Season, League, Division, SubDivision or Team object.
+
+    Returns:
+        list
+    """
+    return [getattr(node, level) for level in _ancestor_levels(node._meta.model_name)]
+
+
+def descendants(node, model):
+    """Returns every model row below node as a QuerySet.
+
+    Args:
+        node: Season, League, Division, SubDivision or Team object.
+        model: Model storing the ancestor columns, League, Division,
+            SubDivision, Team, Staff, Player or PermissionOverrides.
+
+    Returns:
+        QuerySet
+    """
+    return model._default_manager.filter(**{f"{node._meta.model_name}_id": node.pk})
+
+
+def descendant_teams(node):
+    """Returns every Team below node as a QuerySet."""
+    return descendants(node, apps.get_model("team", "Team"))
+
+
+def place_under(row, node):
+    """Sets the ancestor columns of row to the path of node, node included.
+
+    The ids are read off node, none of its ancestors are loaded.
+
+    Args:
+        row: Object storing the ancestor columns, such as a new Team under a
+            SubDivision or new Staff under any level.
+        node: League, Division, SubDivision or Team object.
+    """
+    level = node._meta.model_name
+    for ancestor in _ancestor_levels(level):
+        setattr(row, f"{ancestor}_id", getattr(node, f"{ancestor}_id"))
+    setattr(row, f"{level}_id", node.pk)
+
+
+def assigned_at(level):
+    """Q for Staff or PermissionOverrides rows assigned to a node of level
+    itself, rather than to a level above or below it.
+
+    Args:
+        level: season, league, division, subdivision or team.
+    """
+    depth = HIERARCHY_LEVELS.index(level)
+    return Q(
+        **{
+            f"{scope_level}_id__isnull": index > depth
+            for index, scope_level in enumerate(SCOPE_LEVELS, start=1)
+        }
+    )
+
+
+def covers(model):
+    """Q for Staff or PermissionOverrides rows whose scope covers the outer row.
+
+    A row covers the outer row when it is assigned to it or to one of its
+    ancestors, its path is then a prefix of the outer row's path.
+
+    Meant to be used inside a subquery of a Season, League, Division,
+    SubDivision or Team queryset, the outer row is referenced via OuterRef.
+    """
+    level = model._meta.model_name
+    depth = SCOPE_LEVELS.index(level) if level in SCOPE_LEVELS else -1
+
+    scope = Q(season=OuterRef("pk" if level == "season" else "season"))
+    for index, scope_level in enumerate(SCOPE_LEVELS):
+        if index > depth:
+            scope &= Q(**{f"{scope_level}_id__isnull": True})
+        else:
+            outer = OuterRef("pk" if index == depth else f"{scope_level}_id")
+            scope &= Q(**{f"{scope_level}_id__isnull": True}) | Q(
+                **{f"{scope_level}_id": outer}
+            )
+    return scope
+
+
+@lru_cache(maxsize=None)
+def _descendant_models(node_model):
+    """Models with a foreign key to node_model and a column per level above it."""
+    level = node_model._meta.model_name
+    columns = _ancestor_levels(level) + (level,)
+
+    found = []
+    for model in apps.get_models():
+        try:
+            fields = [model._meta.get_field(column) for column in columns]
+        except FieldDoesNotExist:
+            continue
+        if fields[-1].is_relation and fields[-1].related_model is node_model:
+            found.append(model)
+    return found
+
+
+def cascade_ancestors(node, update_fields=None):
+    """Copies the ancestor columns of node to every row below it.
+
+    Only does something when one of those columns differs from the value node
+    was loaded with, one UPDATE is issued per descendant model.
+
+    Args:
+        node: League, Division, SubDivision or Team object, after it is saved.
+        update_fields: The update_fields node was saved with.
+    """
+    level = node._meta.model_name
+    if level not in SCOPE_LEVELS:
+        return
+
+    columns = [f"{ancestor}_id" for ancestor in _ancestor_levels(level)]
+    if update_fields is not None:
+        columns = [
+            column
+            for column in columns
+            if column in update_fields or column.removesuffix("_id") in update_fields
+        ]
+
+    changed = set(node.get_dirty_fields()) & set(columns)
+    if not changed:
+        return
+
+    values = {column: getattr(node, column) for column in changed}
+    for model in _descendant_models(type(node)):
+        descendants(node, model).update(**values)
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark_data import BenchmarkDataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a deterministic synthetic dataset, seasons through players, "
+        "staff, documents and events, for benchmarking"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seasons", type=int, default=1)
+        parser.add_argument("--leagues-per-season", type=int, default=2)
+        parser.add_argument("--divisions-per-league", type=int, default=4)
+        parser.add_argument("--subdivisions-per-division", type=int, default=2)
+        parser.add_argument("--teams-per-subdivision", type=int, default=4)
+        parser.add_argument("--players-per-team", type=int, default=15)
+        parser.add_argument("--staff-per-team", type=int, default=2)
+        parser.add_argument("--documents-per-staff", type=int, default=2)
+        parser.add_argument("--tournaments", type=int, default=100)
+        parser.add_argument("--exhibitions", type=int, default=100)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        generator = BenchmarkDataGenerator(
+            seasons=options["seasons"],
+            leagues_per_season=options["leagues_per_season"],
+            divisions_per_league=options["divisions_per_league"],
+            subdivisions_per_division=options["subdivisions_per_division"],
+            teams_per_subdivision=options["teams_per_subdivision"],
+            players_per_team=options["players_per_team"],
+            staff_per_team=options["staff_per_team"],
+            documents_per_staff=options["documents_per_staff"],
+            tournaments=options["tournaments"],
+            exhibitions=options["exhibitions"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            stdout=self.stdout,
+        )
+
+        try:
+            counts = generator.generate()
+        except ValueError as e:
+            raise CommandError(e)
+
+        for label, count in counts.items():
+            self.stdout.write(f"{label}: {count}")
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Season
+from core.rollover import rollover_season
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies the Leagues, Divisions and SubDivisions of one season into another, "
+        "optionally with their Teams and Staff"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Name or id of the season to copy from")
+        parser.add_argument("target", help="Name or id of the season to copy into")
+        parser.add_argument("--teams", action="store_true", help="Copy teams as well")
+        parser.add_argument(
+            "--staff", action="store_true", help="Copy staff assignments as well"
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only show what would be created",
+        )
+
+    def get_season(self, value):
+        lookup = {"pk": value} if value.isdigit() else {"name__iexact": value}
+        try:
+            return Season.objects.get(**lookup)
+        except Season.DoesNotExist:
+            raise CommandError(f"Season {value} does not exist")
+
+    def handle(self, *args, **options):
+        source = self.get_season(options["source"])
+        target = self.get_season(options["target"])
+        if source == target:
+            raise CommandError("The source and target seasons must be different")
+
+        changes = rollover_season(
+            source,
+            target,
+            include_teams=options["teams"],
+            include_staff=options["staff"],
+            dry_run=options["dry_run"],
+        )
+
+        for action, model_name, label in changes:
+            prefix = "+" if action == "create" else "="
+            self.stdout.write(f"{prefix} {model_name}: {label}")
+
+        created = sum(1 for action, _, _ in changes if action == "create")
+        if options["dry_run"]:
+            self.stdout.write(f"Dry run, {created} rows would be created.")
+        else:
+            self.stdout.write(f"{created} rows created in {target}.")
@@ -1,6 +1,9 @@
 from django.contrib.auth.models import BaseUserManager
+from django.db import models
 from django.utils.translation import gettext
 
+from .ordering import renumber, reorder
+
 
 class _UserManager(BaseUserManager):
     """Define a model manager for User model with no username field."""
@@ -27,3 +30,15 @@ class _UserManager(BaseUserManager):
         extra_fields["is_staff"] = True
         extra_fields["is_superuser"] = True
         return self._create_user(email, password, **extra_fields)
+
+
+class PositionedQuerySet(models.QuerySet):
+    """For models ordered by a PositionField weight."""
+
+    def reorder(self, collection, ordered_ids):
+        """Writes the weights of collection in the order of ordered_ids, see
+        core.ordering.reorder()."""
+        return reorder(self, collection, ordered_ids)
+
+    def renumber(self, collection):
+        return renumber(self, collection)
@@ -0,0 +1,11 @@
+from .perms import permission_matrix_cache
+
+
+def permission_matrix_cache_middleware(get_response):
+    """Compiles each users permissions at most once per request."""
+
+    def middleware(request):
+        with permission_matrix_cache():
+            return get_response(request)
+
+    return middleware
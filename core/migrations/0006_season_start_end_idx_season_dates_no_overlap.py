@@ -0,0 +1,38 @@
+# Generated by Django 4.0.3 on 2022-03-20 14:05
+
+from django.db import migrations, models
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    # daterange and GiST exclusion constraints are PostgreSQL only, other
+    # databases rely on the overlap check in Season.save.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "ALTER TABLE core_season ADD CONSTRAINT season_dates_no_overlap "
+        "EXCLUDE USING gist (daterange(start, \"end\", '[]') WITH &&) "
+        'WHERE (start IS NOT NULL AND "end" IS NOT NULL)'
+    )
+
+
+def remove_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "ALTER TABLE core_season DROP CONSTRAINT IF EXISTS season_dates_no_overlap"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_permissionoverrides_team_can_access"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="season",
+            index=models.Index(fields=["start", "end"], name="season_start_end_idx"),
+        ),
+        migrations.RunPython(add_exclusion_constraint, remove_exclusion_constraint),
+    ]
@@ -1,10 +1,103 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import DEFERRED
 from django.utils import timezone
 from django.utils.translation import gettext_lazy
 
-
-class _BaseModel(models.Model):
+from .caches import lookup_cache
+
+
+class _TrackedFieldsMixin:
+    """Remembers the field values an instance was loaded or last saved with.
+
+    Lets save() compare against the stored row without selecting it again.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._original_values = {
+            name: value
+            for name, value in zip(field_names, values)
+            if value is not DEFERRED
+        }
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._remember_values(fields)
+
+    def _remember_values(self, fields=None):
+        # Copied rather than updated in place, copy.copy() of an instance
+        # would otherwise share the dict.
+        original_values = dict(self.__dict__.get("_original_values", {}))
+        for field in self._meta.concrete_fields:
+            if fields is not None and not {field.name, field.attname} & set(fields):
+                continue
+            # Deferred fields are not in __dict__, reading them would query.
+            if field.attname in self.__dict__:
+                original_values[field.attname] = getattr(self, field.attname)
+        self._original_values = original_values
+
+    def get_original_values(self, *attnames):
+        """Returns {attname: value} as currently stored in the database.
+
+        Values that were not loaded with the instance, such as deferred
+        fields, are selected in a single query.
+
+        Raises:
+            DoesNotExist: When values are missing and the row does not exist.
+        """
+        original_values = self.__dict__.get("_original_values", {})
+        values = {
+            name: original_values[name] for name in attnames if name in original_values
+        }
+
+        missing = [name for name in attnames if name not in values]
+        if missing:
+            values.update(
+                type(self)._base_manager.filter(pk=self.pk).values(*missing).get()
+            )
+
+        return values
+
+    def get_dirty_fields(self):
+        """Returns {attname: original value} of every loaded field that has changed."""
+        original_values = self.__dict__.get("_original_values", {})
+        return {
+            field.attname: original_values[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in original_values
+            and field.attname in self.__dict__
+            and getattr(self, field.attname) != original_values[field.attname]
+        }
+
+
+class _DefaultLookupMixin:
+    """For lookup tables with a unique nullable ``default`` flag."""
+
+    @classmethod
+    def get_default(cls):
+        """Returns the row flagged as default, or None, from lookup_cache."""
+        return lookup_cache.get(
+            (cls._meta.label, "default"),
+            lambda: cls._default_manager.filter(default=True).first(),
+        )
+
+
+class _StatusWithReasonsMixin:
+    """For statuses with a ``reasons`` relation holding a default reason."""
+
+    def default_reason(self):
+        """Returns the reason flagged as default for this status, or None,
+        from lookup_cache."""
+        return lookup_cache.get(
+            (self._meta.label, "default_reason", self.pk),
+            lambda: self.reasons.filter(default=True).first(),
+        )
+
+
+class _BaseModel(_TrackedFieldsMixin, models.Model):
     class Meta:
         abstract = True
 
@@ -46,6 +139,8 @@ class _BaseModel(models.Model):
 
         super().save(*args, **kwargs)
 
+        self._remember_values(kwargs.get("update_fields"))
+
 
 class _BaseModelWithCommonIDs(_BaseModel):
     class Meta:
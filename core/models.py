@@ -12,7 +12,13 @@ from phonenumber_field.modelfields import PhoneNumberField
 from positions.fields import PositionField
 
 from . import managers
-from .model_helpers import _BaseModel, _BaseModelWithCommonIDs, _BasePermissions
+from .caches import current_season_cache
+from .model_helpers import (
+    _BaseModel,
+    _BaseModelWithCommonIDs,
+    _BasePermissions,
+    _DefaultLookupMixin,
+)
 
 
 class User(_BaseModel, AbstractUser):
@@ -65,6 +71,9 @@ class Season(_BaseModelWithCommonIDs):
             ),
             models.UniqueConstraint(Lower("name"), name="season_name_unique"),
         ]
+        indexes = [
+            models.Index(fields=["start", "end"], name="season_start_end_idx"),
+        ]
 
     name = models.CharField(max_length=50)
 
@@ -96,8 +105,22 @@ class Season(_BaseModelWithCommonIDs):
 
     @classmethod
     def get_current(cls, based_on_date=None):
-        if not based_on_date:
-            based_on_date = timezone.now().date()
+        if based_on_date:
+            return cls._get_season_on(based_on_date)
+
+        # The current season is cached until the date passes its end date or
+        # a Season is saved or deleted, see core/signals.py.
+        today = timezone.now().date()
+        season = current_season_cache.get("current", lambda: cls._get_season_on(today))
+        if not season.start <= today <= season.end:
+            current_season_cache.pop("current")
+            season = current_season_cache.get(
+                "current", lambda: cls._get_season_on(today)
+            )
+        return season
+
+    @classmethod
+    def _get_season_on(cls, based_on_date):
         try:
             return cls.objects.filter(
                 start__lte=based_on_date, end__gte=based_on_date
@@ -108,18 +131,24 @@ class Season(_BaseModelWithCommonIDs):
 
     def save(self, *args, **kwargs):
 
-        qs = Season.objects.all()
-        if self.pk:
-            qs = qs.exclude(pk=self.pk)
-
-        for season in qs:
-
-            try:
-                start = self.start.date()
-            except (AttributeError, TypeError):
-                start = self.start
+        start, end = self.start, self.end
+        if isinstance(start, timezone.datetime):
+            start = start.date()
+        if isinstance(end, timezone.datetime):
+            end = end.date()
+
+        # Seasons ending before they start are rejected by
+        # check_season_end_is_after_start_date instead.
+        if (start or end) and not (start and end and end < start):
+            # On PostgreSQL season_dates_no_overlap enforces the same
+            # for concurrent writers.
+            overlapping = Season.objects.filter(
+                start__lte=end or start, end__gte=start or end
+            )
+            if self.pk:
+                overlapping = overlapping.exclude(pk=self.pk)
 
-            if season.start <= start <= season.end:
+            if overlapping.exists():
                 raise ValueError(
                     gettext(
                         "Season start and end dates cannot be between another seasons dates."
@@ -140,6 +169,8 @@ class League(_BaseModelWithCommonIDs):
             ),
         ]
 
+    objects = managers.PositionedQuerySet.as_manager()
+
     season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name="leagues")
     name = models.CharField(max_length=255)
 
@@ -158,6 +189,8 @@ class Division(_BaseModelWithCommonIDs):
             ),
         ]
 
+    objects = managers.PositionedQuerySet.as_manager()
+
     season = models.ForeignKey(
         Season, on_delete=models.CASCADE, related_name="divisions"
     )
@@ -188,6 +221,8 @@ class SubDivision(_BaseModelWithCommonIDs):
             ),
         ]
 
+    objects = managers.PositionedQuerySet.as_manager()
+
     season = models.ForeignKey(
         Season, on_delete=models.CASCADE, related_name="subdivisions"
     )
@@ -261,7 +296,7 @@ class Gender(_BaseModel):
     name = models.CharField(max_length=255)
 
 
-class MemberStatus(_BaseModel):
+class MemberStatus(_DefaultLookupMixin, _BaseModel):
     class Meta:
         verbose_name = gettext_lazy("Member Status")
         verbose_name_plural = gettext_lazy("Member Statuses")
@@ -323,10 +358,8 @@ class Member(_BaseModelWithCommonIDs):
     def save(self, *args, **kwargs):
 
         if not self.status_id or (not self.pk and not self.status_id):
-            try:
-                self.status = MemberStatus.objects.get(default=True)
-            except MemberStatus.DoesNotExist:
-                pass
+            if default_status := MemberStatus.get_default():
+                self.status = default_status
 
         return super().save(*args, **kwargs)
 
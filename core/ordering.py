@@ -0,0 +1,229 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.utils.translation import gettext
+from positions.fields import PositionField
+
+# Fields suspended by the current thread or task. The field instances are
+# shared, their pre_save is only wrapped once at startup by install().
+_suspended_fields = ContextVar("suspended_position_fields", default=frozenset())
+
+# {field: {collection values}} saved into while position maintenance is deferred.
+_touched_collections = ContextVar("touched_position_collections", default=None)
+
+
+def position_fields(model):
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if isinstance(field, PositionField)
+    ]
+
+
+def _position_field(model):
+    try:
+        return position_fields(model)[0]
+    except IndexError:
+        raise ValueError(
+            gettext("%(model)s does not have a PositionField")
+            % {"model": model._meta.label}
+        )
+
+
+def _collection_filter(field, collection):
+    """Filter kwargs for a collection of field.
+
+    Args:
+        collection: Value of the collection field, or a tuple of values when
+            the collection spans several fields. Ignored without a collection.
+    """
+    if field.collection is None:
+        return {}
+    if not isinstance(collection, tuple):
+        collection = (collection,)
+    return dict(zip(field.collection, collection))
+
+
+def _collection_of(field, instance):
+    if field.collection is None:
+        return ()
+    return tuple(
+        getattr(instance, instance._meta.get_field(name).attname)
+        for name in field.collection
+    )
+
+
+def reorder(queryset, collection, ordered_ids):
+    """Writes the weights of a whole collection with a single UPDATE.
+
+    Rows are numbered from 0 in the order of ordered_ids, rows of the
+    collection missing from ordered_ids follow in their current order.
+
+    Args:
+        queryset: QuerySet of a model with a PositionField.
+        collection: See _collection_filter().
+        ordered_ids: Primary keys in the wanted order.
+
+    Returns:
+        Number of rows updated.
+
+    Raises:
+        ValueError: When an id is not part of the collection.
+    """
+    field = _position_field(queryset.model)
+    rows = queryset.filter(**_collection_filter(field, collection))
+
+    # Negative weights are appended to the end, as PositionField does on save.
+    current_ids = list(
+        rows.order_by(
+            Case(When(**{f"{field.name}__lt": 0}, then=Value(1)), default=Value(0)),
+            field.name,
+            "pk",
+        ).values_list("pk", flat=True)
+    )
+
+    ordered_ids = list(ordered_ids)
+    if set(ordered_ids) - set(current_ids):
+        raise ValueError(
+            gettext("Every id passed to reorder must be part of the collection.")
+        )
+
+    seen = set(ordered_ids)
+    ids = ordered_ids + [pk for pk in current_ids if pk not in seen]
+    if not ids:
+        return 0
+
+    return rows.filter(pk__in=ids).update(
+        **{
+            field.name: Case(
+                *[When(pk=pk, then=Value(weight)) for weight, pk in enumerate(ids)],
+                output_field=IntegerField(),
+            )
+        }
+    )
+
+
+def renumber(queryset, collection):
+    """Renumbers the weights of a collection from 0, keeping the current order."""
+    return reorder(queryset, collection, [])
+
+
+def _unmoved_position(field, instance):
+    """Returns the position of a saved instance that kept both its position
+    and its collection, None otherwise.
+
+    PositionField selects the row again on every update to find out whether
+    the collection changed, the values remembered by _TrackedFieldsMixin
+    answer that without a query.
+    """
+    original_values = instance.__dict__.get("_original_values", {})
+    for name in field.collection:
+        attname = instance._meta.get_field(name).attname
+        if attname not in original_values:
+            return None
+        if getattr(instance, attname) != original_values[attname]:
+            return None
+
+    current, updated = getattr(instance, field.get_cache_name())
+    if current is None or updated is not None:
+        return None
+    return current
+
+
+def _make_suspendable(field):
+    if getattr(field, "_suspendable", False):
+        return
+
+    original_pre_save = field.pre_save
+
+    def pre_save(model_instance, add):
+        if field not in _suspended_fields.get():
+            if not add and field.collection is not None:
+                position = _unmoved_position(field, model_instance)
+                if position is not None:
+                    field._collection_changed = False
+                    return position
+            return original_pre_save(model_instance, add)
+
+        touched = _touched_collections.get()
+        if touched is not None:
+            touched[field].add(_collection_of(field, model_instance))
+
+        # Store the value as is and leave nothing for update_on_save to do,
+        # PositionField otherwise counts the collection for every row.
+        value = getattr(model_instance, field.attname)
+        setattr(model_instance, field.get_cache_name(), (value, None))
+        field._collection_changed = None
+        return value
+
+    field.pre_save = pre_save
+    field._suspendable = True
+
+
+def install():
+    """Makes every PositionField suspendable, called once from CoreConfig.ready().
+
+    Saving a row that stays where it is in its collection no longer selects
+    the row again either, see _unmoved_position().
+    """
+    for model in apps.get_models():
+        for field in position_fields(model):
+            _make_suspendable(field)
+
+
+@contextmanager
+def suspend_position_fields(*models):
+    """Turns off the PositionField bookkeeping of models inside the block.
+
+    Rows that are saved or bulk created keep the weight they carry instead
+    of being appended to and shifting their collection, the caller is
+    responsible for passing correct weights. Only saves made by the current
+    thread are affected.
+
+    Usage:
+        with suspend_position_fields(League):
+            League.objects.bulk_create(leagues)
+    """
+    fields = [field for model in models for field in position_fields(model)]
+
+    token = _suspended_fields.set(_suspended_fields.get() | frozenset(fields))
+    try:
+        yield
+    finally:
+        _suspended_fields.reset(token)
+
+
+@contextmanager
+def deferred_position_fields(*models):
+    """Suspends the PositionField bookkeeping of models inside the block, see
+    suspend_position_fields(), then renumbers every collection a row was
+    saved into once, with one UPDATE per collection.
+
+    Rows saved without a weight keep -1 until then and end up last.
+
+    Usage:
+        with deferred_position_fields(Team):
+            for row in rows:
+                Team.objects.create(**row)
+    """
+    if _touched_collections.get() is not None:
+        # Nested blocks are renumbered by the outermost one.
+        with suspend_position_fields(*models):
+            yield
+        return
+
+    touched = defaultdict(set)
+    token = _touched_collections.set(touched)
+    try:
+        with transaction.atomic(), suspend_position_fields(*models):
+            yield
+
+            for field, collections in touched.items():
+                for collection in collections:
+                    renumber(field.model._default_manager.all(), collection)
+    finally:
+        _touched_collections.reset(token)
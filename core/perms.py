@@ -1,13 +1,150 @@
-from django.db.models import Q
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import models
+from django.db.models import Exists, F, Q, QuerySet
 from django.utils import timezone
 from django.utils.translation import gettext
 from loguru import logger
 
+from .hierarchy import SCOPE_LEVELS, covers
 from .model_helpers import _BasePermissions
 
+_matrix_cache = ContextVar("permission_matrix_cache", default=None)
+
+
+def get_permission_names():
+    return [
+        field.name
+        for field in _BasePermissions._meta.local_fields
+        if isinstance(field, models.BooleanField)
+    ]
+
+
+def hierarchy_ids(obj):
+    """Returns {level: pk} for obj and every level above it.
+
+    Args:
+        obj: Season, League, Division, SubDivision or Team object.
+
+    Returns:
+        dict
+    """
+    level = obj._meta.model_name
+    ids = {level: obj.pk}
+    if level != "season":
+        ids["season"] = obj.season_id
+        for parent in SCOPE_LEVELS[: SCOPE_LEVELS.index(level)]:
+            ids[parent] = getattr(obj, f"{parent}_id")
+    return ids
+
+
+class PermissionMatrix:
+    """Every permission a user holds, compiled into per season scope sets.
+
+    Staff assignments and PermissionOverrides are each loaded with a single
+    query, after which checks are evaluated in memory.
+    """
+
+    def __init__(self, rows=()):
+        self.grants = {name: {} for name in get_permission_names()}
+        for row in rows:
+            self.add(row)
+
+    @classmethod
+    def for_user(cls, user):
+        from core.models import PermissionOverrides
+        from team.models import Staff
+
+        if user.pk is None:
+            return cls()
+
+        scope_fields = ["season_id"] + [f"{level}_id" for level in SCOPE_LEVELS]
+        permission_names = get_permission_names()
+
+        staff = Staff.objects.filter(user=user).values(
+            *scope_fields,
+            **{name: F(f"type__{name}") for name in permission_names},
+        )
+        overrides = PermissionOverrides.objects.filter(user=user).values(
+            *scope_fields, *permission_names
+        )
+        return cls([*staff, *overrides])
+
+    def add(self, row):
+        """Adds the scope of a Staff or PermissionOverrides values() row."""
+        level, scope_id = "season", row["season_id"]
+        for name in reversed(SCOPE_LEVELS):
+            if row[f"{name}_id"] is not None:
+                level, scope_id = name, row[f"{name}_id"]
+                break
+
+        for permission_name, seasons in self.grants.items():
+            if not row[permission_name]:
+                continue
+            scopes = seasons.setdefault(
+                row["season_id"],
+                {"season": False, **{name: set() for name in SCOPE_LEVELS}},
+            )
+            if level == "season":
+                scopes["season"] = True
+            else:
+                scopes[level].add(scope_id)
+
+    def allows(self, obj, permission_name):
+        if permission_name not in self.grants:
+            raise ValueError(
+                gettext(
+                    "Parameter permission_name value must be an attribute of PermissionOverrides model."
+                )
+            )
+
+        ids = hierarchy_ids(obj)
+        scopes = self.grants[permission_name].get(ids["season"])
+        if not scopes:
+            return False
+        if scopes["season"]:
+            return True
+        return any(
+            ids[level] in scopes[level] for level in SCOPE_LEVELS if level in ids
+        )
+
+
+@contextmanager
+def permission_matrix_cache():
+    """Reuses each users PermissionMatrix for the duration of the block.
+
+    Nested blocks share the outermost cache. Staff, StaffType and
+    PermissionOverrides changes clear it, see core/signals.py.
+    """
+    if _matrix_cache.get() is not None:
+        yield
+        return
+
+    token = _matrix_cache.set({})
+    try:
+        yield
+    finally:
+        _matrix_cache.reset(token)
+
+
+def clear_permission_matrix_cache():
+    cache = _matrix_cache.get()
+    if cache:
+        cache.clear()
+
+
+def get_permission_matrix(user):
+    cache = _matrix_cache.get()
+    if cache is None:
+        return PermissionMatrix.for_user(user)
+
+    if user.pk not in cache:
+        cache[user.pk] = PermissionMatrix.for_user(user)
+    return cache[user.pk]
+
 
 def has_perm(user, obj, permission_name):
-    from core.models import PermissionOverrides
     from team.models import Staff
 
     # Allow us to pass User or Staff object.
@@ -17,27 +154,81 @@ def has_perm(user, obj, permission_name):
     if user.is_superuser:
         return True
 
-    args = (
-        (Q(league_id__isnull=True) | Q(league=obj.league)),
-        (Q(division_id__isnull=True) | Q(division=obj.division)),
-        (Q(subdivision_id__isnull=True) | Q(subdivision=obj.subdivision)),
-        (Q(team_id__isnull=True) | Q(team=obj)),
+    return get_permission_matrix(user).allows(obj, permission_name)
+
+
+def filter_permitted(queryset, user, permission_name):
+    """Limits queryset to the rows user holds permission_name on.
+
+    The check is pushed into SQL as EXISTS subqueries against Staff and
+    PermissionOverrides, so the result stays a lazy QuerySet.
+
+    Args:
+        queryset: QuerySet of Season, League, Division, SubDivision or Team.
+        user: User or Staff object.
+        permission_name: Name of a permission field on _BasePermissions.
+
+    Returns:
+        QuerySet
+    """
+    from core.models import PermissionOverrides
+    from team.models import Staff
+
+    if permission_name not in get_permission_names():
+        raise ValueError(
+            gettext(
+                "Parameter permission_name value must be an attribute of PermissionOverrides model."
+            )
+        )
+
+    if isinstance(user, Staff):
+        user = user.user
+
+    if user.is_superuser:
+        return queryset
+    if user.pk is None:
+        return queryset.none()
+
+    scope = covers(queryset.model)
+    staff = Staff.objects.filter(scope, user=user, **{f"type__{permission_name}": True})
+    overrides = PermissionOverrides.objects.filter(
+        scope, user=user, **{permission_name: True}
     )
-    kwargs = {
-        "user": user,
-        "season": obj.season,
-    }
+    return queryset.filter(Q(Exists(staff)) | Q(Exists(overrides)))
 
-    if Staff.objects.filter(
-        *args, **kwargs, **{f"type__{permission_name}": True}
-    ).exists():
-        return True
 
-    return PermissionOverrides.objects.filter(
-        *args,
-        **kwargs,
-        **{f"{permission_name}": True},
-    ).exists()
+def has_perm_many(user, objects, permission_name):
+    """Returns the pks of the objects user holds permission_name on.
+
+    A QuerySet is checked with a single query, any other iterable is
+    checked in memory against the users PermissionMatrix.
+
+    Args:
+        user: User or Staff object.
+        objects: QuerySet or iterable of Season, League, Division,
+            SubDivision or Team objects.
+        permission_name: Name of a permission field on _BasePermissions.
+
+    Returns:
+        set
+    """
+    from team.models import Staff
+
+    if isinstance(objects, QuerySet):
+        return set(
+            filter_permitted(objects, user, permission_name).values_list(
+                "pk", flat=True
+            )
+        )
+
+    if isinstance(user, Staff):
+        user = user.user
+
+    if user.is_superuser:
+        return {obj.pk for obj in objects}
+
+    matrix = get_permission_matrix(user)
+    return {obj.pk for obj in objects if matrix.allows(obj, permission_name)}
 
 
 def add_override_permission(user, obj, permission_name, value, assigned_by=None):
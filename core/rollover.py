@@ -0,0 +1,239 @@
+from django.apps import apps
+from django.db import transaction
+
+from .hierarchy import HIERARCHY_LEVELS
+from .ordering import suspend_position_fields
+from .perms import clear_permission_matrix_cache
+
+# Never copied, the new rows get their own ids and timestamps.
+RESET_FIELDS = (
+    "id",
+    "old_sk_id",
+    "hockey_canada_id",
+    "hockey_canada_system_id",
+    "inserted",
+    "inserted_by",
+    "updated",
+    "updated_by",
+)
+
+# Team state that belongs to the season it was recorded in.
+TEAM_RESET_FIELDS = (
+    "status_reason",
+    "old_teamseason_id",
+    "players_has_changed_flag",
+    "staff_has_changed_flag",
+    "submitted",
+    "submitted_date",
+    "approved",
+    "registration_status",
+    "comments",
+)
+
+STAFF_RESET_FIELDS = ("registration_date", "release_date")
+
+
+def _clone(obj, reset, **values):
+    """Returns an unsaved copy of obj without the reset fields, which fall
+    back to their defaults, and with values applied on top."""
+    fields = {
+        field.attname: getattr(obj, field.attname)
+        for field in obj._meta.concrete_fields
+        if field.name not in reset and field.attname not in reset
+    }
+    fields.update(values)
+    return type(obj)(**fields)
+
+
+def _parent_levels(level):
+    """Levels between Season and level, the ones a row carries a name for."""
+    return HIERARCHY_LEVELS[1:][: HIERARCHY_LEVELS.index(level) - 1]
+
+
+def _label(obj):
+    names = [
+        getattr(obj, parent).name for parent in _parent_levels(obj._meta.model_name)
+    ]
+    return " / ".join(names + [obj.name])
+
+
+def _rollover_level(model, source, target, parents, changes, reset=(), **values):
+    """Copies the model rows of source into target.
+
+    Rows that already exist in target, matched on parent and name, are reused.
+    New rows are appended after the existing ones in their original order.
+
+    Args:
+        parents: {source parent id: {ancestor attname: target id}} of the level
+            above, None for League.
+        values: Callables returning extra field values for a source row.
+
+    Returns:
+        {source id: {ancestor attname: target id}} including the row itself.
+    """
+    level = model._meta.model_name
+    parent = HIERARCHY_LEVELS[HIERARCHY_LEVELS.index(level) - 1]
+    parent_attname = f"{parent}_id"
+    level_attname = f"{level}_id"
+
+    def natural_key(row):
+        return getattr(row, parent_attname), row.name.lower()
+
+    def existing_rows():
+        return {natural_key(row): row for row in model.objects.filter(season=target)}
+
+    existing = existing_rows()
+    weight = max((row.weight for row in existing.values()), default=-1) + 1
+
+    source_rows = model.objects.filter(season=source).order_by("weight", "pk")
+    if related := _parent_levels(level):
+        source_rows = source_rows.select_related(*related)
+
+    # {natural key: new row}, rows sharing a name under one parent are
+    # merged into the first one.
+    created = {}
+    # (source row, ids, natural key) of every source row mapped to a new row.
+    pending = []
+    mapping = {}
+    for row in source_rows:
+        if parents is None:
+            ids = {"season_id": target.pk}
+        elif getattr(row, parent_attname) in parents:
+            ids = parents[getattr(row, parent_attname)]
+        else:
+            continue
+
+        key = (ids[parent_attname], row.name.lower())
+        if key in existing:
+            mapping[row.pk] = {**ids, level_attname: existing[key].pk}
+            changes.append(("exists", model._meta.verbose_name, _label(row)))
+            continue
+
+        if key in created:
+            pending.append((row, ids, key))
+            continue
+
+        extra = {name: value(row) for name, value in values.items()}
+        created[key] = _clone(
+            row, RESET_FIELDS + tuple(reset), weight=weight, **ids, **extra
+        )
+        pending.append((row, ids, key))
+        weight += 1
+        changes.append(("create", model._meta.verbose_name, _label(row)))
+
+    if created:
+        with suspend_position_fields(model):
+            model.objects.bulk_create(created.values())
+
+        # Not every backend returns ids from a bulk insert, reload them.
+        existing = existing_rows()
+        for row, ids, key in pending:
+            mapping[row.pk] = {**ids, level_attname: existing[key].pk}
+
+    return mapping
+
+
+def _rollover_staff(source, target, nodes, changes):
+    Staff = apps.get_model("team", "Staff")
+
+    scope_attnames = [f"{level}_id" for level in HIERARCHY_LEVELS]
+
+    def natural_key(staff):
+        return (staff.user_id, staff.type_id) + tuple(
+            getattr(staff, attname) for attname in scope_attnames
+        )
+
+    existing = {natural_key(staff) for staff in Staff.objects.filter(season=target)}
+
+    new_staff = []
+    for staff in Staff.objects.filter(season=source).select_related("user"):
+        # Assigned at the deepest level that is set.
+        for level in reversed(HIERARCHY_LEVELS):
+            source_id = getattr(staff, f"{level}_id")
+            if source_id is not None:
+                break
+
+        if level == "season":
+            ids = {"season_id": target.pk}
+        elif source_id in nodes[level]:
+            ids = nodes[level][source_id]
+        else:
+            continue
+
+        ids = {attname: ids.get(attname) for attname in scope_attnames}
+        clone = _clone(staff, RESET_FIELDS + STAFF_RESET_FIELDS, **ids)
+
+        if natural_key(clone) in existing:
+            changes.append(("exists", Staff._meta.verbose_name, str(staff)))
+            continue
+
+        existing.add(natural_key(clone))
+        new_staff.append(clone)
+        changes.append(("create", Staff._meta.verbose_name, str(staff)))
+
+    Staff.objects.bulk_create(new_staff)
+    return new_staff
+
+
+def rollover_season(
+    source, target, include_teams=False, include_staff=False, dry_run=False
+):
+    """Copies the League, Division and SubDivision tree of source into target.
+
+    Rows are created with bulk_create in a single transaction, bypassing
+    save() and PositionField bookkeeping. Rows already present in target are
+    left as they are, running it again only adds what is missing.
+
+    Args:
+        source: Season to copy from.
+        target: Season to copy into, must already exist.
+        include_teams: Copy Teams as well.
+        include_staff: Copy Staff assignments of every copied level, and of
+            the season itself.
+        dry_run: Roll everything back, only report the changes.
+
+    Returns:
+        List of (action, model verbose name, label) where action is create or exists.
+    """
+    League = apps.get_model("core", "League")
+    Division = apps.get_model("core", "Division")
+    SubDivision = apps.get_model("core", "SubDivision")
+    Team = apps.get_model("team", "Team")
+    TeamStatus = apps.get_model("team", "TeamStatus")
+
+    changes = []
+    nodes = {}
+
+    with transaction.atomic():
+        nodes["league"] = _rollover_level(League, source, target, None, changes)
+        nodes["division"] = _rollover_level(
+            Division, source, target, nodes["league"], changes
+        )
+        nodes["subdivision"] = _rollover_level(
+            SubDivision, source, target, nodes["division"], changes
+        )
+        nodes["team"] = {}
+
+        if include_teams:
+            default_reasons = {
+                pk: getattr(status.default_reason(), "pk", None)
+                for pk, status in TeamStatus.objects.in_bulk().items()
+            }
+            nodes["team"] = _rollover_level(
+                Team,
+                source,
+                target,
+                nodes["subdivision"],
+                changes,
+                reset=TEAM_RESET_FIELDS,
+                status_reason_id=lambda team: default_reasons.get(team.status_id),
+            )
+
+        if include_staff and _rollover_staff(source, target, nodes, changes):
+            # bulk_create sends no post_save for core/signals.py to act on.
+            transaction.on_commit(clear_permission_matrix_cache)
+
+        if dry_run:
+            transaction.set_rollback(True)
+
+    return changes
@@ -0,0 +1,37 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caches import current_season_cache, lookup_cache
+from .hierarchy import cascade_ancestors
+from .perms import clear_permission_matrix_cache
+
+
+@receiver([post_save, post_delete], sender="core.PermissionOverrides")
+@receiver([post_save, post_delete], sender="team.Staff")
+@receiver([post_save, post_delete], sender="team.StaffType")
+def permissions_changed(**kwargs):
+    clear_permission_matrix_cache()
+
+
+@receiver([post_save, post_delete], sender="core.Season")
+def season_changed(**kwargs):
+    current_season_cache.clear()
+
+
+@receiver([post_save, post_delete], sender="core.MemberStatus")
+@receiver([post_save, post_delete], sender="team.PlayerType")
+@receiver([post_save, post_delete], sender="team.PlayerStatus")
+@receiver([post_save, post_delete], sender="team.PlayerStatusReason")
+@receiver([post_save, post_delete], sender="team.TeamStatus")
+@receiver([post_save, post_delete], sender="team.TeamStatusReason")
+def lookup_table_changed(**kwargs):
+    lookup_cache.clear()
+
+
+@receiver(post_save, sender="core.League")
+@receiver(post_save, sender="core.Division")
+@receiver(post_save, sender="core.SubDivision")
+@receiver(post_save, sender="team.Team")
+def hierarchy_node_saved(instance, created, update_fields, **kwargs):
+    if not created:
+        cascade_ancestors(instance, update_fields)
@@ -1,6 +1,76 @@
+from contextlib import ContextDecorator
+
+from django.db import DEFAULT_DB_ALIAS, connections
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+
+class query_budget(ContextDecorator):
+    """Fails when the block, or decorated test, executes more than maximum queries.
+
+    The failure lists every query executed so the extra ones are easy to spot.
+
+    Usage:
+        with query_budget(3):
+            team.save()
+
+        @query_budget(10)
+        def test_something(self):
+            ...
+    """
+
+    def __init__(self, maximum, using=DEFAULT_DB_ALIAS):
+        self.maximum = maximum
+        self.using = using
+
+    def __enter__(self):
+        self.context = CaptureQueriesContext(connections[self.using])
+        self.context.__enter__()
+        return self.context
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return
+
+        executed = len(self.context)
+        if executed > self.maximum:
+            queries = "\n".join(
+                f"{number}. {query['sql']}"
+                for number, query in enumerate(self.context.captured_queries, 1)
+            )
+            raise AssertionError(
+                f"{executed} queries executed, the budget is {self.maximum}\n{queries}"
+            )
+
+
+class QueryBudgetMixin:
+    def assertConstantQueries(self, func, grow, using=DEFAULT_DB_ALIAS):
+        """Asserts func executes as many queries after grow() added rows as
+        it did before, catching queries issued per row.
+
+        func is called once beforehand so caches filled on first use do not
+        count against the first measurement.
+
+        Args:
+            func: Callable exercising the code path, e.g. a view request.
+            grow: Callable adding the rows func iterates over.
+        """
+        func()
+        with CaptureQueriesContext(connections[using]) as before:
+            func()
+        grow()
+        with CaptureQueriesContext(connections[using]) as after:
+            func()
+
+        self.assertEqual(
+            len(before),
+            len(after),
+            "Number of queries grows with the number of rows:\n"
+            + "\n".join(query["sql"] for query in after.captured_queries),
+        )
 
 
-class FixtureBasedTestCase(TestCase):
+class FixtureBasedTestCase(QueryBudgetMixin, TestCase):
 
     fixtures = ["core/fixtures/test_fixtures.json", "team/fixtures/test_fixtures.json"]
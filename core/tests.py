@@ -1,16 +1,22 @@
 """
     See core/utils.py:generate_test_fixture_data to see how fixture file is built.
 """
+import threading
 import uuid
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.utils import IntegrityError
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.urls import reverse
 from django.utils import timezone
 
-from team.models import Staff, StaffType, Team
+from team.models import Staff, StaffType, Team, TeamStatus
 
+from . import hierarchy, ordering
+from .benchmark_data import BenchmarkDataGenerator
+from .caches import current_season_cache, lookup_cache
 from .models import (
     Division,
     Gender,
@@ -21,8 +27,20 @@ from .models import (
     Season,
     SubDivision,
 )
-from .perms import add_override_permission, has_perm
-from .test_helpers import FixtureBasedTestCase
+from .ordering import (
+    deferred_position_fields,
+    position_fields,
+    suspend_position_fields,
+)
+from .perms import (
+    PermissionMatrix,
+    add_override_permission,
+    has_perm,
+    has_perm_many,
+    permission_matrix_cache,
+)
+from .rollover import rollover_season
+from .test_helpers import FixtureBasedTestCase, query_budget
 
 User = get_user_model()
 
@@ -170,6 +188,121 @@ class CoreUtilsTests(FixtureBasedTestCase):
         self.assertIs(True, has_perm(team1_coach, team, "team_can_edit"))
 
 
+class PermissionMatrixTests(FixtureBasedTestCase):
+    def test_matrix_is_built_once_per_cache_block(self):
+        team1 = Team.objects.first()
+        team2 = Team.objects.last()
+        user = team1.staff.first().user
+
+        with permission_matrix_cache():
+            with self.assertNumQueries(2):
+                self.assertIs(True, has_perm(user, team1, "team_can_edit"))
+
+            with self.assertNumQueries(0):
+                self.assertIs(False, has_perm(user, team2, "team_can_edit"))
+                self.assertIs(False, has_perm(user, team1, "team_can_vote"))
+
+    def test_matrix_is_rebuilt_outside_cache_block(self):
+        team1 = Team.objects.first()
+        user = team1.staff.first().user
+
+        with self.assertNumQueries(2):
+            has_perm(user, team1, "team_can_edit")
+
+        with self.assertNumQueries(2):
+            has_perm(user, team1, "team_can_edit")
+
+    def test_cache_is_cleared_when_overrides_change(self):
+        team1 = Team.objects.first()
+        team2 = Team.objects.last()
+        team1_coach = team1.staff.first()
+
+        with permission_matrix_cache():
+            self.assertIs(False, has_perm(team1_coach, team2, "team_can_edit"))
+
+            add_override_permission(team1_coach, team2, "team_can_edit", True)
+
+            self.assertIs(True, has_perm(team1_coach, team2, "team_can_edit"))
+
+    def test_matrix_allows_parent_objects_within_scope(self):
+        team1 = Team.objects.first()
+        vp = team1.league.staff.own().first()
+
+        matrix = PermissionMatrix.for_user(vp.user)
+
+        self.assertIs(True, matrix.allows(team1.league, "team_can_edit"))
+        self.assertIs(True, matrix.allows(team1.division, "team_can_edit"))
+        self.assertIs(False, matrix.allows(team1.season, "team_can_edit"))
+
+    def test_matrix_raises_valueerror_on_invalid_permission_name(self):
+        team1 = Team.objects.first()
+        matrix = PermissionMatrix.for_user(team1.staff.first().user)
+
+        self.assertRaises(ValueError, matrix.allows, team1, "invalid_name")
+
+
+class HasPermManyTests(FixtureBasedTestCase):
+    def test_queryset_is_checked_with_a_single_query(self):
+        team1 = Team.objects.first()
+        user = team1.subdivision.staff.own().first().user
+
+        with self.assertNumQueries(1):
+            allowed = has_perm_many(user, Team.objects.all(), "team_can_edit")
+
+        self.assertEqual(
+            set(team1.subdivision.teams.values_list("pk", flat=True)), allowed
+        )
+
+    def test_queryset_and_iterable_results_match_has_perm(self):
+        team1 = Team.objects.first()
+        user = team1.division.staff.own().first().user
+        teams = list(Team.objects.all())
+
+        expected = {team.pk for team in teams if has_perm(user, team, "team_can_edit")}
+
+        self.assertEqual(expected, has_perm_many(user, teams, "team_can_edit"))
+        self.assertEqual(
+            expected, has_perm_many(user, Team.objects.all(), "team_can_edit")
+        )
+
+    def test_parent_objects_are_only_permitted_within_scope(self):
+        team1 = Team.objects.first()
+        user = team1.league.staff.own().first().user
+
+        self.assertEqual(
+            {team1.league_id},
+            has_perm_many(user, League.objects.all(), "team_can_edit"),
+        )
+        self.assertEqual(
+            set(team1.league.divisions.values_list("pk", flat=True)),
+            has_perm_many(user, Division.objects.all(), "team_can_edit"),
+        )
+        self.assertEqual(
+            set(), has_perm_many(user, Season.objects.all(), "team_can_edit")
+        )
+
+    def test_overrides_are_included(self):
+        team1 = Team.objects.first()
+        team2 = Team.objects.last()
+        team1_coach = team1.staff.first()
+
+        team1_coach.permissions_add_override(team2, "team_can_vote", True)
+
+        self.assertEqual(
+            {team2.pk},
+            has_perm_many(team1_coach, Team.objects.all(), "team_can_vote"),
+        )
+
+    def test_superuser_is_permitted_everything(self):
+        user = Staff.objects.first().user
+        user.is_superuser = True
+
+        self.assertEqual(
+            set(Team.objects.values_list("pk", flat=True)),
+            has_perm_many(user, Team.objects.all(), "team_can_vote"),
+        )
+
+
 class SeasonTests(TestCase):
     def setUp(self) -> None:
         year = timezone.now().year - 1
@@ -296,6 +429,28 @@ class SeasonTests(TestCase):
             end=timezone.datetime(2003, 12, 31).date(),
         )
 
+    def test_new_season_save_raises_exception_when_end_date_within_another_seasons_daterange(
+        self,
+    ):
+        Season.objects.create(
+            name="test 1",
+            start=timezone.datetime(2000, 1, 1).date(),
+            end=timezone.datetime(2000, 12, 31).date(),
+        )
+
+        self.assertRaisesMessage(
+            ValueError,
+            "Season start and end dates cannot be between another seasons dates.",
+            Season.objects.create,
+            name="test 2",
+            start=timezone.datetime(1999, 1, 1).date(),
+            end=timezone.datetime(2000, 1, 1).date(),
+        )
+
+    def test_season_can_be_saved_again_without_overlapping_itself(self):
+        self.season2.name = "renamed"
+        self.season2.save()
+
     def test_get_current_raises_exception_on_invalid_object(self):
         self.assertRaises(
             TypeError,
@@ -361,6 +516,120 @@ class SeasonTests(TestCase):
         self.assertEqual(self.season1, resp.context["season"])
 
 
+class SeasonCurrentCacheTests(TransactionTestCase):
+    def setUp(self) -> None:
+        self.today = timezone.now().date()
+
+        self.season = Season.objects.create(
+            name="current",
+            start=self.today - timezone.timedelta(days=10),
+            end=self.today + timezone.timedelta(days=10),
+        )
+        self.next_season = Season.objects.create(
+            name="next",
+            start=self.today + timezone.timedelta(days=11),
+            end=self.today + timezone.timedelta(days=365),
+        )
+
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        current_season_cache.clear()
+        return super().tearDown()
+
+    def test_current_season_is_cached(self):
+        self.assertEqual(self.season, Season.get_current())
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.season, Season.get_current())
+
+    def test_saving_a_season_clears_the_cache(self):
+        self.assertEqual(self.season, Season.get_current())
+
+        self.season.end = self.today - timezone.timedelta(days=1)
+        self.season.save()
+
+        self.assertRaises(Season.DoesNotExist, Season.get_current)
+
+    def test_deleting_a_season_clears_the_cache(self):
+        self.assertEqual(self.season, Season.get_current())
+
+        self.season.delete()
+
+        self.assertRaises(Season.DoesNotExist, Season.get_current)
+
+    def test_cache_expires_after_season_end_date(self):
+        self.assertEqual(self.season, Season.get_current())
+
+        tomorrow = timezone.now() + timezone.timedelta(days=11)
+        with mock.patch.object(timezone, "now", return_value=tomorrow):
+            self.assertEqual(self.next_season, Season.get_current())
+
+
+class LookupCacheTests(TransactionTestCase):
+    def tearDown(self) -> None:
+        lookup_cache.clear()
+        return super().tearDown()
+
+    def test_default_is_cached(self):
+        status = MemberStatus.objects.create(name="active", default=True)
+
+        self.assertEqual(status, MemberStatus.get_default())
+
+        with self.assertNumQueries(0):
+            self.assertEqual(status, MemberStatus.get_default())
+
+    def test_saving_a_lookup_row_clears_the_cache(self):
+        status = MemberStatus.objects.create(name="active", default=True)
+        self.assertEqual(status, MemberStatus.get_default())
+
+        status.default = False
+        status.save()
+
+        self.assertIsNone(MemberStatus.get_default())
+
+    def test_default_read_in_a_transaction_is_cached(self):
+        status = MemberStatus.objects.create(name="active", default=True)
+
+        with transaction.atomic():
+            self.assertEqual(status, MemberStatus.get_default())
+
+        with self.assertNumQueries(0):
+            self.assertEqual(status, MemberStatus.get_default())
+
+    def test_default_changed_in_a_rolled_back_transaction_is_not_cached(self):
+        status = MemberStatus.objects.create(name="active", default=True)
+
+        with transaction.atomic():
+            status.default = False
+            status.save()
+            self.assertIsNone(MemberStatus.get_default())
+            transaction.set_rollback(True)
+
+        self.assertEqual(status, MemberStatus.get_default())
+
+    def test_default_changed_in_a_committed_transaction_is_cached(self):
+        with transaction.atomic():
+            status = MemberStatus.objects.create(name="active", default=True)
+            self.assertEqual(status, MemberStatus.get_default())
+
+        self.assertEqual(status, MemberStatus.get_default())
+        with self.assertNumQueries(0):
+            self.assertEqual(status, MemberStatus.get_default())
+
+    def test_default_reason_is_cached_per_status(self):
+        status = TeamStatus.objects.create(name="approved")
+        reason = status.reasons.create(name="approved", default=True)
+        other_status = TeamStatus.objects.create(name="rejected")
+
+        self.assertEqual(reason, status.default_reason())
+        self.assertIsNone(other_status.default_reason())
+
+        with self.assertNumQueries(0):
+            self.assertEqual(reason, status.default_reason())
+            self.assertIsNone(other_status.default_reason())
+
+
 class LeagueTests(FixtureBasedTestCase):
     def test_league_uniqueness(self):
         season = Season.objects.first()
@@ -460,6 +729,259 @@ class SubDivisionTests(FixtureBasedTestCase):
         )
 
 
+class HierarchyTests(FixtureBasedTestCase):
+    def test_ancestors_are_ordered_widest_first(self):
+        team = Team.objects.get(pk=1)
+        self.assertEqual(
+            [team.season, team.league, team.division, team.subdivision],
+            hierarchy.ancestors(team),
+        )
+        self.assertEqual([], hierarchy.ancestors(team.season))
+
+    def test_descendant_teams(self):
+        league = League.objects.get(pk=2)
+        self.assertEqual(8, hierarchy.descendant_teams(league).count())
+        self.assertEqual(
+            2, hierarchy.descendant_teams(SubDivision.objects.get(pk=5)).count()
+        )
+
+    def test_place_under_copies_the_path_of_the_node(self):
+        team = Team.objects.get(pk=1)
+        staff = Staff()
+
+        with self.assertNumQueries(0):
+            hierarchy.place_under(staff, team)
+
+        self.assertEqual(
+            [team.season_id, team.league_id, team.division_id, team.subdivision_id],
+            [staff.season_id, staff.league_id, staff.division_id, staff.subdivision_id],
+        )
+        self.assertEqual(team.pk, staff.team_id)
+
+    def test_assigned_at_excludes_levels_above_and_below(self):
+        staff = Staff.objects.filter(hierarchy.assigned_at("division"))
+
+        self.assertTrue(staff.exists())
+        for row in staff:
+            self.assertIsNotNone(row.division_id)
+            self.assertIsNone(row.subdivision_id)
+            self.assertIsNone(row.team_id)
+
+    def test_moving_a_division_updates_its_descendants(self):
+        division = Division.objects.get(pk=2)
+        division.name = "U12"
+        division.league_id = 2
+        division.save()
+
+        self.assertEqual(
+            {2}, set(division.subdivisions.values_list("league_id", flat=True))
+        )
+        self.assertEqual(
+            {2},
+            set(
+                hierarchy.descendant_teams(division).values_list("league_id", flat=True)
+            ),
+        )
+        self.assertEqual(
+            12, hierarchy.descendant_teams(League.objects.get(pk=2)).count()
+        )
+
+    def test_saving_a_node_without_moving_it_does_not_update_descendants(self):
+        division = Division.objects.get(pk=2)
+        division.name = "U12"
+
+        with mock.patch.object(hierarchy, "descendants") as descendants:
+            division.save()
+
+        descendants.assert_not_called()
+
+
+class RolloverSeasonTests(FixtureBasedTestCase):
+    def setUp(self) -> None:
+        self.source = Season.objects.get(pk=2)
+        self.target = Season.objects.create(
+            name="2023-2024",
+            start=timezone.datetime(2023, 9, 1).date(),
+            end=timezone.datetime(2024, 8, 31).date(),
+        )
+        return super().setUp()
+
+    def test_hierarchy_is_copied_in_order(self):
+        rollover_season(self.source, self.target)
+
+        self.assertEqual(
+            list(self.source.leagues.values_list("name", "weight")),
+            list(self.target.leagues.values_list("name", "weight")),
+        )
+        self.assertEqual(
+            list(
+                self.source.subdivisions.values_list(
+                    "league__name", "division__name", "name", "weight"
+                )
+            ),
+            list(
+                self.target.subdivisions.values_list(
+                    "league__name", "division__name", "name", "weight"
+                )
+            ),
+        )
+        for subdivision in self.target.subdivisions.all():
+            self.assertEqual(subdivision.league_id, subdivision.division.league_id)
+        self.assertEqual(0, self.target.teams.count())
+
+    def test_dry_run_does_not_create_anything(self):
+        changes = rollover_season(
+            self.source, self.target, include_teams=True, dry_run=True
+        )
+
+        self.assertEqual(2 + 4 + 8 + 16, len(changes))
+        self.assertEqual(0, self.target.leagues.count())
+
+    def test_existing_rows_are_reused(self):
+        rollover_season(self.source, self.target)
+        changes = rollover_season(self.source, self.target, include_teams=True)
+
+        self.assertEqual({"exists"}, {action for action, _, _ in changes[: 2 + 4 + 8]})
+        self.assertEqual(2, self.target.leagues.count())
+        self.assertEqual(16, self.target.teams.count())
+        self.assertEqual(
+            set(self.source.teams.values_list("name", "subdivision__name")),
+            set(self.target.teams.values_list("name", "subdivision__name")),
+        )
+
+
+class OrderingTests(FixtureBasedTestCase):
+    def test_reorder_writes_weights_in_one_update(self):
+        season = Season.objects.get(pk=1)
+
+        with self.assertNumQueries(2):
+            League.objects.reorder(season, [2])
+
+        self.assertEqual(
+            [(2, 0), (1, 1)], list(season.leagues.values_list("pk", "weight"))
+        )
+
+    def test_reorder_raises_valueerror_on_ids_outside_the_collection(self):
+        season = Season.objects.get(pk=1)
+        self.assertRaises(ValueError, League.objects.reorder, season, [3])
+
+    def test_deferred_position_fields_renumbers_once_on_exit(self):
+        division = Division.objects.get(pk=1)
+
+        with deferred_position_fields(SubDivision):
+            for name in ["Red", "Green", "Black"]:
+                subdivision = SubDivision.objects.create(
+                    season=division.season,
+                    league=division.league,
+                    division=division,
+                    name=name,
+                )
+                self.assertEqual(-1, subdivision.weight)
+
+        self.assertEqual(
+            list(range(11)),
+            list(division.season.subdivisions.values_list("weight", flat=True)),
+        )
+        self.assertEqual(
+            ["Red", "Green", "Black"],
+            list(division.season.subdivisions.values_list("name", flat=True))[8:],
+        )
+
+    def test_suspend_position_fields_only_applies_to_the_current_thread(self):
+        field = position_fields(SubDivision)[0]
+        suspended = []
+
+        def check():
+            suspended.append(field in ordering._suspended_fields.get())
+
+        with suspend_position_fields(SubDivision):
+            thread = threading.Thread(target=check)
+            thread.start()
+            thread.join()
+
+            check()
+        check()
+
+        self.assertEqual([False, True, False], suspended)
+        self.assertIs(True, field._suspendable)
+
+
+class BenchmarkDataTests(TestCase):
+    def generate(self, **kwargs):
+        return BenchmarkDataGenerator(
+            seasons=2,
+            leagues_per_season=1,
+            divisions_per_league=2,
+            subdivisions_per_division=1,
+            teams_per_subdivision=2,
+            players_per_team=3,
+            staff_per_team=1,
+            documents_per_staff=1,
+            tournaments=2,
+            exhibitions=2,
+            **kwargs,
+        ).generate()
+
+    def test_counts_follow_the_requested_sizes(self):
+        counts = self.generate()
+
+        self.assertEqual(2, counts["core.Season"])
+        self.assertEqual(8, counts["team.Team"])
+        self.assertEqual(24, counts["team.Player"])
+        # One per team, one convenor per subdivision and one VP per league.
+        self.assertEqual(8 + 4 + 2, counts["team.Staff"])
+        self.assertEqual(2, counts["events.Tournament"])
+
+        for season in Season.objects.all():
+            self.assertEqual(
+                [0, 1, 2, 3],
+                list(season.teams.order_by("weight").values_list("weight", flat=True)),
+            )
+
+    def test_same_seed_generates_the_same_data(self):
+        self.generate(seed=5)
+        first = list(
+            Member.objects.order_by("pk").values_list("first_name", "last_name")
+        )
+        self.generate(seed=5)
+        second = list(
+            Member.objects.order_by("pk").values_list("first_name", "last_name")
+        )
+
+        self.assertEqual(first * 2, second)
+        self.assertEqual(4, Season.objects.count())
+
+
+class QueryBudgetTests(FixtureBasedTestCase):
+    def test_query_budget_passes_within_budget(self):
+        with query_budget(1):
+            list(Season.objects.all())
+
+    def test_query_budget_fails_over_budget(self):
+        with self.assertRaisesMessage(AssertionError, "2 queries executed"):
+            with query_budget(1):
+                list(Season.objects.all())
+                list(League.objects.all())
+
+    def test_query_budget_as_decorator(self):
+        @query_budget(0)
+        def load():
+            return list(Season.objects.all())
+
+        self.assertRaises(AssertionError, load)
+
+    def test_assert_constant_queries_fails_on_queries_per_row(self):
+        def per_row():
+            for league in League.objects.all():
+                league.season.name
+
+        def add_league():
+            League.objects.create(season=Season.objects.first(), name="Extra")
+
+        with self.assertRaises(AssertionError):
+            self.assertConstantQueries(per_row, add_league)
+
+
 class CoreUserTests(FixtureBasedTestCase):
     def test_user_username_always_matches_email(self):
         user = User.objects.first()
@@ -1,6 +1,13 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
 
-from events.models import Association, Exhibition, Rink, Tournament
+from events.models import (
+    Association,
+    Exhibition,
+    Rink,
+    Tournament,
+    TournamentListingCrawl,
+)
 
 # from daterange_filter.filter import DateRangeFilter
 
@@ -18,6 +25,15 @@ class AssociationAdmin(admin.ModelAdmin):
     ordering = ["weight"]
 
 
+class TournamentChangeList(ChangeList):
+    def get_queryset(self, request, *args, **kwargs):
+        queryset = super().get_queryset(request, *args, **kwargs)
+        # Best matches first, unless a column was picked to sort on.
+        if self.query and ORDER_VAR not in self.params:
+            queryset = queryset.order_by("-search_rank", "-pk")
+        return queryset
+
+
 @admin.register(Tournament)
 class TournamentAdmin(admin.ModelAdmin):
     # list_filter = ['association', 'verified', 'source', ('start_date', DateRangeFilter)]
@@ -32,7 +48,8 @@ class TournamentAdmin(admin.ModelAdmin):
         "inserted_by",
         "permits_count",
     )
-    search_fields = ["sanction_number", "start_date", "divisions"]
+    # Matched through Tournament.objects.search(), see get_search_results().
+    search_fields = ["name", "location", "divisions", "sanction_number"]
     ordering = [
         "verified",
         "start_date",
@@ -69,6 +86,14 @@ class TournamentAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_changelist(self, request, **kwargs):
+        return TournamentChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.search(search_term), False
+
     def permits_count(self, obj):
         return obj.travelpermit_set.count()
 
@@ -91,3 +116,23 @@ class ExhibitionAdmin(admin.ModelAdmin):
 @admin.register(Rink)
 class RinkAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(TournamentListingCrawl)
+class TournamentListingCrawlAdmin(admin.ModelAdmin):
+    list_filter = ["association", "skipped"]
+    list_display = (
+        "association",
+        "inserted",
+        "rows",
+        "skipped",
+        "tournaments_created",
+        "tournaments_updated",
+    )
+    ordering = ["-inserted"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -1,8 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class EventsConfig(AppConfig):
     name = "events"
 
-    # def ready(self):
-    #     import events.signals
+    def ready(self):
+        # import events.signals
+        from .search import reinstall_sqlite_search
+
+        post_migrate.connect(reinstall_sqlite_search, sender=self)
@@ -1,120 +1,162 @@
 """
-    I've left this script unfinished. HEO does not publish the sanction number
-    on the main search table, you must visit each events page to get that number.
-    I do not want to be hitting their site once a week and then hitting 100+ event
-    pages to check and see if we already have the sanction number in our system.
-    I let Nathan know HEO is not possible for the time being.
-
-    Why not match on title? What happens if the same title was used last year?
-    Why not match on date and title? What happens when either of those values
-    change, even in the slightest?
-
-    It scans the first page (i did not add the system to follow to the next page) and
-    finds the events sanction number on the events page.
+HEO does not publish the sanction number on its tournament listing, it is
+only shown on each event's own page. Event pages go through
+events.page_cache and are only fetched when never seen or older than
+EVENT_PAGE_MAX_AGE, and then conditionally, so a weekly run only
+downloads the pages of events added since the previous one.
+
+The listing is paginated, every page is followed up to MAX_LISTING_PAGES.
 """
+
 import datetime
 import logging
-import traceback
+from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
 
-from browser import SKBrowserBase
-
-# from selenium.common.exceptions import WebDriverException
+from events.page_cache import fetch_page
+from events.scraping import HTML_PARSER
 
 log = logging.getLogger("events.commands.get_tournament_listing")
 
-ENABLED = False
+TABLE_CLASS = "views-table"
+COLUMNS = ["Date", "Tournament Name", "HLComp", "BodyChk", "Divisions"]
 
+MAX_LISTING_PAGES = 25
+EVENT_PAGE_MAX_AGE = datetime.timedelta(days=30)
+# Sanction numbers are often published after the event, pages without one
+# are checked again sooner.
+UNSANCTIONED_EVENT_PAGE_MAX_AGE = datetime.timedelta(days=1)
 
-def scan(browser: SKBrowserBase, association):
 
-    raise ValueError("HEO is disabled at this time.")
+def parse(html, association, url=None):
+    """Reads the tournaments of one listing page, without sanction numbers.
 
-    # try:
-    #     browser.wait_until(element_id='edit-submit-tournament-listing')
-    # except AttributeError:
-    #     log.debug(f'Unable to find Apply button with id="edit-submit-tournament-listing", skipping site: {association.name} {association.tournament_listing_url}')
-    #     return None
-    # except WebDriverException:
-    #     try:
-    #         browser.save_screenshot(sub_folder='WebDriverException')
-    #     except:
-    #         log.debug(traceback.format_exc())
-    #     return None
+    Args:
+        url: URL of the page, event links are relative to it.
 
-    # with open('cache/heo-listing.html', 'w') as fw:
-    #     fw.write(browser.browser.page_source)
-    with open("cache/heo-listing.html", "r") as fo:
-        source = fo.read()
+    Returns:
+        List of row dicts holding the "Event URL" to read the sanction
+        number from, None when the page has no listing table.
+    """
+    url = url or association.tournament_listing_url
+    soup = BeautifulSoup(html, HTML_PARSER)
 
-    # soup = BeautifulSoup(browser.browser.page_source, "html.parser")
-    soup = BeautifulSoup(source, "html.parser")
-
-    table = soup.find("table", {"class": "views-table"})
-    table_body = table.find("tbody")
-
-    columns = ["Date", "Tournament Name", "HLComp", "BodyChk", "Divisions"]
+    table = soup.find("table", {"class": TABLE_CLASS})
+    if table is None:
+        log.error(f'{association}: no table with class="{TABLE_CLASS}" found')
+        return None
+    table_body = table.find("tbody") or table
 
     rows = []
 
-    for row_index, row in enumerate(table_body.find_all("tr")):
-        row_data = {}
-
+    for row in table_body.find_all("tr"):
         cols = [ele.text.strip() for ele in row.find_all("td")]
 
-        if not row_index:
+        # Heading row
+        if not cols:
             continue
 
-        for index, col in enumerate(columns):
-            row_data[col] = cols[index]
+        row_data = dict(zip(COLUMNS, cols))
 
-        link_to_event = row.find("td", {"class": "views-field-title"}).find(
-            "a", href=True
-        )["href"]
-        link_to_event = f"http://www.heominor.ca{link_to_event}"
+        title = row.find("td", {"class": "views-field-title"})
+        link = title.find("a", href=True) if title else None
+        if link is None:
+            log.error(f"{association}: no event link for {row_data}")
+            continue
+        row_data["Event URL"] = urljoin(url, link["href"])
 
         try:
-            start_raw, end_raw = row_data["Date"].split(" to ", 1)
+            start_raw, _, end_raw = row_data.get("Date", "").partition(" to ")
 
             row_data["Start Date"] = datetime.datetime.strptime(
-                start_raw, "%b %d %Y"
+                start_raw.strip(), "%b %d %Y"
             ).date()
 
             try:
                 row_data["End Date"] = datetime.datetime.strptime(
-                    end_raw, "%b %d %Y"
+                    end_raw.strip(), "%b %d %Y"
                 ).date()
             except ValueError:
                 row_data["End Date"] = row_data["Start Date"]
 
         except ValueError:
-            log.debug(traceback.format_exc())
-            log.debug(
-                "{}: bad Start/End dates, expecting dd-Mth-YYYY, received {} and {}".format(
-                    association.name, row_data["Start Date"], row_data["End Date"]
+            log.exception(
+                "{}: bad Start/End dates, expecting Mth dd YYYY to Mth dd YYYY, received {}".format(
+                    association.name, row_data.get("Date")
                 )
             )
             continue
 
-        print(row)
-        print(row_data)
+        rows.append(row_data)
+
+    return rows
+
+
+def next_page_url(html, url):
+    """URL of the listing page following this one, None on the last page."""
+    soup = BeautifulSoup(html, HTML_PARSER)
+    link = soup.select_one("li.pager-next a[href], li.pager__item--next a[href]")
+    if link is None:
+        link = soup.find("a", rel="next", href=True)
+    return urljoin(url, link["href"]) if link else None
+
+
+def _field(soup, name):
+    field = soup.find("div", {"class": f"field-name-field-{name}"})
+    if field is None:
+        return ""
+    items = field.find("div", {"class": "field-items"}) or field
+    return items.text.strip()
 
-        browser.load_url(link_to_event)
-        with open("cache/heo-listing-event.html", "w") as fw:
-            fw.write(browser.browser.page_source)
-        # with open('cache/heo-listing-event.html', 'r') as fo:
-        #     source = fo.read()
 
-        soup = BeautifulSoup(browser.browser.page_source, "html.parser")
-        # soup = BeautifulSoup(source, 'html.parser')
+def parse_event(html):
+    """Reads the sanction number and location off an event page.
 
-        sanction_number = (
-            soup.find("div", {"class": "field-name-field-sanction-number"})
-            .find("div", {"class": "field-items"})
-            .text
-        )
+    Returns:
+        {"Sanction Number": ..., "Centre": ...}, either may be blank.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    return {
+        "Sanction Number": _field(soup, "sanction-number"),
+        "Centre": _field(soup, "location") or _field(soup, "arena"),
+    }
+
+
+def fetch(session, association):
+    rows = []
+    url = association.tournament_listing_url
+    seen = set()
+
+    while url and url not in seen and len(seen) < MAX_LISTING_PAGES:
+        seen.add(url)
+
+        # Listing pages change every week, they are always revalidated.
+        html = fetch_page(session, url)
+
+        page_rows = parse(html, association, url)
+        if page_rows is None:
+            if not rows:
+                return None
+            break
+
+        rows.extend(page_rows)
+        url = next_page_url(html, url)
+
+    tournaments = []
+    for row_data in rows:
+        url = row_data["Event URL"]
+
+        event = parse_event(fetch_page(session, url, max_age=EVENT_PAGE_MAX_AGE))
+        if not event["Sanction Number"]:
+            event = parse_event(
+                fetch_page(session, url, max_age=UNSANCTIONED_EVENT_PAGE_MAX_AGE)
+            )
+        if not event["Sanction Number"]:
+            log.warning(f"{association}: no sanction number on {url}")
+            continue
 
-        row_data["Sanction Number"] = sanction_number
+        row_data.update(event)
+        tournaments.append(row_data)
 
-        return
+    return tournaments
@@ -1,81 +1,34 @@
-import datetime
-import logging
-
-from bs4 import BeautifulSoup
-from selenium.common.exceptions import WebDriverException
+from events import scraping
+
+BUTTON = "btnList"
+TABLE_CLASS = "tblBorder"
+COLUMNS = [
+    "Sanction Number",
+    "Centre",
+    "Start Date",
+    "End Date",
+    "1",
+    "2",
+    "Divisions",
+    "Category",
+]
+
+
+def parse(html, association):
+    rows = scraping.parse_listing(html, association, TABLE_CLASS, COLUMNS)
+    for row_data in rows or []:
+        row_data["Tournament Name"] = row_data["Centre"]
+    return rows
 
-log = logging.getLogger("events.commands.get_tournament_listing")
 
-ENABLED = True
+def fetch(session, association):
+    html = scraping.submit_listing_form(
+        session, association.tournament_listing_url, BUTTON
+    )
+    return parse(html, association)
 
 
 def scan(browser, association):
-
-    try:
-        browser.wait_until(element_name="btnList")
-    except AttributeError:
-        log.exception(
-            f'Unable to find submit button with name="btnList", skipping {association}'
-        )
-        return None
-    except WebDriverException:
-        try:
-            browser.save_screenshot(sub_folder="WebDriverException")
-        except:
-            log.exception("Screenshot Failure")
+    if not scraping.click_listing_button(browser, association, BUTTON, TABLE_CLASS):
         return None
-
-    browser.get_element(element_name="btnList").click()
-
-    soup = BeautifulSoup(browser.browser.page_source, "html.parser")
-
-    table = soup.find("table", {"class": "tblBorder"})
-    table_body = table.find("tbody")
-
-    columns = [
-        "Sanction Number",
-        "Centre",
-        "Start Date",
-        "End Date",
-        "1",
-        "2",
-        "Divisions",
-        "Category",
-    ]
-    rows = []
-
-    for row_index, row in enumerate(table_body.find_all("tr")):
-        row_data = {}
-
-        cols = [ele.text.strip() for ele in row.find_all("td")]
-
-        if not row_index:
-            continue
-
-        for index, col in enumerate(columns):
-            row_data[col] = cols[index]
-
-        row_data["Tournament Name"] = row_data["Centre"]
-
-        try:
-            row_data["Start Date"] = datetime.datetime.strptime(
-                row_data["Start Date"], "%d-%b-%Y"
-            ).date()
-        except ValueError:
-            log.exception(
-                "{}: bad Start/End dates, expecting dd-Mth-YYYY, received {} and {}".format(
-                    association.name, row_data["Start Date"], row_data["End Date"]
-                )
-            )
-            continue
-
-        try:
-            row_data["End Date"] = datetime.datetime.strptime(
-                row_data["End Date"], "%d-%b-%Y"
-            ).date()
-        except ValueError:
-            row_data["End Date"] = row_data["Start Date"]
-
-        rows.append(row_data)
-
-    return rows
+    return parse(browser.browser.page_source, association)
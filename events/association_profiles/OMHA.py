@@ -1,81 +1,30 @@
-import datetime
-import logging
-import time
+from events import scraping
 
-from bs4 import BeautifulSoup
-from selenium.common.exceptions import WebDriverException
+BUTTON = "btnList"
+TABLE_CLASS = "tbl-tournament"
+COLUMNS = [
+    "Sanction Number",
+    "Start Date",
+    "End Date",
+    "Tournament Name",
+    "Centre",
+    "Divisions",
+    "Details",
+]
 
-log = logging.getLogger("events.commands.get_tournament_listing")
 
-ENABLED = True
+def parse(html, association):
+    return scraping.parse_listing(html, association, TABLE_CLASS, COLUMNS)
 
 
-def scan(browser, association):
-
-    try:
-        browser.wait_until(element_name="btnList")
-    except AttributeError:
-        log.exception(
-            f'Unable to find submit button with name="btnList", skipping {association}'
-        )
-        return None
-    except WebDriverException:
-        try:
-            browser.save_screenshot(sub_folder="WebDriverException")
-        except:
-            log.exception("Screenshot Failure")
-        return None
-
-    browser.get_element(element_name="btnList").click()
-
-    time.sleep(2)
-
-    soup = BeautifulSoup(browser.browser.page_source, "html.parser")
-
-    table = soup.find("table", {"class": "tbl-tournament"})
-    table_body = table.find("tbody")
-
-    columns = [
-        "Sanction Number",
-        "Start Date",
-        "End Date",
-        "Tournament Name",
-        "Centre",
-        "Divisions",
-        "Details",
-    ]
-    rows = []
+def fetch(session, association):
+    html = scraping.submit_listing_form(
+        session, association.tournament_listing_url, BUTTON
+    )
+    return parse(html, association)
 
-    for row_index, row in enumerate(table_body.find_all("tr")):
-        row_data = {}
 
-        cols = [ele.text.strip() for ele in row.find_all("td")]
-
-        if not row_index:
-            continue
-
-        for index, col in enumerate(columns):
-            row_data[col] = cols[index]
-
-        try:
-            row_data["Start Date"] = datetime.datetime.strptime(
-                row_data["Start Date"], "%d-%b-%Y"
-            ).date()
-        except ValueError:
-            log.exception(
-                "{}: bad Start/End dates, expecting dd-Mth-YYYY, received {} and {}".format(
-                    association.name, row_data["Start Date"], row_data["End Date"]
-                )
-            )
-            continue
-
-        try:
-            row_data["End Date"] = datetime.datetime.strptime(
-                row_data["End Date"], "%d-%b-%Y"
-            ).date()
-        except ValueError:
-            row_data["End Date"] = row_data["Start Date"]
-
-        rows.append(row_data)
-
-    return rows
+def scan(browser, association):
+    if not scraping.click_listing_button(browser, association, BUTTON, TABLE_CLASS):
+        return None
+    return parse(browser.browser.page_source, association)
@@ -1 +1,94 @@
-from . import GTHL, HEO, NOHA, OMHA
+"""Scanner profiles of the Associations with a tournament listing page.
+
+Every profile is a module of this package named after its Association,
+defining some of:
+
+    fetch(session, association): Reads the listing over HTTP, see
+        events/scraping.py.
+    scan(browser, association): Reads the listing with the Selenium browser.
+    parse(html, association): Reads the rows out of a listing page.
+
+Profiles are registered below with what they are capable of and only
+imported once used, looking one up or reading its capabilities does not
+import it nor its parser.
+"""
+
+import importlib
+
+from django.utils.functional import cached_property
+
+
+class Profile:
+    """A registered profile, its module is imported on first attribute access.
+
+    Attributes:
+        name: Name of the Association scanned, and of the profile module.
+        enabled: Whether get_tournament_listing scans the Association.
+        fetches: The profile module defines fetch().
+        scans: The profile module defines scan().
+        needs_js: The listing only renders in a browser, the profile is
+            scanned with Selenium instead of fetched over HTTP.
+        paginated: The listing spans several pages the profile follows.
+        has_sanction_numbers: The listing shows sanction numbers, otherwise
+            the profile loads each event's page to read them.
+    """
+
+    def __init__(
+        self,
+        name,
+        enabled=True,
+        fetches=True,
+        scans=True,
+        needs_js=False,
+        paginated=False,
+        has_sanction_numbers=True,
+    ):
+        self.name = name
+        self.enabled = enabled
+        self.fetches = fetches
+        self.scans = scans
+        self.needs_js = needs_js
+        self.paginated = paginated
+        self.has_sanction_numbers = has_sanction_numbers
+
+    def __repr__(self):
+        return f"<Profile {self.name}>"
+
+    @cached_property
+    def module(self):
+        return importlib.import_module(f"{__name__}.{self.name}")
+
+    @property
+    def can_fetch(self):
+        """Whether the listing can be read over HTTP, without a browser."""
+        return self.fetches and not self.needs_js
+
+    @property
+    def can_scan(self):
+        return self.scans
+
+    def __getattr__(self, name):
+        # fetch, scan, parse and the module constants.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.module, name)
+
+
+registry = {}
+
+
+def register(name, **capabilities):
+    """Registers the profile module name, see Profile for the capabilities."""
+    registry[name] = Profile(name, **capabilities)
+    return registry[name]
+
+
+def get_profile(name):
+    """The registered Profile of an Association name, None when there is none."""
+    return registry.get(name)
+
+
+register("GTHL")
+register("NOHA")
+register("OMHA")
+register("HEO", scans=False, paginated=True, has_sanction_numbers=False)
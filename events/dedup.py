@@ -0,0 +1,276 @@
+"""Finding of Tournaments entered more than once.
+
+The same tournament often arrives both from a user through event_new and
+from a scanned listing, named slightly differently and with a missing or
+differently typed sanction number.
+
+Candidates are blocked by association and a window around their start
+date, and only compared when they share name trigrams, found through an
+inverted index of the block. Pairs are then scored on the similarity of
+their name and location trigrams, extracted and compared as PostgreSQL's
+pg_trgm similarity() does.
+"""
+
+import datetime
+import re
+from collections import Counter, defaultdict, deque
+from itertools import chain
+
+from django.db import transaction
+
+from events.models import Tournament
+
+WINDOW = datetime.timedelta(days=3)
+THRESHOLD = 0.45
+
+NAME_WEIGHT = 0.7
+LOCATION_WEIGHT = 0.3
+
+# Words too common in tournament names to tell two apart.
+STOP_WORDS = {"the", "annual", "tournament", "tourney", "hockey", "minor"}
+
+# Fields copied from the merged tournament when blank on the one kept.
+MERGED_FIELDS = [
+    "sanction_number",
+    "association_other",
+    "location",
+    "end_date",
+    "divisions",
+    "website",
+]
+
+_word_re = re.compile(r"[a-z0-9]+")
+
+
+def words(text):
+    return [word for word in _word_re.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def trigrams(text):
+    """Trigrams of every word of text, padded as pg_trgm pads them."""
+    grams = set()
+    for word in words(text):
+        padded = f"  {word} "
+        grams.update(padded[index : index + 3] for index in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(a, b):
+    """Shared trigrams over all trigrams of two sets, 0 to 1, as pg_trgm."""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class Candidate:
+    """The fields of a Tournament compared, prepared once."""
+
+    __slots__ = ["id", "association_id", "start_date", "sanction", "name", "location"]
+
+    def __init__(self, id, association_id, start_date, name, location, sanction_number):
+        self.id = id
+        self.association_id = association_id
+        self.start_date = start_date
+        self.sanction = "".join(words(sanction_number or ""))
+        self.name = trigrams(name)
+        self.location = trigrams(location or "")
+
+    @classmethod
+    def from_tournament(cls, tournament):
+        return cls(
+            tournament.pk,
+            tournament.association_id,
+            tournament.start_date,
+            tournament.name,
+            tournament.location,
+            tournament.sanction_number,
+        )
+
+
+def load_candidates(queryset=None):
+    """Candidates of every Tournament of queryset, read without model instances."""
+    if queryset is None:
+        queryset = Tournament.objects.all()
+    return [
+        Candidate(*values)
+        for values in queryset.values_list(
+            "id",
+            "association_id",
+            "start_date",
+            "name",
+            "location",
+            "sanction_number",
+        ).iterator(chunk_size=5000)
+    ]
+
+
+def score(a, b, name_score=None):
+    """How likely a and b are the same tournament, 0 to 1.
+
+    Returns:
+        None when both have a different sanction number, those are
+        distinct tournaments however alike.
+    """
+    if a.sanction and b.sanction:
+        return 1.0 if a.sanction == b.sanction else None
+
+    if name_score is None:
+        name_score = similarity(a.name, b.name)
+    # Without both locations the name alone decides.
+    location_score = name_score
+    if a.location and b.location:
+        location_score = similarity(a.location, b.location)
+
+    return NAME_WEIGHT * name_score + LOCATION_WEIGHT * location_score
+
+
+def find_duplicates(candidates, window=WINDOW, threshold=THRESHOLD):
+    """Pairs of candidates that are likely the same tournament.
+
+    Runs in a single pass over the candidates sorted by association and start
+    date, keeping only those within window of the current one indexed.
+
+    Args:
+        candidates: Candidate list, see load_candidates().
+        window: timedelta two start dates may be apart.
+        threshold: Minimum score() of a pair.
+
+    Returns:
+        List of (score, id, id) tuples, highest score first.
+    """
+    pairs = []
+
+    by_id = {}
+    block = deque()
+    postings = defaultdict(set)
+    sanctions = defaultdict(set)
+    association_id = object()
+
+    for candidate in sorted(candidates, key=lambda c: (c.association_id, c.start_date)):
+        if candidate.association_id != association_id:
+            association_id = candidate.association_id
+            block.clear()
+            postings.clear()
+            sanctions.clear()
+            by_id.clear()
+
+        while block and block[0].start_date < candidate.start_date - window:
+            old = block.popleft()
+            del by_id[old.id]
+            for gram in old.name:
+                postings[gram].discard(old.id)
+                if not postings[gram]:
+                    del postings[gram]
+            if old.sanction:
+                sanctions[old.sanction].discard(old.id)
+
+        # Number of name trigrams shared with every candidate of the block.
+        shared = Counter(
+            chain.from_iterable(
+                postings[gram] for gram in candidate.name if gram in postings
+            )
+        )
+        if candidate.sanction:
+            for other_id in sanctions.get(candidate.sanction, ()):
+                shared.setdefault(other_id, 0)
+
+        for other_id, count in shared.items():
+            other = by_id[other_id]
+            name_score = count / ((len(candidate.name) + len(other.name) - count) or 1)
+            # Even a perfect location could not lift the pair over threshold.
+            if (
+                not (candidate.sanction and candidate.sanction == other.sanction)
+                and NAME_WEIGHT * name_score + LOCATION_WEIGHT < threshold
+            ):
+                continue
+            pair_score = score(candidate, other, name_score)
+            if pair_score is not None and pair_score >= threshold:
+                pairs.append((round(pair_score, 3), other.id, candidate.id))
+
+        block.append(candidate)
+        by_id[candidate.id] = candidate
+        for gram in candidate.name:
+            postings[gram].add(candidate.id)
+        if candidate.sanction:
+            sanctions[candidate.sanction].add(candidate.id)
+
+    pairs.sort(key=lambda pair: (-pair[0], pair[1], pair[2]))
+    return pairs
+
+
+def group_duplicates(pairs):
+    """Groups pairs sharing a tournament, as lists of ids in id order."""
+    parents = {}
+
+    def root(node):
+        while parents.setdefault(node, node) != node:
+            parents[node] = parents[parents[node]]
+            node = parents[node]
+        return node
+
+    for _, a, b in pairs:
+        parents[root(a)] = root(b)
+
+    groups = defaultdict(list)
+    for node in parents:
+        groups[root(node)].append(node)
+    return sorted(sorted(group) for group in groups.values())
+
+
+def duplicates_of(tournament, window=WINDOW, threshold=THRESHOLD):
+    """The Tournaments likely the same as tournament, saved or not.
+
+    Returns:
+        List of (score, Tournament) tuples, highest score first.
+    """
+    candidate = Candidate.from_tournament(tournament)
+    queryset = Tournament.objects.filter(
+        association_id=tournament.association_id,
+        start_date__range=(
+            tournament.start_date - window,
+            tournament.start_date + window,
+        ),
+    ).select_related("association")
+    if tournament.pk:
+        queryset = queryset.exclude(pk=tournament.pk)
+
+    matches = []
+    for other in queryset:
+        other_score = score(candidate, Candidate.from_tournament(other))
+        if other_score is not None and other_score >= threshold:
+            matches.append((round(other_score, 3), other))
+    matches.sort(key=lambda match: (-match[0], match[1].pk))
+    return matches
+
+
+@transaction.atomic
+def merge_tournaments(keep, merge):
+    """Merges the Tournament merge into keep and deletes it.
+
+    Everything referencing merge, such as travel permits, is moved to keep
+    and blank MERGED_FIELDS of keep are filled in from merge.
+    """
+    for relation in Tournament._meta.related_objects:
+        if relation.many_to_many:
+            accessor = relation.get_accessor_name()
+            getattr(keep, accessor).add(*getattr(merge, accessor).all())
+        else:
+            relation.related_model._base_manager.filter(
+                **{relation.field.name: merge}
+            ).update(**{relation.field.name: keep})
+
+    for field in MERGED_FIELDS:
+        if not getattr(keep, field) and getattr(merge, field):
+            setattr(keep, field, getattr(merge, field))
+
+    if merge.verified and not keep.verified:
+        keep.verified = True
+        keep.verified_date = merge.verified_date
+
+    keep.notes = "\n".join(
+        filter(None, [keep.notes, f"Merged tournament {merge.pk}: {merge}"])
+    )
+    keep.save()
+    merge.delete()
+    return keep
@@ -0,0 +1,269 @@
+import hashlib
+import json
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from events.models import Tournament, TournamentListing, TournamentListingCrawl
+
+log = logging.getLogger("events.commands.get_tournament_listing")
+
+# Fields refreshed from the listing when updating. end_date is left out, end
+# dates are often corrected by hand.
+UPDATE_FIELDS = ["name", "location", "divisions", "start_date"]
+
+BATCH_SIZE = 500
+
+
+class IngestionResult:
+    """What ingest_tournament_rows() did with a listing.
+
+    Attributes:
+        created: Tournaments created.
+        updated: Tournaments whose UPDATE_FIELDS changed, when updating.
+        unchanged: Number of rows matching an existing Tournament left as is.
+        duplicates: Sanction numbers matching several existing Tournaments,
+            those rows are skipped.
+        outdated: Sanction numbers whose row differs from the existing
+            Tournament, left as is when not updating.
+        stopped: Whether a malformed row stopped the listing from being
+            read past it.
+        applied: Sanction numbers of the rows the Tournaments now match,
+            created, updated or already equal.
+    """
+
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        self.unchanged = 0
+        self.duplicates = []
+        self.outdated = []
+        self.stopped = False
+        self.applied = set()
+
+    def __str__(self):
+        return (
+            f"{len(self.created)} created, {len(self.updated)} updated, "
+            f"{self.unchanged} unchanged ({len(self.outdated)} outdated), "
+            f"{len(self.duplicates)} duplicates"
+        )
+
+
+def _row_values(association, row_data):
+    return {
+        "name": row_data["Tournament Name"],
+        "location": row_data["Centre"],
+        "divisions": row_data["Divisions"],
+        "start_date": row_data["Start Date"],
+        "end_date": row_data["End Date"],
+        "verified": True,
+        "verified_date": timezone.now(),
+        "source": "tournament_listing_url",
+        "website": association.tournament_listing_url,
+        "notes": "Added by get_tournament_listing command",
+    }
+
+
+def ingest_tournament_rows(association, rows, update=False):
+    """Creates the Tournaments of a scanned listing that do not exist yet.
+
+    Existing tournaments are matched on association and sanction number. The
+    existing sanction numbers are loaded in one query and the new
+    tournaments inserted with bulk_create(), so the number of queries does
+    not grow with the size of the listing.
+
+    Args:
+        association: Association the listing belongs to.
+        rows: Row dicts as returned by an association profile scan().
+        update: Whether to refresh UPDATE_FIELDS of existing Tournaments
+            from the listing, they are left untouched otherwise.
+
+    Returns:
+        IngestionResult
+    """
+    result = IngestionResult()
+
+    listing = {}
+    for row_data in rows:
+
+        # If the End Date comes BEFORE the Start Date, check if the Day and
+        # Month between both dates are the same. If they match, its more than
+        # likely just an invalid year value.
+        # 2019-10-30: Disabled for the time being, too many incorrect dates coming from OMHA.
+        # if row_data['Start Date'] > row_data['End Date']:
+        #     print(row_data)
+        #
+        #     if row_data['Start Date'].day == row_data['End Date'].day and \
+        #             row_data['Start Date'].month == row_data['End Date'].month:
+        #         row_data['End Date'] = row_data['End Date'].replace(year=row_data['Start Date'].year)
+        #
+        #     print(row_data)
+
+        try:
+            sanction_number = row_data["Sanction Number"]
+            values = _row_values(association, row_data)
+        except KeyError:
+            log.debug(row_data)
+            log.exception(
+                f"Stopped processing association {association} as there is something wrong."
+            )
+            result.stopped = True
+            break
+
+        # The first row of a sanction number listed twice wins.
+        listing.setdefault(sanction_number, values)
+
+    if not listing:
+        return result
+
+    existing = {}
+    for tournament in Tournament.objects.filter(association=association).only(
+        "id", "sanction_number", *UPDATE_FIELDS
+    ):
+        existing.setdefault(tournament.sanction_number, []).append(tournament)
+
+    new = []
+    for sanction_number, values in listing.items():
+        matches = existing.get(sanction_number)
+
+        if not matches:
+            new.append(
+                Tournament(
+                    association=association, sanction_number=sanction_number, **values
+                )
+            )
+            continue
+
+        if len(matches) > 1:
+            log.warning(
+                f"{association} returned multiple records for a Tournament sanction {sanction_number}"
+            )
+            result.duplicates.append(sanction_number)
+            continue
+
+        tournament = matches[0]
+        if update:
+            for field in UPDATE_FIELDS:
+                setattr(tournament, field, values[field])
+            if tournament.get_dirty_fields():
+                tournament.updated = timezone.now()
+                result.updated.append(tournament)
+            else:
+                result.unchanged += 1
+        else:
+            result.unchanged += 1
+            if any(
+                getattr(tournament, field) != values[field] for field in UPDATE_FIELDS
+            ):
+                result.outdated.append(sanction_number)
+                continue
+
+        result.applied.add(sanction_number)
+
+    with transaction.atomic():
+        result.created = Tournament.objects.bulk_create(new, batch_size=BATCH_SIZE)
+        if result.updated:
+            Tournament.objects.bulk_update(
+                result.updated, UPDATE_FIELDS + ["updated"], batch_size=BATCH_SIZE
+            )
+    result.applied.update(tournament.sanction_number for tournament in result.created)
+
+    return result
+
+
+def row_hash(row_data):
+    return hashlib.sha256(
+        json.dumps(row_data, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def listing_hash(row_hashes):
+    """Hash of a whole listing from the hashes of its rows, in any order."""
+    return hashlib.sha256(
+        "\n".join(
+            sorted(f"{key}:{value}" for key, value in row_hashes.items())
+        ).encode()
+    ).hexdigest()
+
+
+def ingest_listing(association, rows, update=False, full=False):
+    """Ingests only what changed on a listing since its previous crawl.
+
+    The hash of the listing and of each of its rows are kept in the
+    association's TournamentListing. A listing identical to the previous one
+    is skipped entirely, otherwise only its new and changed rows are handed
+    to ingest_tournament_rows(). Every call is recorded as a
+    TournamentListingCrawl.
+
+    Args:
+        association: Association the listing belongs to.
+        rows: Row dicts as returned by an association profile scan().
+        update: See ingest_tournament_rows().
+        full: Ingests every row whatever changed, e.g. to recreate
+            tournaments deleted since their row was last seen.
+
+    Returns:
+        (TournamentListingCrawl, IngestionResult), the result is None when
+        the listing was skipped.
+    """
+    previous = TournamentListing.objects.filter(association=association).first()
+    previous_hashes = previous.row_hashes if previous else {}
+
+    row_hashes = {}
+    changed = []
+    for row_data in rows:
+        key = str(row_data.get("Sanction Number"))
+        if key in row_hashes:
+            continue
+        row_hashes[key] = row_hash(row_data)
+        if full or previous_hashes.get(key) != row_hashes[key]:
+            changed.append(row_data)
+
+    crawl = TournamentListingCrawl(
+        association=association,
+        listing_hash=listing_hash(row_hashes),
+        rows=len(rows),
+    )
+
+    if not full and previous and previous.listing_hash == crawl.listing_hash:
+        crawl.skipped = True
+        crawl.save()
+        return crawl, None
+
+    crawl.new_rows = [key for key in row_hashes if key not in previous_hashes]
+    crawl.changed_rows = [
+        key
+        for key, value in row_hashes.items()
+        if key in previous_hashes and previous_hashes[key] != value
+    ]
+    crawl.removed_rows = [key for key in previous_hashes if key not in row_hashes]
+
+    result = ingest_tournament_rows(association, changed, update=update)
+    crawl.tournaments_created = len(result.created)
+    crawl.tournaments_updated = len(result.updated)
+
+    # Rows left unapplied, past a malformed row, listed under a duplicate
+    # sanction number or outdated without update, keep their previous hash
+    # so the next crawl hands them over again.
+    applied = {str(sanction_number) for sanction_number in result.applied}
+    for row_data in changed:
+        key = str(row_data.get("Sanction Number"))
+        if key in applied:
+            continue
+        if key in previous_hashes:
+            row_hashes[key] = previous_hashes[key]
+        else:
+            row_hashes.pop(key, None)
+
+    with transaction.atomic():
+        crawl.save()
+        TournamentListing.objects.update_or_create(
+            association=association,
+            defaults={
+                "listing_hash": listing_hash(row_hashes),
+                "row_hashes": row_hashes,
+            },
+        )
+
+    return crawl, result
@@ -0,0 +1,231 @@
+import base64
+import binascii
+import json
+
+from django.db.models import DateTimeField, Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from events.models import Exhibition, Tournament
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+def _tournament_row(tournament):
+    return {
+        "id": tournament.pk,
+        "start_date": tournament.start_date,
+        "name": tournament.name,
+        "association": tournament.association.name,
+        "sanction_number": tournament.sanction_number,
+        "location": tournament.location,
+        "verified": tournament.verified,
+        "divisions": tournament.divisions,
+        "website": tournament.website,
+        "url": reverse("events:tournament-details", args=[tournament.pk]),
+    }
+
+
+def _exhibition_row(exhibition):
+    return {
+        "id": exhibition.pk,
+        "start_date": exhibition.start_date,
+        "other_team": exhibition.other_team,
+        "destination": exhibition.destination,
+        "arena": exhibition.get_arena(),
+        "url": reverse("events:exhibition-details", args=[exhibition.pk]),
+    }
+
+
+# Per event type: the queryset, the sortable columns in table column order,
+# the columns searched and how a row is serialized.
+LISTINGS = {
+    "tournament": {
+        "queryset": lambda: Tournament.objects.select_related("association"),
+        "columns": [
+            "start_date",
+            "name",
+            "association__name",
+            "sanction_number",
+            "location",
+        ],
+        # Searched through Tournament.objects.search(), best matches first
+        # unless a column to sort on is given.
+        "search": None,
+        "rank": "search_rank",
+        "row": _tournament_row,
+    },
+    "exhibition": {
+        "queryset": lambda: Exhibition.objects.select_related(
+            "other_team_association", "rink"
+        ),
+        "columns": ["start_date", "other_team", "destination", "rink__name"],
+        "search": ["other_team", "destination", "rink__name", "arena"],
+        "rank": None,
+        "row": _exhibition_row,
+    },
+}
+
+
+def encode_cursor(values):
+    # isoformat() keeps the microseconds DjangoJSONEncoder would cut off.
+    return base64.urlsafe_b64encode(
+        json.dumps(values, default=lambda value: value.isoformat()).encode()
+    ).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _int(params, name, default):
+    try:
+        return int(params.get(name, default))
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number")
+
+
+def _date(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"{name} must be a YYYY-MM-DD date")
+    return parsed
+
+
+def _value(obj, path):
+    """Reads a column such as association__name off obj and its select_related objects."""
+    for name in path.split("__"):
+        obj = getattr(obj, name)
+    return obj
+
+
+class EventListing:
+    """One page of Tournaments or Exhibitions for the DataTables listing.
+
+    Understands the DataTables server-side parameters (draw, start, length,
+    search[value], order[0][column] and order[0][dir]) along with:
+
+        after: Cursor returned as next by the previous page, the page is then
+            read with a keyset condition on (sort column, id) instead of an
+            offset, which stays fast however deep the page is.
+        start_date_from, start_date_to: YYYY-MM-DD range, defaults to
+            upcoming events only.
+
+    Without order[0][column], searched tournaments are ordered by relevance
+    and everything else by start date.
+
+    Raises:
+        ValueError: On an unknown event type or invalid parameters.
+    """
+
+    def __init__(self, event_type, params):
+        if event_type not in LISTINGS:
+            raise ValueError(f"Unknown event type {event_type}")
+        self.config = LISTINGS[event_type]
+        self.params = params
+
+        self.length = min(
+            max(_int(params, "length", DEFAULT_PAGE_SIZE), 1), MAX_PAGE_SIZE
+        )
+        self.offset = max(_int(params, "start", 0), 0)
+
+        self.search = params.get("search[value]", "").strip()
+
+        columns = self.config["columns"]
+        column = _int(params, "order[0][column]", 0)
+        if not 0 <= column < len(columns):
+            raise ValueError("order[0][column] is not a sortable column")
+        self.order_column = columns[column]
+        self.descending = params.get("order[0][dir]") == "desc"
+        if self.search and self.config["rank"] and "order[0][column]" not in params:
+            self.order_column = self.config["rank"]
+            self.descending = True
+        self.start_date_from = _date(params, "start_date_from")
+        self.start_date_to = _date(params, "start_date_to")
+
+        self.cursor = params.get("after")
+        if self.cursor:
+            self.cursor = decode_cursor(self.cursor)
+
+    def base_queryset(self):
+        queryset = self.config["queryset"]()
+
+        # Exhibitions start at a date and time, tournaments on a date.
+        lookup = "start_date"
+        if isinstance(queryset.model._meta.get_field("start_date"), DateTimeField):
+            lookup = "start_date__date"
+
+        if self.start_date_from:
+            queryset = queryset.filter(**{f"{lookup}__gte": self.start_date_from})
+        elif not self.start_date_to:
+            queryset = queryset.filter(start_date__gte=timezone.now())
+        if self.start_date_to:
+            queryset = queryset.filter(**{f"{lookup}__lte": self.start_date_to})
+
+        return queryset
+
+    def filter_search(self, queryset):
+        if not self.search:
+            return queryset
+        if hasattr(queryset, "search"):
+            return queryset.search(self.search)
+        condition = Q()
+        for field in self.config["search"]:
+            condition |= Q(**{f"{field}__icontains": self.search})
+        return queryset.filter(condition)
+
+    def order(self, queryset):
+        prefix = "-" if self.descending else ""
+        return queryset.order_by(f"{prefix}{self.order_column}", f"{prefix}pk")
+
+    def after_cursor(self, queryset):
+        value, pk = self.cursor
+        lookup = "lt" if self.descending else "gt"
+        return queryset.filter(
+            Q(**{f"{self.order_column}__{lookup}": value})
+            | Q(**{self.order_column: value, f"pk__{lookup}": pk})
+        )
+
+    def page(self):
+        """Returns the page as a DataTables response dict.
+
+        next holds the cursor of the following page, None on the last page.
+        """
+        total = self.base_queryset()
+        queryset = self.filter_search(total)
+
+        page = self.order(queryset)
+        if self.cursor:
+            page = self.after_cursor(page)[: self.length + 1]
+        else:
+            page = page[self.offset : self.offset + self.length + 1]
+
+        rows = list(page)
+        next_cursor = None
+        if len(rows) > self.length:
+            rows = rows[: self.length]
+            last = rows[-1]
+            next_cursor = encode_cursor([_value(last, self.order_column), last.pk])
+
+        records_total = total.count()
+        return {
+            "draw": _int(self.params, "draw", 0),
+            "recordsTotal": records_total,
+            "recordsFiltered": queryset.count() if self.search else records_total,
+            "data": [self.config["row"](obj) for obj in rows],
+            "next": next_cursor,
+        }
@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from django.utils import timezone
+
+from events import dedup
+from events.models import Tournament
+
+
+class Command(BaseCommand):
+    help = "Lists the tournaments likely entered more than once, see events.dedup"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=dedup.WINDOW.days,
+            help="Number of days the start dates of duplicates may be apart.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=dedup.THRESHOLD,
+            help="Minimum similarity, from 0 to 1, of duplicates.",
+        )
+        parser.add_argument(
+            "--upcoming",
+            action="store_true",
+            help="Only tournaments starting today or later.",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+
+        queryset = Tournament.objects.all()
+        if options["upcoming"]:
+            queryset = queryset.filter(start_date__gte=timezone.now().date())
+
+        candidates = dedup.load_candidates(queryset)
+        pairs = dedup.find_duplicates(
+            candidates,
+            window=timezone.timedelta(days=options["days"]),
+            threshold=options["threshold"],
+        )
+        groups = dedup.group_duplicates(pairs)
+
+        scores = {}
+        for score, a, b in pairs:
+            scores.setdefault(a, score)
+            scores.setdefault(b, score)
+
+        tournaments = Tournament.objects.select_related("association").in_bulk(
+            [pk for group in groups for pk in group]
+        )
+
+        for group in groups:
+            self.stdout.write(
+                f"{reverse('events:tournament-merge', args=[group[0]])} "
+                f"(best score {max(scores[pk] for pk in group)})"
+            )
+            for pk in group:
+                tournament = tournaments[pk]
+                self.stdout.write(
+                    f"    ({pk}) {tournament.sanction_number or '-'} - "
+                    f"{tournament.start_date} - {tournament.name} - "
+                    f"{tournament.location} - {tournament.source}"
+                )
+
+        self.stdout.write(
+            f"{len(groups)} groups of duplicates among {len(candidates)} tournaments "
+            f"in {time.perf_counter() - start:.2f}s."
+        )
@@ -1,12 +1,11 @@
 import logging
 
 from django.core.management.base import BaseCommand
-from django.utils import timezone
 from django_templated_emailer.models import EmailQueue
 
-import events.association_profiles
-from browser import SKBrowserBase
-from events.models import Association, Tournament
+from events.association_profiles import get_profile
+from events.ingestion import ingest_listing
+from events.models import Association
 from project_settings import proj_settings
 
 log = logging.getLogger("events.commands.get_tournament_listing")
@@ -15,109 +14,197 @@ log = logging.getLogger("events.commands.get_tournament_listing")
 class Command(BaseCommand):
     help = "Loads tournaments from Associations that have a tournament listing page"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of listings fetched at once over HTTP, defaults to "
+            "events.scraping.DEFAULT_WORKERS.",
+        )
+        parser.add_argument(
+            "--browser",
+            action="store_true",
+            help="Scan every listing with the Selenium browser instead of HTTP.",
+        )
+        parser.add_argument(
+            "--update",
+            action="store_true",
+            help="Refresh the name, location, divisions and start date of "
+            "tournaments already loaded. End dates are never updated.",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Process every row, even of listings unchanged since the last run.",
+        )
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            "--record",
+            action="store_true",
+            help="Save every page loaded to --recordings.",
+        )
+        group.add_argument(
+            "--replay",
+            action="store_true",
+            help="Load pages from --recordings instead of the live sites.",
+        )
+        parser.add_argument(
+            "--recordings",
+            help="Directory of recorded pages, defaults to CACHE_DIR/listings.",
+        )
+
     def handle(self, *args, **options):
-        browser = None
+        # Only imported once running, along with requests and the parser.
+        from events import scraping
+
+        self.tournaments_with_incorrect_dates = []
+        self.record = options["record"]
+        self.replay = options["replay"]
+        self.recordings = options["recordings"]
+        self.update = options["update"]
+        self.full = options["full"]
 
         # Tournament.objects.filter(created__date=timezone.now().date()).delete()
 
-        tournaments_with_incorrect_dates = []
+        http_jobs = []
+        browser_jobs = []
 
         for association in Association.objects.exclude(tournament_listing_url=""):
 
-            profile = getattr(events.association_profiles, association.name, None)
+            profile = get_profile(association.name)
             if not profile:
                 self.stdout.write(f"Scanner profile for {association} not found.")
                 continue
-            elif not profile.ENABLED:
+            elif not profile.enabled:
                 self.stdout.write(f"Scanner profile disabled for {association}")
                 continue
 
-            if not browser:
-                browser = SKBrowserBase()
+            if profile.can_fetch and not (options["browser"] and profile.can_scan):
+                http_jobs.append((association, profile))
+            else:
+                browser_jobs.append((association, profile))
 
+        for association, rows, error in scraping.fetch_listings(
+            http_jobs,
+            workers=options["workers"] or scraping.DEFAULT_WORKERS,
+            session_factory=self.get_session,
+        ):
             self.stdout.write(f"{association} {association.tournament_listing_url}")
 
-            browser.load_url(association.tournament_listing_url)
-
-            try:
-                rows = profile.scan(browser, association)
-            except:
-                log.exception(f"Scan failure on {association}")
+            if error is not None:
+                log.error(f"Fetch failure on {association}", exc_info=error)
+            if rows is None:
+                profile = get_profile(association.name)
+                if profile.can_scan:
+                    self.stdout.write(f"Falling back to the browser for {association}")
+                    browser_jobs.append((association, profile))
+                else:
+                    self.stdout.write(
+                        f"See log for details on {association} as something went wrong."
+                    )
                 continue
 
-            if rows is None:
+            self.ingest(association, rows)
+
+        if browser_jobs:
+            self.scan_with_browser(browser_jobs)
+
+        if self.tournaments_with_incorrect_dates:
+            EmailQueue.queue_email(
+                template_name="System - Event Scanner - Invalid Dates Found",
+                domain=proj_settings.DOMAIN_BASE,
+                tournaments=self.tournaments_with_incorrect_dates,
+            )
+
+    def get_recordings(self, association):
+        from events import replay
+
+        recordings = replay.Recordings.for_association(association, self.recordings)
+        if self.record:
+            recordings.save_association(association)
+        return recordings
+
+    def get_session(self, association):
+        """Session fetch() is called with, on the worker threads."""
+        from events import replay, scraping
+
+        if self.replay:
+            return replay.ReplaySession(self.get_recordings(association))
+        if self.record:
+            return replay.RecordingSession(
+                self.get_recordings(association), scraping.get_session()
+            )
+        return scraping.get_session()
+
+    def get_browser(self, browser, association):
+        from events import replay
+
+        if self.replay:
+            return replay.ReplayBrowser(self.get_recordings(association))
+        if self.record:
+            return replay.RecordingBrowser(self.get_recordings(association), browser)
+        return browser
+
+    def scan_with_browser(self, jobs):
+        from events import replay
+
+        if self.replay:
+            browser = None
+        else:
+            # Only imported when needed, HTTP only crawls run without Selenium.
+            from browser import SKBrowserBase
+
+            browser = SKBrowserBase()
+
+        try:
+            for association, profile in jobs:
                 self.stdout.write(
-                    f"See log for details on {association} as something went wrong."
+                    f"{association} {association.tournament_listing_url} (browser)"
                 )
-                continue
 
-            self.stdout.write(f"{association} found {len(rows)} tournaments.")
+                association_browser = self.get_browser(browser, association)
 
-            for row_data in rows:
-
-                # If the End Date comes BEFORE the Start Date, check if the Day and
-                # Month between both dates are the same. If they match, its more than
-                # likely just an invalid year value.
-                # 2019-10-30: Disabled for the time being, too many incorrect dates coming from OMHA.
-                # if row_data['Start Date'] > row_data['End Date']:
-                #     print(row_data)
-                #
-                #     if row_data['Start Date'].day == row_data['End Date'].day and \
-                #             row_data['Start Date'].month == row_data['End Date'].month:
-                #         row_data['End Date'] = row_data['End Date'].replace(year=row_data['Start Date'].year)
-                #
-                #     print(row_data)
+                try:
+                    association_browser.load_url(association.tournament_listing_url)
+                except replay.MissingRecording:
+                    log.exception(f"No recording of {association}")
+                    continue
 
                 try:
-                    defaults = {
-                        "name": row_data["Tournament Name"],
-                        "location": row_data["Centre"],
-                        "divisions": row_data["Divisions"],
-                        "start_date": row_data["Start Date"],
-                        "end_date": row_data["End Date"],
-                        "verified": True,
-                        "verified_date": timezone.now(),
-                        "source": "tournament_listing_url",
-                        "website": association.tournament_listing_url,
-                        "notes": "Added by get_tournament_listing command",
-                    }
-
-                    t, was_created = Tournament.objects.get_or_create(
-                        association=association,
-                        sanction_number=row_data["Sanction Number"],
-                        defaults=defaults,
+                    rows = profile.scan(association_browser, association)
+                except:
+                    log.exception(f"Scan failure on {association}")
+                    continue
+
+                if rows is None:
+                    self.stdout.write(
+                        f"See log for details on {association} as something went wrong."
                     )
+                    continue
 
-                    # No longer saving updates due to us having to manually edit End Date's
-                    # if not was_created:
-                    #     core_data.base_functions.only_save_changed(
-                    #         obj=t,
-                    #         defaults=defaults,
-                    #         not_these_fields=['notes', 'verified_date']
-                    #     )
-
-                    # If the End date comes BEFORE the start date, email someone about it.
-                    if was_created and t.start_date > t.end_date:
-                        tournaments_with_incorrect_dates.append(t)
-
-                except Tournament.MultipleObjectsReturned:
-                    log.warning(
-                        f"{association} returned multiple records for a Tournament sanction {row_data['Sanction Number']}"
-                    )
+                self.ingest(association, rows)
+        finally:
+            if browser:
+                browser.quit()
 
-                except KeyError:
-                    log.debug(row_data)
-                    log.exception(
-                        f"Stopped processing association {association} as there is something wrong."
-                    )
-                    break
+    def ingest(self, association, rows):
+        crawl, result = ingest_listing(
+            association, rows, update=self.update, full=self.full
+        )
 
-        if tournaments_with_incorrect_dates:
-            EmailQueue.queue_email(
-                template_name="System - Event Scanner - Invalid Dates Found",
-                domain=proj_settings.DOMAIN_BASE,
-                tournaments=tournaments_with_incorrect_dates,
+        if result is None:
+            self.stdout.write(
+                f"{association} found {len(rows)} tournaments, unchanged since the last run."
             )
-
-        if browser:
-            browser.quit()
+            return
+
+        self.stdout.write(
+            f"{association} found {len(rows)} tournaments, "
+            f"{len(crawl.new_rows)} new and {len(crawl.changed_rows)} changed rows: "
+            f"{result}."
+        )
+
+        # If the End date comes BEFORE the start date, email someone about it.
+        self.tournaments_with_incorrect_dates.extend(
+            t for t in result.created if t.start_date > t.end_date
+        )
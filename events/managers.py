@@ -0,0 +1,101 @@
+from functools import reduce
+from operator import and_, or_
+
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+from . import search
+
+
+class TournamentQuerySet(models.QuerySet):
+    def search(self, query):
+        """Filters to the Tournaments matching every word of query, as a prefix,
+        in their name, location, divisions or sanction number, or whose host
+        association name contains query.
+
+        Uses the indexes of events/search.py where the database has them and
+        icontains otherwise.
+
+        Returns:
+            QuerySet annotated with search_rank, higher is a better match.
+            Ordering is left to the caller, e.g. order_by("-search_rank").
+        """
+        terms = search.search_terms(query)
+        if not terms:
+            return self.annotate(search_rank=models.Value(0.0))
+
+        connection = connections[self.db]
+        table = self.model._meta.db_table
+        # Association names are short and few, they are not worth indexing.
+        by_association = models.Q(association__name__icontains=query.strip())
+
+        if connection.vendor == "postgresql":
+            tsvector = search.pg_tsvector(table)
+            document = search.pg_document(table)
+            tsquery = search.pg_tsquery(terms)
+            # The trigram index covers the ILIKE, for what the parser splits
+            # differently than typed, such as sanction numbers.
+            like = "%" + " ".join(terms).replace("%", r"\%").replace("_", r"\_") + "%"
+            return (
+                self.alias(
+                    search_match=RawSQL(
+                        f"({tsvector} @@ to_tsquery('simple', %s) OR {document} ILIKE %s)",
+                        [tsquery, like],
+                        output_field=models.BooleanField(),
+                    )
+                )
+                .filter(models.Q(search_match=True) | by_association)
+                .annotate(
+                    search_rank=RawSQL(
+                        f"ts_rank({tsvector}, to_tsquery('simple', %s)) "
+                        f"+ similarity({document}, %s)",
+                        [tsquery, query],
+                        output_field=models.FloatField(),
+                    )
+                )
+            )
+
+        if connection.vendor == "sqlite" and search.has_fts_table(connection):
+            fts = search.FTS_TABLE
+            match = search.fts_query(terms)
+            return (
+                self.alias(
+                    search_match=RawSQL(
+                        f'"{table}"."id" IN '
+                        f"(SELECT rowid FROM {fts} WHERE {fts} MATCH %s)",
+                        [match],
+                        output_field=models.BooleanField(),
+                    )
+                )
+                .filter(models.Q(search_match=True) | by_association)
+                .annotate(
+                    # Rows matched on their association alone rank last.
+                    search_rank=Coalesce(
+                        RawSQL(
+                            f"(SELECT -bm25({fts}) FROM {fts} "
+                            f'WHERE {fts} MATCH %s AND rowid = "{table}"."id")',
+                            [match],
+                            output_field=models.FloatField(),
+                        ),
+                        models.Value(0.0),
+                    )
+                )
+            )
+
+        return self.filter(
+            by_association
+            | reduce(
+                and_,
+                [
+                    reduce(
+                        or_,
+                        [
+                            models.Q(**{f"{column}__icontains": term})
+                            for column in search.SEARCH_COLUMNS
+                        ],
+                    )
+                    for term in terms
+                ],
+            )
+        ).annotate(search_rank=models.Value(0.0))
@@ -0,0 +1,25 @@
+# Generated by Django 4.0.3 on 2022-03-27 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0028_alter_association_inserted_alter_association_weight_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="tournament",
+            index=models.Index(
+                fields=["start_date", "id"], name="tournament_start_date_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="exhibition",
+            index=models.Index(
+                fields=["start_date", "id"], name="exhibition_start_date_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.0.3 on 2022-03-27 11:40
+
+from django.db import migrations
+
+from events import search
+
+
+def install_search(apps, schema_editor):
+    search.install(schema_editor.connection)
+
+
+def uninstall_search(apps, schema_editor):
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0029_tournament_start_date_id_idx_exhibition_start_date_id_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, uninstall_search),
+    ]
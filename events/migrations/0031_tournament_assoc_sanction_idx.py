@@ -0,0 +1,20 @@
+# Generated by Django 4.0.3 on 2022-04-02 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0030_tournament_search"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="tournament",
+            index=models.Index(
+                fields=["association", "sanction_number"],
+                name="tournament_assoc_sanction_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,150 @@
+# Generated by Django 4.0.3 on 2022-04-03 14:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("events", "0031_tournament_assoc_sanction_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TournamentListing",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "old_sk_id",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="The old primary id for the entry",
+                        null=True,
+                        unique=True,
+                    ),
+                ),
+                ("inserted", models.DateTimeField(default=django.utils.timezone.now)),
+                ("updated", models.DateTimeField(default=django.utils.timezone.now)),
+                ("listing_hash", models.CharField(max_length=64)),
+                (
+                    "row_hashes",
+                    models.JSONField(
+                        default=dict,
+                        help_text="Hash of every row keyed by sanction number.",
+                    ),
+                ),
+                (
+                    "association",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tournament_listing",
+                        to="events.association",
+                    ),
+                ),
+                (
+                    "inserted_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(class)s_inserted",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "updated_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(class)s_updated",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="TournamentListingCrawl",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "old_sk_id",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="The old primary id for the entry",
+                        null=True,
+                        unique=True,
+                    ),
+                ),
+                ("inserted", models.DateTimeField(default=django.utils.timezone.now)),
+                ("updated", models.DateTimeField(default=django.utils.timezone.now)),
+                ("listing_hash", models.CharField(max_length=64)),
+                ("rows", models.PositiveIntegerField(default=0)),
+                (
+                    "skipped",
+                    models.BooleanField(
+                        default=False,
+                        help_text="The listing had not changed since the previous crawl, none of its rows were processed.",
+                    ),
+                ),
+                ("new_rows", models.JSONField(blank=True, default=list)),
+                ("changed_rows", models.JSONField(blank=True, default=list)),
+                ("removed_rows", models.JSONField(blank=True, default=list)),
+                ("tournaments_created", models.PositiveIntegerField(default=0)),
+                ("tournaments_updated", models.PositiveIntegerField(default=0)),
+                (
+                    "association",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="events.association",
+                    ),
+                ),
+                (
+                    "inserted_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(class)s_inserted",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "updated_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(class)s_updated",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-inserted"],
+            },
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 4.0.3 on 2022-04-05 20:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("events", "0032_tournamentlisting_tournamentlistingcrawl"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CachedPage",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "old_sk_id",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="The old primary id for the entry",
+                        null=True,
+                        unique=True,
+                    ),
+                ),
+                ("inserted", models.DateTimeField(default=django.utils.timezone.now)),
+                ("updated", models.DateTimeField(default=django.utils.timezone.now)),
+                ("url", models.URLField(max_length=2000, unique=True)),
+                ("content", models.TextField(blank=True)),
+                ("etag", models.CharField(blank=True, max_length=255)),
+                ("last_modified", models.CharField(blank=True, max_length=255)),
+                (
+                    "fetched",
+                    models.DateTimeField(help_text="When content was last downloaded."),
+                ),
+                (
+                    "checked",
+                    models.DateTimeField(
+                        help_text="When the site last confirmed content is current."
+                    ),
+                ),
+                (
+                    "inserted_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(class)s_inserted",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "updated_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(class)s_updated",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
@@ -8,6 +8,8 @@ from positions.fields import PositionField
 
 from core.model_helpers import _BaseModel
 
+from .managers import TournamentQuerySet
+
 # from travelpermits.models import TravelPermit
 
 
@@ -67,6 +69,19 @@ class Rink(_BaseModel):
 class Tournament(_BaseModel):
     class Meta:
         permissions = (("tournament_verify", "Can verify legitimacy."),)
+        indexes = [
+            # Listing order and keyset pagination, see events/listing.py
+            models.Index(
+                fields=["start_date", "id"], name="tournament_start_date_id_idx"
+            ),
+            # Matching of scanned listings, see events/ingestion.py. Not
+            # unique, tournaments entered by hand share a blank sanction
+            # number and listings have published a sanction number twice.
+            models.Index(
+                fields=["association", "sanction_number"],
+                name="tournament_assoc_sanction_idx",
+            ),
+        ]
 
     association = models.ForeignKey(
         Association, on_delete=models.CASCADE, verbose_name="Host Association"
@@ -95,6 +110,8 @@ class Tournament(_BaseModel):
 
     notes = models.TextField(blank=True)
 
+    objects = TournamentQuerySet.as_manager()
+
     def has_been_verified(self):
         self.verified = True
         self.verified_date = timezone.now()
@@ -111,6 +128,13 @@ class Tournament(_BaseModel):
 
 
 class Exhibition(_BaseModel):
+    class Meta:
+        indexes = [
+            # Listing order and keyset pagination, see events/listing.py
+            models.Index(
+                fields=["start_date", "id"], name="exhibition_start_date_id_idx"
+            ),
+        ]
 
     name = models.CharField(max_length=255, blank=True)
 
@@ -190,3 +214,65 @@ class Exhibition(_BaseModel):
         if self.other_team_association.name == "OTHER":
             return self.other_team_association_other
         return self.other_team_association
+
+
+class TournamentListing(_BaseModel):
+    """Content hashes of an Association tournament listing as of its last
+    crawl, see events.ingestion.ingest_listing()."""
+
+    association = models.OneToOneField(
+        Association, on_delete=models.CASCADE, related_name="tournament_listing"
+    )
+    listing_hash = models.CharField(max_length=64)
+    row_hashes = models.JSONField(
+        default=dict, help_text="Hash of every row keyed by sanction number."
+    )
+
+    def __str__(self):
+        return str(self.association)
+
+
+class TournamentListingCrawl(_BaseModel):
+    """What a get_tournament_listing run found on an Association listing."""
+
+    class Meta:
+        ordering = ["-inserted"]
+
+    association = models.ForeignKey(Association, on_delete=models.CASCADE)
+    listing_hash = models.CharField(max_length=64)
+    rows = models.PositiveIntegerField(default=0)
+    skipped = models.BooleanField(
+        default=False,
+        help_text="The listing had not changed since the previous crawl, "
+        "none of its rows were processed.",
+    )
+
+    # Sanction numbers compared to the previous crawl.
+    new_rows = models.JSONField(default=list, blank=True)
+    changed_rows = models.JSONField(default=list, blank=True)
+    removed_rows = models.JSONField(default=list, blank=True)
+
+    tournaments_created = models.PositiveIntegerField(default=0)
+    tournaments_updated = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.association} {self.inserted:%Y-%m-%d %H:%M}"
+
+
+class CachedPage(_BaseModel):
+    """A page fetched by the association profiles, see events/page_cache.py."""
+
+    url = models.URLField(max_length=2000, unique=True)
+    content = models.TextField(blank=True)
+
+    # Validators the site sent, to ask it whether the page changed.
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=255, blank=True)
+
+    fetched = models.DateTimeField(help_text="When content was last downloaded.")
+    checked = models.DateTimeField(
+        help_text="When the site last confirmed content is current."
+    )
+
+    def __str__(self):
+        return self.url
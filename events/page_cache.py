@@ -0,0 +1,58 @@
+"""Persistent cache of the pages fetched by the association profiles.
+
+Pages are kept in CachedPage keyed by URL along with the ETag and
+Last-Modified headers they were served with. A page checked within max_age
+is served without a request, an older one is requested conditionally so an
+unchanged page costs a 304 response instead of a download.
+"""
+
+from django.utils import timezone
+
+from events import scraping
+from events.models import CachedPage
+
+
+def fetch_page(session, url, max_age=None):
+    """Returns the HTML of url, from the cache when it is fresh enough.
+
+    Args:
+        session: requests.Session, see scraping.get_session().
+        url: Page to load.
+        max_age: timedelta a cached page is served without asking the site
+            for, None always asks.
+
+    Raises:
+        requests.RequestException: On connection failures and error responses.
+    """
+    now = timezone.now()
+    page = CachedPage.objects.filter(url=url).first()
+
+    if page and max_age is not None and page.checked >= now - max_age:
+        return page.content
+
+    headers = {}
+    if page and page.etag:
+        headers["If-None-Match"] = page.etag
+    if page and page.last_modified:
+        headers["If-Modified-Since"] = page.last_modified
+
+    response = session.get(url, headers=headers, timeout=scraping.TIMEOUT)
+
+    if page and response.status_code == 304:
+        page.checked = now
+        page.save(update_fields=["checked"])
+        return page.content
+
+    response.raise_for_status()
+
+    CachedPage.objects.update_or_create(
+        url=url,
+        defaults={
+            "content": response.text,
+            "etag": response.headers.get("ETag", ""),
+            "last_modified": response.headers.get("Last-Modified", ""),
+            "fetched": now,
+            "checked": now,
+        },
+    )
+    return response.text
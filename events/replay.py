@@ -0,0 +1,296 @@
+"""Recording and replaying of the pages the association profiles load.
+
+get_tournament_listing --record saves every page fetched, through requests
+or the browser, to a directory per Association. --replay then serves the
+profiles those pages instead of the live sites, which makes scans
+deterministic and runnable without network access, see
+benchmarks/bench_scrapers.py.
+
+Pages are keyed on the request that loads them: the method, URL and form
+data. A listing recorded through the browser replays through fetch() and
+the other way around, both submit the same form.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.utils import timezone
+
+from events import scraping
+
+
+class MissingRecording(LookupError):
+    pass
+
+
+def default_directory():
+    return Path(settings.CACHE_DIR) / "listings"
+
+
+class Recordings:
+    """The pages recorded for one Association.
+
+    Every page is saved as <key>.html along with <key>.json holding the
+    request and the URL it ended up at after redirects.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    @classmethod
+    def for_association(cls, association, directory=None):
+        """Recordings of association under directory, see default_directory()."""
+        return cls(Path(directory or default_directory()) / association.name)
+
+    @staticmethod
+    def key(method, url, data=None):
+        request = [method.upper(), url, sorted((data or {}).items())]
+        return hashlib.sha1(json.dumps(request).encode()).hexdigest()[:16]
+
+    def save(self, method, url, text, data=None, final_url=None):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        key = self.key(method, url, data)
+        (self.directory / f"{key}.html").write_text(text, encoding="utf-8")
+        (self.directory / f"{key}.json").write_text(
+            json.dumps(
+                {
+                    "method": method.upper(),
+                    "url": url,
+                    "data": data or {},
+                    "final_url": final_url or url,
+                    "recorded": timezone.now().isoformat(),
+                },
+                indent=4,
+            )
+        )
+
+    def load(self, method, url, data=None):
+        """Returns (final url, page source) of the recorded request.
+
+        Raises:
+            MissingRecording: When the request was never recorded.
+        """
+        key = self.key(method, url, data)
+        try:
+            meta = json.loads((self.directory / f"{key}.json").read_text())
+            text = (self.directory / f"{key}.html").read_text(encoding="utf-8")
+        except FileNotFoundError:
+            raise MissingRecording(f"{method.upper()} {url} {data or ''}")
+        return meta["final_url"], text
+
+    def save_association(self, association):
+        """Remembers which Association and listing URL the directory holds."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / "association.json").write_text(
+            json.dumps(
+                {
+                    "name": association.name,
+                    "tournament_listing_url": association.tournament_listing_url,
+                },
+                indent=4,
+            )
+        )
+
+    def load_association(self):
+        """The unsaved Association the recordings were made for."""
+        from events.models import Association
+
+        return Association(
+            **json.loads((self.directory / "association.json").read_text())
+        )
+
+
+class ReplayResponse:
+    status_code = 200
+
+    def __init__(self, url, text):
+        self.url = url
+        self.text = text
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+
+class RecordingSession:
+    """Wraps a requests.Session, saving the response of every request."""
+
+    def __init__(self, recordings, session):
+        self.recordings = recordings
+        self.session = session
+
+    def get(self, url, params=None, **kwargs):
+        response = self.session.get(url, params=params, **kwargs)
+        # A 304 of events.page_cache has no content to replay.
+        if response.status_code != 304:
+            self.recordings.save("GET", url, response.text, params, response.url)
+        return response
+
+    def post(self, url, data=None, **kwargs):
+        response = self.session.post(url, data=data, **kwargs)
+        self.recordings.save("POST", url, response.text, data, response.url)
+        return response
+
+
+class ReplaySession:
+    """Stands in for a requests.Session, answering from recordings only.
+
+    Raises:
+        MissingRecording: On a request that was not recorded.
+    """
+
+    def __init__(self, recordings):
+        self.recordings = recordings
+
+    def get(self, url, params=None, **kwargs):
+        return ReplayResponse(*self.recordings.load("GET", url, params))
+
+    def post(self, url, data=None, **kwargs):
+        return ReplayResponse(*self.recordings.load("POST", url, data))
+
+
+class _RecordingDriver:
+    """The recording browser's webdriver, saves the page the profile reads."""
+
+    def __init__(self, owner):
+        self._owner = owner
+
+    @property
+    def page_source(self):
+        source = self._owner._browser.browser.page_source
+        self._owner._save_pending(source)
+        return source
+
+    def __getattr__(self, name):
+        return getattr(self._owner._browser.browser, name)
+
+
+class _RecordingElement:
+    def __init__(self, owner, element, name):
+        self._owner = owner
+        self._element = element
+        self._name = name
+
+    def click(self):
+        driver = self._owner._browser.browser
+        # Keyed on the request the click makes, as fetch() would send it.
+        self._owner._pending = scraping.form_request(
+            driver.page_source, driver.current_url, self._name
+        )
+        return self._element.click()
+
+    def __getattr__(self, name):
+        return getattr(self._element, name)
+
+
+class RecordingBrowser:
+    """Wraps an SKBrowserBase, saving the pages loaded and the listing shown
+    after clicking a form button."""
+
+    def __init__(self, recordings, browser):
+        self.recordings = recordings
+        self._browser = browser
+        self._pending = None
+
+    def load_url(self, url, *args, **kwargs):
+        result = self._browser.load_url(url, *args, **kwargs)
+        driver = self._browser.browser
+        self.recordings.save("GET", url, driver.page_source, None, driver.current_url)
+        return result
+
+    def get_element(self, *args, element_name=None, **kwargs):
+        element = self._browser.get_element(*args, element_name=element_name, **kwargs)
+        if element is None or element_name is None:
+            return element
+        return _RecordingElement(self, element, element_name)
+
+    @property
+    def browser(self):
+        return _RecordingDriver(self)
+
+    def _save_pending(self, source):
+        if self._pending is None:
+            return
+        method, url, data = self._pending
+        self._pending = None
+        self.recordings.save(method, url, source, data)
+
+    def __getattr__(self, name):
+        return getattr(self._browser, name)
+
+
+class _ReplayElement:
+    def __init__(self, owner, name):
+        self._owner = owner
+        self._name = name
+
+    def click(self):
+        method, url, data = scraping.form_request(
+            self._owner.page_source, self._owner.current_url, self._name
+        )
+        self._owner._show(*self._owner.recordings.load(method, url, data))
+
+
+class ReplayBrowser:
+    """Stands in for SKBrowserBase, showing recorded pages only.
+
+    Implements what the profiles use: load_url(), wait_until() and
+    get_element() by element_name, clicking form buttons and reading
+    browser.page_source. It is its own webdriver, find_element() accepts
+    CSS selectors for the waits of events.scraping.
+
+    Raises:
+        MissingRecording: On loading a page that was not recorded.
+    """
+
+    def __init__(self, recordings):
+        self.recordings = recordings
+        self.current_url = None
+        self.page_source = ""
+        self._soup = None
+
+    @property
+    def browser(self):
+        return self
+
+    def _show(self, url, source):
+        self.current_url = url
+        self.page_source = source
+        self._soup = BeautifulSoup(source, scraping.HTML_PARSER)
+
+    def load_url(self, url, *args, **kwargs):
+        self._show(*self.recordings.load("GET", url))
+
+    def wait_until(self, element_name=None, **kwargs):
+        if self.get_element(element_name=element_name) is None:
+            raise AttributeError(f'No element with name="{element_name}"')
+
+    def get_element(self, element_name=None, **kwargs):
+        if self._soup is None or self._soup.find(attrs={"name": element_name}) is None:
+            return None
+        return _ReplayElement(self, element_name)
+
+    def find_element(self, by, value):
+        from selenium.common.exceptions import (
+            InvalidSelectorException,
+            NoSuchElementException,
+        )
+        from selenium.webdriver.common.by import By
+
+        if by != By.CSS_SELECTOR:
+            raise InvalidSelectorException(
+                f"ReplayBrowser only finds by {By.CSS_SELECTOR}"
+            )
+        element = self._soup.select_one(value) if self._soup is not None else None
+        if element is None:
+            raise NoSuchElementException(value)
+        return element
+
+    def save_screenshot(self, *args, **kwargs):
+        pass
+
+    def quit(self):
+        pass
@@ -0,0 +1,304 @@
+"""Fetching of Association tournament listings without a browser.
+
+Profiles whose listing is a plain HTML form define fetch(session, association),
+which submits the form with requests and parses the response. Those are
+fetched concurrently by fetch_listings(). Profiles only able to scan(browser,
+association) with Selenium, or whose fetch failed, are scanned afterwards by
+the get_tournament_listing command with a single browser.
+
+Selenium is imported only when a browser is used, so workers only running
+HTTP profiles need neither it nor a headless browser installed.
+"""
+
+import datetime
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from importlib.util import find_spec
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+from django.db import connections
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+log = logging.getLogger("events.commands.get_tournament_listing")
+
+DEFAULT_WORKERS = 8
+
+# Seconds to wait on a connection or a response before giving up.
+TIMEOUT = 30
+
+USER_AGENT = "Mozilla/5.0 (compatible; SportsNet tournament listing)"
+
+# BeautifulSoup parser of the profiles, lxml is several times faster than
+# the built in parser when installed.
+HTML_PARSER = "lxml" if find_spec("lxml") else "html.parser"
+
+_local = threading.local()
+
+
+def _build_session():
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    # Listings are only read, retrying the form POST is safe.
+    retries = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=("GET", "POST"),
+    )
+    adapter = HTTPAdapter(max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    """The requests.Session of the current thread.
+
+    Sessions are not safe to share across threads, each worker thread keeps
+    its own and reuses its connections for every listing it fetches.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = _build_session()
+    return session
+
+
+def form_data(form, button):
+    """The values a browser sends when the button named button of form is clicked.
+
+    Includes hidden inputs such as ASP.NET's __VIEWSTATE and
+    __EVENTVALIDATION, which the listing pages reject postbacks without.
+    """
+    data = {}
+
+    for field in form.find_all(["input", "select", "textarea"]):
+        name = field.get("name")
+        if not name or field.has_attr("disabled"):
+            continue
+
+        if field.name == "select":
+            option = field.find("option", selected=True) or field.find("option")
+            if option is not None:
+                data[name] = option.get("value", option.text)
+            continue
+
+        if field.name == "textarea":
+            data[name] = field.text
+            continue
+
+        input_type = field.get("type", "text").lower()
+        if input_type in ("submit", "button", "image", "reset", "file"):
+            if name == button:
+                data[name] = field.get("value", "")
+            continue
+        if input_type in ("checkbox", "radio") and not field.has_attr("checked"):
+            continue
+        data[name] = field.get("value", "on" if input_type == "checkbox" else "")
+
+    return data
+
+
+def form_request(html, url, button):
+    """The request a browser makes when the button named button is clicked.
+
+    Args:
+        html: Source of the page holding the form.
+        url: URL the page was loaded from, form actions are relative to it.
+        button: name attribute of the submit button.
+
+    Returns:
+        (method, url, data) tuple.
+
+    Raises:
+        ValueError: When the page has no such button.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    button_field = soup.find(attrs={"name": button})
+    form = button_field.find_parent("form") if button_field else None
+    if form is None:
+        raise ValueError(f'No form with a button named "{button}" on {url}')
+
+    return (
+        form.get("method", "get").upper(),
+        urljoin(url, form.get("action") or ""),
+        form_data(form, button),
+    )
+
+
+def submit_listing_form(session, url, button):
+    """Loads url and submits the form holding the button named button.
+
+    Args:
+        session: requests.Session, see get_session().
+        url: The Association tournament_listing_url.
+        button: name attribute of the submit button to click.
+
+    Returns:
+        HTML of the page the form submits to.
+
+    Raises:
+        ValueError: When the page has no such button.
+        requests.RequestException: On connection failures and error responses.
+    """
+    response = session.get(url, timeout=TIMEOUT)
+    response.raise_for_status()
+
+    method, action, data = form_request(response.text, response.url, button)
+
+    if method == "POST":
+        response = session.post(action, data=data, timeout=TIMEOUT)
+    else:
+        response = session.get(action, params=data, timeout=TIMEOUT)
+    response.raise_for_status()
+
+    return response.text
+
+
+def parse_listing(html, association, table_class, columns):
+    """Reads the tournaments out of a listing table.
+
+    The first row is the heading and skipped. Rows with an unreadable start
+    date are skipped, an unreadable end date is replaced by the start date.
+
+    Args:
+        html: Page source.
+        association: Association the listing belongs to, for logging.
+        table_class: class attribute of the listing table.
+        columns: Names of the table columns in order, the row dict keys.
+
+    Returns:
+        List of row dicts for ingest_tournament_rows(), None when the page
+        has no listing table.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+
+    table = soup.find("table", {"class": table_class})
+    if table is None:
+        log.error(f'{association}: no table with class="{table_class}" found')
+        return None
+    table_body = table.find("tbody") or table
+
+    rows = []
+
+    for row_index, row in enumerate(table_body.find_all("tr")):
+        row_data = {}
+
+        cols = [ele.text.strip() for ele in row.find_all("td")]
+
+        if not row_index:
+            continue
+
+        for index, col in enumerate(columns):
+            row_data[col] = cols[index]
+
+        try:
+            row_data["Start Date"] = datetime.datetime.strptime(
+                row_data["Start Date"], "%d-%b-%Y"
+            ).date()
+        except ValueError:
+            log.exception(
+                "{}: bad Start/End dates, expecting dd-Mth-YYYY, received {} and {}".format(
+                    association.name, row_data["Start Date"], row_data["End Date"]
+                )
+            )
+            continue
+
+        try:
+            row_data["End Date"] = datetime.datetime.strptime(
+                row_data["End Date"], "%d-%b-%Y"
+            ).date()
+        except ValueError:
+            row_data["End Date"] = row_data["Start Date"]
+
+        rows.append(row_data)
+
+    return rows
+
+
+def click_listing_button(browser, association, button, table_class):
+    """Selenium fallback of submit_listing_form(), clicks the button named
+    button and waits for the listing table to load.
+
+    Returns:
+        Whether the listing table loaded, details are logged when not.
+    """
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    try:
+        browser.wait_until(element_name=button)
+    except AttributeError:
+        log.exception(
+            f'Unable to find submit button with name="{button}", skipping {association}'
+        )
+        return False
+    except WebDriverException:
+        try:
+            browser.save_screenshot(sub_folder="WebDriverException")
+        except Exception:
+            log.exception("Screenshot Failure")
+        return False
+
+    browser.get_element(element_name=button).click()
+
+    try:
+        WebDriverWait(browser.browser, TIMEOUT).until(
+            expected_conditions.presence_of_element_located(
+                (By.CSS_SELECTOR, f"table.{table_class}")
+            )
+        )
+    except TimeoutException:
+        log.error(f'{association}: table with class="{table_class}" never loaded')
+        return False
+
+    return True
+
+
+def _fetch(profile, association, session_factory):
+    try:
+        return profile.fetch(session_factory(association), association)
+    finally:
+        # Connections are per thread, one opened by the profile would
+        # otherwise stay open for as long as the pool's thread.
+        connections.close_all()
+
+
+def _thread_session(association):
+    return get_session()
+
+
+def fetch_listings(jobs, workers=DEFAULT_WORKERS, session_factory=_thread_session):
+    """Fetches the listings of many Associations concurrently.
+
+    Profiles run on worker threads, rows are handed back to the calling
+    thread for ingestion. Only events.page_cache should touch the database
+    from a profile.
+
+    Args:
+        jobs: (association, profile) pairs, every profile defining fetch().
+        workers: Maximum number of listings fetched at once.
+        session_factory: Called on the worker thread with the association
+            to get the session to fetch with, defaults to get_session().
+            See events.replay for recording and replaying sessions.
+
+    Yields:
+        (association, rows, error) as each listing completes. rows is None
+        when the fetch raised error or found no listing.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_fetch, profile, association, session_factory): association
+            for association, profile in jobs
+        }
+        for future in as_completed(futures):
+            association = futures[future]
+            try:
+                yield association, future.result(), None
+            except Exception as e:
+                yield association, None, e
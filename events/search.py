@@ -0,0 +1,152 @@
+"""Database side full-text search over Tournaments.
+
+PostgreSQL: GIN indexes on a tsvector and a pg_trgm expression of the
+searched columns, the database keeps them current on every write.
+
+SQLite: an external content FTS5 table kept current by triggers, so rows
+written with bulk_create() or update() are indexed as well.
+
+Other databases, and SQLite builds without FTS5, fall back to icontains,
+see TournamentQuerySet.search().
+"""
+
+import re
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+SEARCH_COLUMNS = ("name", "location", "divisions", "sanction_number")
+
+FTS_TABLE = "events_tournament_fts"
+
+_fts_tables = {}
+
+
+def pg_document(table=None):
+    """The searched document, queries must repeat the indexed expression for
+    the indexes to apply.
+
+    Args:
+        table: Table name to qualify the columns with.
+    """
+    prefix = f'"{table}".' if table else ""
+    return " || ' ' || ".join(f'{prefix}"{column}"' for column in SEARCH_COLUMNS)
+
+
+def pg_tsvector(table=None):
+    return f"to_tsvector('simple', {pg_document(table)})"
+
+
+def search_terms(query):
+    """Lower cased words of query, punctuation is ignored."""
+    return re.findall(r"\w+", query.lower())
+
+
+def pg_tsquery(terms):
+    """Prefix matches of every term, e.g. 'spring':* & 'classic':*"""
+    return " & ".join(f"'{term}':*" for term in terms)
+
+
+def fts_query(terms):
+    """Prefix matches of every term, e.g. "spring"* "classic"*"""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _postgresql_install(cursor):
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS tournament_search_tsv_idx "
+        f"ON events_tournament USING gin ({pg_tsvector()})"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS tournament_search_trgm_idx "
+        f"ON events_tournament USING gin (({pg_document()}) gin_trgm_ops)"
+    )
+
+
+def _sqlite_install(cursor):
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+    old_values = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+
+    cursor.execute(
+        f"SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = '{FTS_TABLE}'"
+    )
+    created = cursor.fetchone() is None
+
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{columns}, content='events_tournament', content_rowid='id', prefix='2 3')"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert "
+        "AFTER INSERT ON events_tournament BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); "
+        "END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete "
+        "AFTER DELETE ON events_tournament BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values}); "
+        "END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update "
+        f"AFTER UPDATE OF {columns} ON events_tournament BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); "
+        "END"
+    )
+
+    if created:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def install(connection):
+    """Creates the search indexes, FTS table and triggers when missing.
+
+    Safe to run repeatedly. Called by the events migrations and after every
+    migrate on SQLite, whose table rebuilds drop the triggers.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            _postgresql_install(cursor)
+        elif connection.vendor == "sqlite":
+            if "events_tournament" not in connection.introspection.table_names(cursor):
+                return
+            try:
+                _sqlite_install(cursor)
+            except OperationalError:
+                # SQLite built without FTS5, search() falls back to icontains.
+                pass
+    _fts_tables.pop(connection.alias, None)
+
+
+def uninstall(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("DROP INDEX IF EXISTS tournament_search_tsv_idx")
+            cursor.execute("DROP INDEX IF EXISTS tournament_search_trgm_idx")
+        elif connection.vendor == "sqlite":
+            for trigger in ("insert", "delete", "update"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    _fts_tables.pop(connection.alias, None)
+
+
+def reinstall_sqlite_search(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate receiver, SQLite drops the triggers whenever a migration
+    rebuilds the events_tournament table."""
+    connection = connections[using]
+    if connection.vendor == "sqlite":
+        install(connection)
+
+
+def has_fts_table(connection):
+    """Whether the SQLite FTS5 table exists, checked once per connection alias."""
+    if connection.alias not in _fts_tables:
+        _fts_tables[connection.alias] = (
+            FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_tables[connection.alias]
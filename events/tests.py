@@ -1,11 +1,29 @@
+import tempfile
+from unittest import mock
+
+from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.db.utils import IntegrityError
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
 from django.urls import reverse
 from django.urls.exceptions import NoReverseMatch
 from django.utils import timezone
 
-from .models import Association, Rink, Tournament
+from core.test_helpers import QueryBudgetMixin, query_budget
+
+from . import dedup, page_cache, replay, scraping
+from .admin import TournamentAdmin
+from .association_profiles import HEO, NOHA, Profile, get_profile, registry
+from .ingestion import ingest_listing, ingest_tournament_rows, row_hash
+from .models import (
+    Association,
+    CachedPage,
+    Exhibition,
+    Rink,
+    Tournament,
+    TournamentListing,
+    TournamentListingCrawl,
+)
 
 # from core.test_helpers import FixtureBasedTestCase
 
@@ -48,7 +66,661 @@ class RinkTests(TestCase):
         )
 
 
-class TournamentViewsTests(TestCase):
+LISTING_FORM = """
+<form method="post" action="./Tournaments.aspx" id="form1">
+<input type="hidden" name="__VIEWSTATE" value="state" />
+<input type="hidden" name="__EVENTVALIDATION" value="valid" />
+<input type="text" name="txtSearch" />
+<input type="checkbox" name="chkPast" />
+<select name="ddlSeason"><option value="2021">2021</option>
+<option value="2022" selected>2022</option></select>
+<input type="submit" name="btnList" value="List" />
+<input type="submit" name="btnExport" value="Export" />
+</form>
+"""
+
+NOHA_LISTING = """
+<table class="tblBorder"><tbody>
+<tr><td>Sanction</td><td>Centre</td><td>Start</td><td>End</td>
+<td></td><td></td><td>Divisions</td><td>Category</td></tr>
+<tr><td>N-1</td><td>North Bay</td><td>07-Jan-2022</td><td>09-Jan-2022</td>
+<td></td><td></td><td>U11</td><td>AA</td></tr>
+<tr><td>N-2</td><td>Sudbury</td><td>14-Jan-2022</td><td>TBA</td>
+<td></td><td></td><td>U13</td><td>A</td></tr>
+<tr><td>N-3</td><td>Timmins</td><td>unknown</td><td>unknown</td>
+<td></td><td></td><td>U15</td><td>A</td></tr>
+</tbody></table>
+"""
+
+
+class FakeResponse:
+    def __init__(self, url, text, status_code=200, headers=None):
+        self.url = url
+        self.text = text
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """Answers requests with pages in order, a page is the HTML or a
+    (status code, headers, HTML) tuple."""
+
+    def __init__(self, *pages):
+        self.pages = list(pages)
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append(("GET", url, kwargs.get("params")))
+        self.headers = kwargs.get("headers", {})
+        page = self.pages.pop(0)
+        if isinstance(page, tuple):
+            status_code, headers, text = page
+            return FakeResponse(url, text, status_code, headers)
+        return FakeResponse(url, page)
+
+    def post(self, url, data=None, **kwargs):
+        self.requests.append(("POST", url, data))
+        return FakeResponse(url, self.pages.pop(0))
+
+
+class ProfileRegistryTests(TestCase):
+    def test_get_profile(self):
+        profile = get_profile("HEO")
+
+        self.assertTrue(profile.paginated)
+        self.assertFalse(profile.has_sanction_numbers)
+        self.assertIsNone(get_profile("Unknown"))
+
+    def test_module_imported_on_first_use(self):
+        profile = Profile("NOHA")
+
+        self.assertTrue(profile.can_fetch)
+        self.assertTrue(profile.can_scan)
+        self.assertNotIn("module", profile.__dict__)
+
+        self.assertIs(NOHA, profile.module)
+        self.assertEqual(NOHA.parse, profile.parse)
+
+    def test_needs_js_is_never_fetched(self):
+        self.assertFalse(Profile("NOHA", needs_js=True).can_fetch)
+
+    def test_registered_capabilities_match_the_modules(self):
+        for profile in registry.values():
+            self.assertEqual(profile.fetches, hasattr(profile.module, "fetch"))
+            self.assertEqual(profile.scans, hasattr(profile.module, "scan"))
+
+
+class PageCacheTests(TestCase):
+    url = "https://example.com/event/1"
+
+    def test_fetches_unseen_page(self):
+        session = FakeSession((200, {"ETag": '"v1"'}, "<p>1</p>"))
+
+        self.assertEqual("<p>1</p>", page_cache.fetch_page(session, self.url))
+
+        page = CachedPage.objects.get(url=self.url)
+        self.assertEqual('"v1"', page.etag)
+        self.assertEqual({}, session.headers)
+
+    def test_fresh_page_served_without_request(self):
+        page_cache.fetch_page(FakeSession("<p>1</p>"), self.url)
+        session = FakeSession()
+
+        content = page_cache.fetch_page(
+            session, self.url, max_age=timezone.timedelta(days=1)
+        )
+
+        self.assertEqual("<p>1</p>", content)
+        self.assertEqual([], session.requests)
+
+    def test_stale_page_revalidated(self):
+        page_cache.fetch_page(
+            FakeSession(
+                (200, {"ETag": '"v1"', "Last-Modified": "Sat, 01 Jan 2022"}, "<p>1</p>")
+            ),
+            self.url,
+        )
+        CachedPage.objects.update(checked=timezone.now() - timezone.timedelta(days=2))
+        session = FakeSession((304, {}, ""))
+
+        content = page_cache.fetch_page(
+            session, self.url, max_age=timezone.timedelta(days=1)
+        )
+
+        self.assertEqual("<p>1</p>", content)
+        self.assertEqual(
+            {"If-None-Match": '"v1"', "If-Modified-Since": "Sat, 01 Jan 2022"},
+            session.headers,
+        )
+        self.assertGreater(
+            CachedPage.objects.get().checked,
+            timezone.now() - timezone.timedelta(hours=1),
+        )
+
+    def test_changed_page_replaced(self):
+        page_cache.fetch_page(
+            FakeSession((200, {"ETag": '"v1"'}, "<p>1</p>")), self.url
+        )
+
+        content = page_cache.fetch_page(
+            FakeSession((200, {"ETag": '"v2"'}, "<p>2</p>")), self.url
+        )
+
+        self.assertEqual("<p>2</p>", content)
+        self.assertEqual('"v2"', CachedPage.objects.get().etag)
+
+
+def heo_listing(*events, next_page=None):
+    rows = "".join(
+        f"<tr><td>Jan 0{number} 2022 to Jan 0{number + 2} 2022</td>"
+        f'<td class="views-field-title"><a href="/event/{number}">Cup {number}</a></td>'
+        "<td>No</td><td>Yes</td><td>U11</td></tr>"
+        for number in events
+    )
+    pager = (
+        f'<li class="pager-next"><a href="{next_page}">next</a></li>'
+        if next_page
+        else ""
+    )
+    return (
+        '<table class="views-table"><thead><tr><th>Date</th></tr></thead>'
+        f"<tbody>{rows}</tbody></table><ul>{pager}</ul>"
+    )
+
+
+def heo_event(sanction_number):
+    return (
+        '<div class="field-name-field-sanction-number">'
+        f'<div class="field-items">{sanction_number}</div></div>'
+        '<div class="field-name-field-location">'
+        '<div class="field-items">Kanata</div></div>'
+    )
+
+
+class HEOTests(TestCase):
+    def setUp(self):
+        self.association = Association(
+            name="HEO", tournament_listing_url="https://example.com/tournaments"
+        )
+
+    def test_fetch_follows_pagination_and_event_pages(self):
+        session = FakeSession(
+            heo_listing(1, next_page="/tournaments?page=1"),
+            heo_listing(2),
+            heo_event("H-1"),
+            heo_event(""),
+        )
+
+        rows = HEO.fetch(session, self.association)
+
+        self.assertEqual(
+            [
+                "https://example.com/tournaments",
+                "https://example.com/tournaments?page=1",
+                "https://example.com/event/1",
+                "https://example.com/event/2",
+            ],
+            [url for method, url, data in session.requests],
+        )
+        # Events without a sanction number yet are left for a later run.
+        self.assertEqual(1, len(rows))
+        self.assertEqual("H-1", rows[0]["Sanction Number"])
+        self.assertEqual("Kanata", rows[0]["Centre"])
+        self.assertEqual(timezone.datetime(2022, 1, 3).date(), rows[0]["End Date"])
+
+    def test_known_event_pages_not_fetched_again(self):
+        HEO.fetch(FakeSession(heo_listing(1), heo_event("H-1")), self.association)
+        session = FakeSession(heo_listing(1, 2), heo_event("H-2"))
+
+        rows = HEO.fetch(session, self.association)
+
+        self.assertEqual(["H-1", "H-2"], [row["Sanction Number"] for row in rows])
+        self.assertEqual(2, len(session.requests))
+
+
+class ListingRowsTestCase(TestCase):
+    def setUp(self):
+        self.association = Association.objects.create(
+            name="NOHA", tournament_listing_url="https://example.com/t/List.aspx"
+        )
+        self.start = timezone.now().date()
+
+    def row(self, number, **values):
+        row = {
+            "Sanction Number": f"N-{number}",
+            "Tournament Name": f"Classic {number}",
+            "Centre": "North Bay",
+            "Divisions": "U11",
+            "Start Date": self.start,
+            "End Date": self.start + timezone.timedelta(days=2),
+        }
+        row.update(values)
+        return row
+
+
+class IngestionTests(ListingRowsTestCase):
+    def test_creates_new_tournaments_only(self):
+        ingest_tournament_rows(self.association, [self.row(1)])
+
+        with query_budget(4):
+            result = ingest_tournament_rows(
+                self.association, [self.row(number) for number in range(1, 51)]
+            )
+
+        self.assertEqual(49, len(result.created))
+        self.assertEqual(1, result.unchanged)
+        self.assertEqual(
+            50, Tournament.objects.filter(association=self.association).count()
+        )
+
+    def test_rows_listed_twice_are_created_once(self):
+        result = ingest_tournament_rows(
+            self.association, [self.row(1), self.row(1, **{"Tournament Name": "B"})]
+        )
+
+        self.assertEqual(["Classic 1"], [t.name for t in result.created])
+
+    def test_existing_tournaments_left_untouched(self):
+        ingest_tournament_rows(self.association, [self.row(1)])
+
+        result = ingest_tournament_rows(
+            self.association, [self.row(1, **{"Tournament Name": "Renamed"})]
+        )
+
+        self.assertEqual([], result.updated)
+        self.assertEqual("Classic 1", Tournament.objects.get().name)
+
+    def test_update(self):
+        ingest_tournament_rows(self.association, [self.row(1), self.row(2)])
+        end_date = self.start + timezone.timedelta(days=5)
+
+        result = ingest_tournament_rows(
+            self.association,
+            [
+                self.row(1, **{"Tournament Name": "Renamed", "End Date": end_date}),
+                self.row(2),
+            ],
+            update=True,
+        )
+
+        self.assertEqual(1, len(result.updated))
+        self.assertEqual(1, result.unchanged)
+        tournament = Tournament.objects.get(sanction_number="N-1")
+        self.assertEqual("Renamed", tournament.name)
+        # End dates are corrected by hand and never updated.
+        self.assertEqual(self.start + timezone.timedelta(days=2), tournament.end_date)
+
+    def test_duplicate_sanction_numbers_skipped(self):
+        ingest_tournament_rows(self.association, [self.row(1)])
+        Tournament.objects.create(
+            association=self.association,
+            sanction_number="N-1",
+            name="Copy",
+            location="North Bay",
+            start_date=self.start,
+        )
+
+        result = ingest_tournament_rows(self.association, [self.row(1)], update=True)
+
+        self.assertEqual(["N-1"], result.duplicates)
+        self.assertEqual([], result.updated)
+
+
+class IngestListingTests(ListingRowsTestCase):
+    def test_unchanged_listing_skipped(self):
+        rows = [self.row(1), self.row(2)]
+        ingest_listing(self.association, rows)
+
+        crawl, result = ingest_listing(self.association, list(reversed(rows)))
+
+        self.assertTrue(crawl.skipped)
+        self.assertIsNone(result)
+        self.assertEqual(2, TournamentListingCrawl.objects.count())
+
+    def test_only_changed_rows_ingested(self):
+        ingest_listing(self.association, [self.row(1), self.row(2)])
+        Tournament.objects.filter(sanction_number="N-1").delete()
+
+        crawl, result = ingest_listing(
+            self.association,
+            [self.row(2, **{"Tournament Name": "Renamed"}), self.row(3)],
+            update=True,
+        )
+
+        self.assertEqual(["N-3"], crawl.new_rows)
+        self.assertEqual(["N-2"], crawl.changed_rows)
+        self.assertEqual(["N-1"], crawl.removed_rows)
+        self.assertEqual(["N-3"], [t.sanction_number for t in result.created])
+        self.assertEqual(1, crawl.tournaments_updated)
+        self.assertEqual(
+            {"N-2", "N-3"},
+            set(TournamentListing.objects.get().row_hashes),
+        )
+
+    def test_rows_left_outdated_are_updated_later(self):
+        ingest_listing(self.association, [self.row(1), self.row(2)])
+        rows = [self.row(1, **{"Tournament Name": "Renamed"}), self.row(2)]
+
+        crawl, result = ingest_listing(self.association, rows)
+
+        self.assertEqual(["N-1"], result.outdated)
+        self.assertEqual(
+            "Classic 1", Tournament.objects.get(sanction_number="N-1").name
+        )
+
+        crawl, result = ingest_listing(self.association, rows, update=True)
+
+        self.assertFalse(crawl.skipped)
+        self.assertEqual(["N-1"], [t.sanction_number for t in result.updated])
+        self.assertEqual("Renamed", Tournament.objects.get(sanction_number="N-1").name)
+
+        crawl, result = ingest_listing(self.association, rows, update=True)
+
+        self.assertTrue(crawl.skipped)
+
+    def test_duplicate_rows_ingested_again(self):
+        ingest_listing(self.association, [self.row(1)])
+        Tournament.objects.create(
+            association=self.association,
+            sanction_number="N-1",
+            name="Copy",
+            location="North Bay",
+            start_date=self.start,
+        )
+        rows = [self.row(1, **{"Tournament Name": "Renamed"})]
+
+        crawl, result = ingest_listing(self.association, rows, update=True)
+
+        self.assertEqual(["N-1"], result.duplicates)
+        self.assertEqual(
+            row_hash(self.row(1)), TournamentListing.objects.get().row_hashes["N-1"]
+        )
+
+        Tournament.objects.filter(name="Copy").delete()
+        crawl, result = ingest_listing(self.association, rows, update=True)
+
+        self.assertEqual(1, len(result.updated))
+
+    def test_full(self):
+        ingest_listing(self.association, [self.row(1)])
+        Tournament.objects.all().delete()
+
+        crawl, result = ingest_listing(self.association, [self.row(1)], full=True)
+
+        self.assertFalse(crawl.skipped)
+        self.assertEqual(1, len(result.created))
+
+
+class DedupTests(TestCase):
+    def setUp(self):
+        self.association = Association.objects.create(name="NOHA")
+        self.start = timezone.now().date()
+
+    def tournament(self, name, days=0, **values):
+        values.setdefault("association", self.association)
+        values.setdefault("location", "North Bay")
+        return Tournament.objects.create(
+            name=name,
+            start_date=self.start + timezone.timedelta(days=days),
+            **values,
+        )
+
+    def find(self):
+        return dedup.find_duplicates(dedup.load_candidates())
+
+    def test_renamed_tournament_within_window(self):
+        first = self.tournament("North Bay Spring Classic", sanction_number="N-1")
+        second = self.tournament("The Annual North Bay Spring Classic Tournament", 1)
+
+        self.assertEqual([(1.0, first.pk, second.pk)], self.find())
+
+    def test_outside_window_or_association(self):
+        self.tournament("North Bay Spring Classic")
+        self.tournament("North Bay Spring Classic", 7)
+        self.tournament(
+            "North Bay Spring Classic",
+            association=Association.objects.create(name="OMHA"),
+        )
+
+        self.assertEqual([], self.find())
+
+    def test_different_sanction_numbers(self):
+        self.tournament("North Bay Spring Classic", sanction_number="N-1")
+        self.tournament("North Bay Spring Classic", sanction_number="N-2")
+
+        self.assertEqual([], self.find())
+
+    def test_same_sanction_number(self):
+        first = self.tournament("Spring Classic", sanction_number="n-1")
+        second = self.tournament("Blizzard Cup", 2, sanction_number="N 1")
+
+        self.assertEqual([(1.0, first.pk, second.pk)], self.find())
+
+    def test_different_names(self):
+        self.tournament("North Bay Spring Classic")
+        self.tournament("Sudbury Blizzard Cup", location="Sudbury")
+
+        self.assertEqual([], self.find())
+
+    def test_group_duplicates(self):
+        groups = dedup.group_duplicates([(1.0, 1, 2), (0.9, 2, 3), (0.8, 5, 4)])
+
+        self.assertEqual([[1, 2, 3], [4, 5]], groups)
+
+    def test_duplicates_of(self):
+        existing = self.tournament("North Bay Spring Classic")
+        new = Tournament(
+            association=self.association,
+            name="North Bay Spring Classic Tournament",
+            location="North Bay",
+            start_date=self.start + timezone.timedelta(days=1),
+        )
+
+        self.assertEqual(
+            [existing], [duplicate for _, duplicate in dedup.duplicates_of(new)]
+        )
+        new.name = "Sudbury Blizzard Cup"
+        self.assertEqual([], dedup.duplicates_of(new))
+
+    def test_merge_tournaments(self):
+        keep = self.tournament("North Bay Spring Classic", location="")
+        merge = self.tournament(
+            "North Bay Spring Classic",
+            sanction_number="N-1",
+            divisions="U11",
+            verified=True,
+        )
+        merged_id = merge.pk
+
+        dedup.merge_tournaments(keep, merge)
+
+        keep.refresh_from_db()
+        self.assertEqual("N-1", keep.sanction_number)
+        self.assertEqual("North Bay", keep.location)
+        self.assertEqual("U11", keep.divisions)
+        self.assertTrue(keep.verified)
+        self.assertIn(f"Merged tournament {merged_id}", keep.notes)
+        self.assertFalse(Tournament.objects.filter(pk=merged_id).exists())
+
+
+class ScrapingTests(TestCase):
+    def setUp(self):
+        self.association = Association(
+            name="NOHA", tournament_listing_url="https://example.com/t/List.aspx"
+        )
+
+    def test_submit_listing_form_posts_hidden_fields_and_button(self):
+        session = FakeSession(LISTING_FORM, NOHA_LISTING)
+
+        rows = NOHA.fetch(session, self.association)
+
+        method, url, data = session.requests[-1]
+        self.assertEqual("POST", method)
+        self.assertEqual("https://example.com/t/Tournaments.aspx", url)
+        self.assertEqual(
+            {
+                "__VIEWSTATE": "state",
+                "__EVENTVALIDATION": "valid",
+                "txtSearch": "",
+                "ddlSeason": "2022",
+                "btnList": "List",
+            },
+            data,
+        )
+        self.assertEqual(2, len(rows))
+
+    def test_submit_listing_form_without_button(self):
+        session = FakeSession("<form></form>")
+        with self.assertRaises(ValueError):
+            scraping.submit_listing_form(session, "https://example.com", "btnList")
+
+    def test_parse(self):
+        rows = NOHA.parse(NOHA_LISTING, self.association)
+
+        self.assertEqual(["N-1", "N-2"], [row["Sanction Number"] for row in rows])
+        self.assertEqual("North Bay", rows[0]["Tournament Name"])
+        self.assertEqual(timezone.datetime(2022, 1, 9).date(), rows[0]["End Date"])
+        # Unreadable end dates fall back to the start date.
+        self.assertEqual(rows[1]["Start Date"], rows[1]["End Date"])
+
+    def test_parse_without_table(self):
+        self.assertIsNone(NOHA.parse("<html></html>", self.association))
+
+
+class ReplayTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.association = Association(
+            name="NOHA", tournament_listing_url="https://example.com/t/List.aspx"
+        )
+        self.recordings = replay.Recordings.for_association(
+            self.association, directory.name
+        )
+
+    def record(self):
+        session = replay.RecordingSession(
+            self.recordings, FakeSession(LISTING_FORM, NOHA_LISTING)
+        )
+        return NOHA.fetch(session, self.association)
+
+    def test_fetch_replays_recording(self):
+        recorded = self.record()
+
+        self.assertEqual(
+            recorded,
+            NOHA.fetch(replay.ReplaySession(self.recordings), self.association),
+        )
+
+    def test_scan_replays_recording(self):
+        recorded = self.record()
+
+        browser = replay.ReplayBrowser(self.recordings)
+        browser.load_url(self.association.tournament_listing_url)
+
+        self.assertEqual(recorded, NOHA.scan(browser, self.association))
+
+    def test_missing_recording(self):
+        with self.assertRaises(replay.MissingRecording):
+            NOHA.fetch(replay.ReplaySession(self.recordings), self.association)
+
+
+class TournamentSearchTests(TestCase):
+    def setUp(self):
+        self.association = Association.objects.create(name="test")
+        self.spring = self.create("Spring Classic", "Toronto", "OMHA-2022-001")
+        self.fall = self.create("Fall Frenzy", "Barrie", "OMHA-2022-002")
+
+    def create(self, name, location, sanction_number, divisions="U11, U13"):
+        return Tournament.objects.create(
+            association=self.association,
+            name=name,
+            location=location,
+            sanction_number=sanction_number,
+            divisions=divisions,
+            start_date=timezone.now().date(),
+        )
+
+    def search(self, query):
+        return list(Tournament.objects.search(query).order_by("-search_rank", "pk"))
+
+    def test_search_matches_every_word_as_a_prefix(self):
+        self.assertEqual([self.spring], self.search("spr class"))
+        self.assertEqual([self.fall], self.search("barrie"))
+        self.assertEqual([], self.search("spring barrie"))
+
+    def test_search_matches_sanction_numbers(self):
+        self.assertEqual([self.fall], self.search("OMHA-2022-002"))
+
+    def test_search_follows_updates_deletes_and_bulk_inserts(self):
+        Tournament.objects.filter(pk=self.fall.pk).update(name="Winter Classic")
+        self.spring.delete()
+        Tournament.objects.bulk_create(
+            [
+                Tournament(
+                    association=self.association,
+                    name="Summer Classic",
+                    location="Ottawa",
+                    start_date=timezone.now().date(),
+                )
+            ]
+        )
+
+        self.assertCountEqual(
+            ["Winter Classic", "Summer Classic"],
+            [tournament.name for tournament in self.search("classic")],
+        )
+
+    def test_empty_search_returns_everything(self):
+        self.assertEqual(2, len(self.search(" - ")))
+
+    def test_search_matches_association_names(self):
+        winter = Tournament.objects.create(
+            association=Association.objects.create(name="Classic Hockey"),
+            name="Winter Cup",
+            location="Ottawa",
+            start_date=timezone.now().date(),
+        )
+
+        self.assertEqual([winter], self.search("classic hock"))
+        # Matches on the tournament itself rank first.
+        self.assertEqual([self.spring, winter], self.search("classic"))
+
+    def test_admin_search_uses_search(self):
+        model_admin = TournamentAdmin(Tournament, admin.site)
+
+        queryset, may_have_duplicates = model_admin.get_search_results(
+            None, Tournament.objects.all(), "frenzy"
+        )
+
+        self.assertEqual([self.fall], list(queryset))
+        self.assertIs(False, may_have_duplicates)
+
+    def test_admin_orders_searches_by_rank(self):
+        model_admin = TournamentAdmin(Tournament, admin.site)
+        spring_classic = self.create(
+            "Spring Cup Classic Invitational Weekend", "Ottawa", "OMHA-2022-003"
+        )
+        request_factory = RequestFactory()
+
+        def changelist(**params):
+            request = request_factory.get("/", params)
+            request.user = User.objects.create_superuser(
+                email=f"admin{len(params)}@domain.com", password="12345"
+            )
+            return list(model_admin.get_changelist_instance(request).queryset)
+
+        self.assertEqual([self.spring, spring_classic], changelist(q="spring classic"))
+        # Sorted on the name column.
+        self.assertEqual(
+            [spring_classic, self.spring], changelist(q="spring classic", o="-3")
+        )
+
+
+class TournamentViewsTests(QueryBudgetMixin, TestCase):
     def setUp(self) -> None:
         self.user = User.objects.create_user(email="test@domain.com", password="12345")
         self.client.force_login(self.user)
@@ -84,6 +756,87 @@ class TournamentViewsTests(TestCase):
         tournament = Tournament.objects.first()
         self.assertEqual(tourn_name, tournament.name)
 
+    def post_new_tournament(self, name, **extra):
+        data = {
+            "name": name,
+            "sanction_number": "",
+            "location": "North Bay",
+            "start_date": timezone.now().date().strftime("%Y-%m-%d"),
+            "end_date": "",
+            "association": self.association.pk,
+            "website": "",
+            **extra,
+        }
+        return self.client.post(reverse("events:tournament-new"), data=data)
+
+    def post_new_tournament_redirected(self, name, **extra):
+        # NOTE: Remove once travelpermits app is in place
+        with mock.patch("django.contrib.messages.info") as info:
+            with self.assertRaisesMessage(
+                NoReverseMatch, "'travelpermits' is not a registered namespace"
+            ):
+                self.post_new_tournament(name, **extra)
+        return info
+
+    def test_tournament_creation_lists_likely_duplicates(self):
+        existing = Tournament.objects.create(
+            association=self.association,
+            name="Spring Classic U11",
+            location="North Bay",
+            start_date=timezone.now().date(),
+        )
+
+        resp = self.post_new_tournament("Spring Classic U13")
+
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual([existing], resp.context["duplicates"])
+        self.assertEqual([existing], list(Tournament.objects.all()))
+
+    def test_tournament_creation_uses_the_picked_duplicate(self):
+        existing = Tournament.objects.create(
+            association=self.association,
+            name="North Bay Spring Classic",
+            location="North Bay",
+            start_date=timezone.now().date(),
+            sanction_number="N-1",
+        )
+
+        info = self.post_new_tournament_redirected(
+            "The Annual North Bay Spring Classic", duplicate=existing.pk
+        )
+
+        self.assertEqual([existing], list(Tournament.objects.all()))
+        info.assert_called_once()
+        self.assertIn('"North Bay Spring Classic"', info.call_args.args[1])
+
+    def test_tournament_creation_confirmed_as_new(self):
+        Tournament.objects.create(
+            association=self.association,
+            name="Spring Classic U11",
+            location="North Bay",
+            start_date=timezone.now().date(),
+        )
+
+        info = self.post_new_tournament_redirected(
+            "Spring Classic U13", duplicate="new"
+        )
+
+        self.assertEqual(2, Tournament.objects.count())
+        info.assert_not_called()
+
+    def test_tournament_creation_without_likely_duplicate(self):
+        Tournament.objects.create(
+            association=self.association,
+            name="Sudbury Blizzard Cup",
+            location="Sudbury",
+            start_date=timezone.now().date(),
+        )
+
+        info = self.post_new_tournament_redirected("North Bay Spring Classic")
+
+        self.assertEqual(2, Tournament.objects.count())
+        info.assert_not_called()
+
     def test_tournament_listing(self):
 
         Tournament.objects.create(
@@ -97,10 +850,202 @@ class TournamentViewsTests(TestCase):
 
         self.assertEqual(200, resp.status_code)
 
-        self.assertContains(resp, b"test tournament name", 1)
+        resp = self.client.get(reverse("events:tournaments-list-data"))
+
+        self.assertEqual(200, resp.status_code)
+
+        self.assertEqual(
+            ["test tournament name"], [row["name"] for row in resp.json()["data"]]
+        )
+
+    def create_tournaments(self, count, **kwargs):
+        start = timezone.now().date()
+        for number in range(count):
+            Tournament.objects.create(
+                association=self.association,
+                name=f"tournament {number}",
+                location="",
+                start_date=start + timezone.timedelta(days=number // 2),
+                **kwargs,
+            )
+
+    def get_data(self, **params):
+        resp = self.client.get(reverse("events:tournaments-list-data"), params)
+        self.assertEqual(200, resp.status_code)
+        return resp.json()
+
+    def test_tournament_listing_data_keyset_pages_cover_every_row_once(self):
+        self.create_tournaments(7)
+
+        names = []
+        data = self.get_data(length=3)
+        names += [row["name"] for row in data["data"]]
+        while data["next"]:
+            data = self.get_data(length=3, after=data["next"])
+            names += [row["name"] for row in data["data"]]
+
+        self.assertEqual([f"tournament {number}" for number in range(7)], names)
+
+    def test_tournament_listing_data_keyset_matches_offset_when_descending(self):
+        self.create_tournaments(6)
+        params = {"length": 2, "order[0][column]": 1, "order[0][dir]": "desc"}
+
+        first = self.get_data(**params)
+        by_cursor = self.get_data(after=first["next"], **params)
+        by_offset = self.get_data(start=2, **params)
+
+        self.assertEqual(
+            ["tournament 5", "tournament 4"], [row["name"] for row in first["data"]]
+        )
+        self.assertEqual(by_offset["data"], by_cursor["data"])
+
+    def test_tournament_listing_data_search_and_counts(self):
+        self.create_tournaments(3)
+        Tournament.objects.create(
+            association=self.association,
+            name="Spring Classic",
+            location="",
+            start_date=timezone.now().date(),
+        )
+
+        data = self.get_data(**{"search[value]": "classic", "draw": 4})
 
+        self.assertEqual(4, data["draw"])
+        self.assertEqual(4, data["recordsTotal"])
+        self.assertEqual(1, data["recordsFiltered"])
+        self.assertEqual(["Spring Classic"], [row["name"] for row in data["data"]])
 
-class ExhibitionViewsTests(TestCase):
+    def test_tournament_listing_data_search_ordered_by_rank(self):
+        for name in ["Classic Cup", "Classic Classic", "Classic"]:
+            Tournament.objects.create(
+                association=self.association,
+                name=name,
+                location="",
+                start_date=timezone.now().date(),
+            )
+        ranked = [
+            tournament.name
+            for tournament in Tournament.objects.search("classic").order_by(
+                "-search_rank", "-pk"
+            )
+        ]
+
+        data = self.get_data(**{"search[value]": "classic", "length": 2})
+        self.assertEqual(ranked[:2], [row["name"] for row in data["data"]])
+        data = self.get_data(
+            **{"search[value]": "classic", "length": 2, "after": data["next"]}
+        )
+        self.assertEqual(ranked[2:], [row["name"] for row in data["data"]])
+
+        data = self.get_data(**{"search[value]": "classic", "order[0][column]": 1})
+        self.assertEqual(
+            ["Classic", "Classic Classic", "Classic Cup"],
+            [row["name"] for row in data["data"]],
+        )
+
+    def test_tournament_listing_data_start_date_range(self):
+        self.create_tournaments(6)
+        start = timezone.now().date()
+
+        data = self.get_data(
+            start_date_from=(start + timezone.timedelta(days=1)).isoformat(),
+            start_date_to=(start + timezone.timedelta(days=1)).isoformat(),
+        )
+
+        self.assertEqual(
+            ["tournament 2", "tournament 3"], [row["name"] for row in data["data"]]
+        )
+
+    def test_tournament_listing_data_rejects_invalid_parameters(self):
+        url = reverse("events:tournaments-list-data")
+        for params in [
+            {"order[0][column]": 99},
+            {"start_date_from": "tomorrow"},
+            {"after": "not a cursor"},
+            {"length": "all"},
+        ]:
+            with self.subTest(params=params):
+                self.assertEqual(400, self.client.get(url, params).status_code)
+
+    def test_tournament_listing_queries_do_not_grow_with_tournaments(self):
+        def add_tournaments():
+            for number in range(5):
+                Tournament.objects.create(
+                    association=Association.objects.create(name=f"other {number}"),
+                    name=f"test tournament {number}",
+                    location="",
+                    start_date=timezone.now().date(),
+                )
+
+        self.assertConstantQueries(
+            lambda: self.client.get(reverse("events:tournaments-list-data")),
+            add_tournaments,
+        )
+
+
+class TournamentMergeViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="staff@domain.com", password="12345", is_staff=True
+        )
+        self.client.force_login(self.user)
+
+        association = Association.objects.create(name="NOHA")
+        self.keep, self.merge = [
+            Tournament.objects.create(
+                association=association,
+                name="North Bay Spring Classic",
+                location="North Bay",
+                start_date=timezone.now().date(),
+                sanction_number=sanction_number,
+            )
+            for sanction_number in ["N-1", ""]
+        ]
+        self.url = reverse("events:tournament-merge", args=[self.keep.pk])
+
+    def test_staff_only(self):
+        self.user.is_staff = False
+        self.user.save()
+
+        response = self.client.post(
+            self.url,
+            {"keep_tournament_id": self.keep.pk, "merge_tournament_id": self.merge.pk},
+        )
+
+        self.assertEqual(302, response.status_code)
+        self.assertTrue(Tournament.objects.filter(pk=self.merge.pk).exists())
+
+    def test_merge(self):
+        response = self.client.post(
+            self.url,
+            {"keep_tournament_id": self.keep.pk, "merge_tournament_id": self.merge.pk},
+        )
+
+        self.assertRedirects(
+            response,
+            reverse("events:tournament-details", args=[self.keep.pk]),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual([self.keep], list(Tournament.objects.all()))
+
+    def test_merge_requires_two_duplicates(self):
+        other = Tournament.objects.create(
+            association=self.keep.association,
+            name="Sudbury Blizzard Cup",
+            location="Sudbury",
+            start_date=self.keep.start_date,
+        )
+
+        for merge_id in [self.keep.pk, other.pk, "x"]:
+            self.client.post(
+                self.url,
+                {"keep_tournament_id": self.keep.pk, "merge_tournament_id": merge_id},
+            )
+
+        self.assertEqual(3, Tournament.objects.count())
+
+
+class ExhibitionViewsTests(QueryBudgetMixin, TestCase):
     def setUp(self) -> None:
         self.user = User.objects.create_user(email="test@domain.com", password="12345")
         self.client.force_login(self.user)
@@ -113,3 +1058,21 @@ class ExhibitionViewsTests(TestCase):
         resp = self.client.get(reverse("events:exhibitions-list"))
 
         self.assertEqual(200, resp.status_code)
+
+    def test_exhibition_listing_queries_do_not_grow_with_exhibitions(self):
+        def add_exhibitions():
+            for number in range(5):
+                Exhibition.objects.create(
+                    other_team=f"other team {number}",
+                    other_team_association=self.association,
+                    destination="Toronto",
+                    rink=Rink.objects.create(
+                        name=f"rink {number}", city="Toronto", province="Ontario"
+                    ),
+                    start_date=timezone.now() + timezone.timedelta(days=1),
+                )
+
+        self.assertConstantQueries(
+            lambda: self.client.get(reverse("events:exhibitions-list-data")),
+            add_exhibitions,
+        )
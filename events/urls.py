@@ -10,6 +10,12 @@ urlpatterns = [
         {"event_type": "tournament"},
         name="tournaments-list",
     ),
+    path(
+        "tournaments/data/",
+        views.event_list_data,
+        {"event_type": "tournament"},
+        name="tournaments-list-data",
+    ),
     path(
         "tournaments/new/",
         views.event_new,
@@ -32,12 +38,23 @@ urlpatterns = [
         views.tournament_edit,
         name="tournament-edit",
     ),
+    path(
+        "tournaments/<int:event_id>/merge/",
+        views.tournament_merge,
+        name="tournament-merge",
+    ),
     path(
         "exhibitions/",
         views.event_list,
         {"event_type": "exhibition"},
         name="exhibitions-list",
     ),
+    path(
+        "exhibitions/data/",
+        views.event_list_data,
+        {"event_type": "exhibition"},
+        name="exhibitions-list-data",
+    ),
     path(
         "exhibitions/new/",
         views.event_new,
@@ -1,5 +1,7 @@
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.shortcuts import (
     HttpResponse,
     HttpResponseRedirect,
@@ -8,35 +10,32 @@ from django.shortcuts import (
     render,
     resolve_url,
 )
-from django.utils import timezone
 
 from core.utils import redirect_next
+from events import dedup
 from events.forms import NewExhibitionForm, NewTournamentForm
+from events.listing import EventListing
 from events.models import Exhibition, Tournament
 from team.helpers import add_selected_team
 
 
 @login_required
 def event_list(request, event_type="tournament"):
-    """Lists all events (Tournament or Exhibition) depending on event_type value."""
+    """Lists all events (Tournament or Exhibition) depending on event_type value.
 
-    events = Tournament.objects.select_related("association")
-    if event_type.lower() == "exhibition":
-        events = Exhibition.objects.select_related("other_team_association", "rink")
+    Only renders the table, its rows are loaded from event_list_data.
+    """
+    return render(request, "events/events.html", {"event_type": event_type.lower()})
 
-    events = events.filter(start_date__gte=timezone.now())
-    # .prefetch_related(
-    #    "travelpermit_set"
-    # )
 
-    return render(
-        request,
-        "events/events.html",
-        {
-            "event_type": event_type,
-            "events": events.order_by("start_date"),
-        },
-    )
+@login_required
+def event_list_data(request, event_type="tournament"):
+    """Returns a page of event_list rows as JSON, see events.listing.EventListing."""
+    try:
+        page = EventListing(event_type.lower(), request.GET).page()
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(page)
 
 
 @login_required
@@ -47,6 +46,8 @@ def event_new(request, event_type):
     if event_type == "exhibition":
         form = NewExhibitionForm(request.POST or None)
 
+    duplicates = []
+
     if request.method == "POST":
 
         if form.is_valid():
@@ -56,6 +57,7 @@ def event_new(request, event_type):
 
             save_event = True
             tourns = None
+            reused = None
 
             if isinstance(instance, Tournament):
 
@@ -70,21 +72,52 @@ def event_new(request, event_type):
 
                     save_event = not tourns.exists()
 
-            if save_event:
-                instance.save()
-
-            elif tourns and tourns.exists():
-                instance = tourns.first()
-
-            else:
-                messages.error(request, "System Error Occurred. Contact the office.")
+                if save_event and instance.association.name != "OTHER":
+                    # The same tournament may have been entered with another or
+                    # no sanction number, the user picks it or confirms theirs
+                    # is new.
+                    duplicates = [
+                        duplicate for _, duplicate in dedup.duplicates_of(instance)
+                    ]
+                    choice = request.POST.get("duplicate")
+                    if choice == "new":
+                        duplicates = []
+                    elif choice:
+                        chosen = [
+                            duplicate
+                            for duplicate in duplicates
+                            if str(duplicate.pk) == choice
+                        ]
+                        if chosen:
+                            tourns = Tournament.objects.filter(pk=chosen[0].pk)
+                            duplicates = []
+                            save_event = False
+
+            # Otherwise the likely duplicates are listed along with the form.
+            if not duplicates:
+                if save_event:
+                    instance.save()
+
+                elif tourns and tourns.exists():
+                    instance = reused = tourns.first()
+
+                else:
+                    messages.error(
+                        request, "System Error Occurred. Contact the office."
+                    )
 
-            if not len(messages.get_messages(request=request)):
-                # return redirect(f'events:{event_type}-details', event_id=instance.id)
-                return redirect(
-                    f"travelpermits:permit-new-{event_type}",
-                    event_id=instance.id,
-                )
+                if not len(messages.get_messages(request=request)):
+                    if reused:
+                        messages.info(
+                            request,
+                            f'"{reused.name}" starting {reused.start_date} '
+                            "already exists, it is used instead of adding it again.",
+                        )
+                    # return redirect(f'events:{event_type}-details', event_id=instance.id)
+                    return redirect(
+                        f"travelpermits:permit-new-{event_type}",
+                        event_id=instance.id,
+                    )
 
     return render(
         request,
@@ -92,6 +125,7 @@ def event_new(request, event_type):
         {
             "event_type": event_type,
             "form": form,
+            "duplicates": duplicates,
         },
     )
 
@@ -236,3 +270,38 @@ def exhibition_edit(request, event_id):
             "editing": True,
         },
     )
+
+
+@staff_member_required
+def tournament_merge(request, event_id):
+    """Merges a tournament with one of its likely duplicates, see events.dedup."""
+
+    tournament = get_object_or_404(Tournament, pk=event_id)
+
+    needs_merging = {tournament.pk: tournament}
+    for score, duplicate in dedup.duplicates_of(tournament):
+        needs_merging[duplicate.pk] = duplicate
+
+    if request.method == "POST":
+        try:
+            keep = needs_merging[int(request.POST.get("keep_tournament_id", 0))]
+            merge = needs_merging[int(request.POST.get("merge_tournament_id", 0))]
+        except (KeyError, ValueError):
+            keep = merge = None
+
+        if keep is None or keep == merge:
+            messages.error(request, "Select two different tournaments to merge.")
+        else:
+            merged_id = merge.pk
+            dedup.merge_tournaments(keep, merge)
+            messages.success(request, f"Tournament {merged_id} merged into {keep.pk}.")
+            return redirect("events:tournament-details", event_id=keep.pk)
+
+    return render(
+        request,
+        "events/event-merge.html",
+        {
+            "tournament": tournament,
+            "needs_merging": needs_merging,
+        },
+    )
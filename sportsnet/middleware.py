@@ -0,0 +1,182 @@
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from loguru import logger
+
+try:
+    import sentry_sdk
+except ImportError:  # pragma: no cover
+    sentry_sdk = None
+
+# Literals left in the SQL by raw() queries and expressions, and the
+# placeholder lists of __in lookups, which vary in length with their values.
+_literal_re = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_placeholder_list_re = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+
+
+def fingerprint(sql):
+    """Returns a short hash of sql that is the same for every execution of a
+    query, whichever values it is run with."""
+    sql = _literal_re.sub("?", sql)
+    sql = _placeholder_list_re.sub("(...)", sql)
+    return hashlib.sha1(sql.encode()).hexdigest()[:12]
+
+
+class RequestMetrics:
+    """Counts and times every query executed on any database while a request
+    is handled, see query_metrics_middleware()."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.fingerprints = Counter()
+        self.start = time.perf_counter()
+        self.wall_time = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def finish(self):
+        self.wall_time = time.perf_counter() - self.start
+
+    @property
+    def duplicates(self):
+        """{fingerprint: executions} of the queries executed more than once."""
+        return {key: count for key, count in self.fingerprints.items() if count > 1}
+
+
+def _percentile(values, percent):
+    """Nearest rank percentile of a sorted list."""
+    return values[max(0, math.ceil(len(values) * percent / 100) - 1)]
+
+
+class MetricsAggregate:
+    """The last requests of each URL name handled by this process.
+
+    Every worker process keeps its own aggregate, it is lost on restart.
+    """
+
+    def __init__(self, window=500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+
+    def add(self, url_name, metrics):
+        with self._lock:
+            self._samples[url_name].append(
+                (metrics.wall_time, metrics.queries, metrics.db_time)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        """Returns {url name: statistics} ordered by the slowest p95 first.
+
+        Times are in milliseconds.
+        """
+        with self._lock:
+            samples = {key: list(values) for key, values in self._samples.items()}
+
+        summary = {}
+        for url_name, values in samples.items():
+            stats = {"requests": len(values)}
+            for index, name in enumerate(["wall_ms", "queries", "db_ms"]):
+                column = sorted(value[index] for value in values)
+                if name.endswith("_ms"):
+                    column = [round(value * 1000, 2) for value in column]
+                stats[name] = {
+                    "p50": _percentile(column, 50),
+                    "p95": _percentile(column, 95),
+                    "max": column[-1],
+                }
+            summary[url_name] = stats
+
+        return dict(
+            sorted(summary.items(), key=lambda item: -item[1]["wall_ms"]["p95"])
+        )
+
+
+aggregate = MetricsAggregate(getattr(settings, "QUERY_METRICS_WINDOW", 500))
+
+
+def _url_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<unresolved>"
+    return match.view_name or match._func_path
+
+
+def _report(request, response, url_name, metrics):
+    if settings.DEBUG:
+        response["X-DB-Query-Count"] = str(metrics.queries)
+        response["X-DB-Time-ms"] = f"{metrics.db_time * 1000:.2f}"
+        response["X-DB-Duplicate-Queries"] = str(
+            sum(count - 1 for count in metrics.duplicates.values())
+        )
+        response["X-Response-Time-ms"] = f"{metrics.wall_time * 1000:.2f}"
+
+    if getattr(settings, "QUERY_METRICS_LOG", False):
+        logger.bind(
+            url_name=url_name,
+            queries=metrics.queries,
+            db_ms=round(metrics.db_time * 1000, 2),
+            wall_ms=round(metrics.wall_time * 1000, 2),
+            duplicates=metrics.duplicates,
+        ).info(
+            f"{request.method} {url_name} {response.status_code}: "
+            f"{metrics.queries} queries in {metrics.db_time * 1000:.1f}ms, "
+            f"{metrics.wall_time * 1000:.1f}ms total"
+        )
+
+    if sentry_sdk is not None:
+        span = sentry_sdk.get_current_span()
+        if span is not None:
+            span.set_data("db.query_count", metrics.queries)
+            span.set_data("db.duplicate_queries", len(metrics.duplicates))
+            span.set_data("db.time_ms", round(metrics.db_time * 1000, 2))
+
+
+def query_metrics_middleware(get_response):
+    """Records the number of queries, database time, duplicate queries and
+    wall time of every request.
+
+    The numbers are added to response headers when DEBUG is on, kept in a
+    per URL name aggregate shown by sportsnet.views.query_metrics, logged
+    with loguru when QUERY_METRICS_LOG is on and attached to the current
+    sentry span when sentry_sdk is installed.
+
+    Turned off by setting QUERY_METRICS_ENABLED to False.
+    """
+
+    def middleware(request):
+        if not getattr(settings, "QUERY_METRICS_ENABLED", True):
+            return get_response(request)
+
+        metrics = RequestMetrics()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = get_response(request)
+        metrics.finish()
+
+        url_name = _url_name(request)
+        aggregate.add(url_name, metrics)
+        _report(request, response, url_name, metrics)
+        return response
+
+    return middleware
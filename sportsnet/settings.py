@@ -59,16 +59,24 @@ if env.bool("DJANGO_LOAD_EXTRA_EXTENSIONS", False):  # pragma: no cover
     )
 
 MIDDLEWARE = [
+    "sportsnet.middleware.query_metrics_middleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.permission_matrix_cache_middleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# See sportsnet.middleware.query_metrics_middleware
+QUERY_METRICS_ENABLED = env.bool("QUERY_METRICS_ENABLED", True)
+QUERY_METRICS_LOG = env.bool("QUERY_METRICS_LOG", False)
+# Requests kept per URL name for the p50/p95 at admin/query-metrics/
+QUERY_METRICS_WINDOW = env.int("QUERY_METRICS_WINDOW", 500)
+
 AUTHENTICATION_BACKENDS = [
     "sportsnet.auth_backend.LoginRequiresStaffTypeWebAccessTrueBackend",
     # "django.contrib.auth.backends.ModelBackend",
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .middleware import RequestMetrics, aggregate, fingerprint
+
+User = get_user_model()
+
+
+class QueryMetricsTests(TestCase):
+    def setUp(self):
+        aggregate.clear()
+        self.user = User.objects.create_user(
+            email="staff@domain.com", password="12345", is_staff=True
+        )
+        self.client.force_login(self.user)
+
+    def test_fingerprint_ignores_values(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "team" WHERE "id" IN (%s, %s)'),
+            fingerprint('SELECT * FROM "team" WHERE "id" IN (%s, %s, %s)'),
+        )
+        self.assertEqual(
+            fingerprint("SELECT * FROM team WHERE name = 'a' LIMIT 1"),
+            fingerprint("SELECT * FROM team WHERE name = 'b' LIMIT 21"),
+        )
+        self.assertNotEqual(
+            fingerprint("SELECT * FROM team"), fingerprint("SELECT * FROM player")
+        )
+
+    def test_duplicates_counts_repeated_queries_only(self):
+        metrics = RequestMetrics()
+        metrics.fingerprints.update(["a", "a", "a", "b"])
+        self.assertEqual({"a": 3}, metrics.duplicates)
+
+    @override_settings(DEBUG=True)
+    def test_headers_added_in_debug(self):
+        response = self.client.get(reverse("query-metrics"))
+        self.assertGreater(int(response["X-DB-Query-Count"]), 0)
+        self.assertIn("X-DB-Time-ms", response)
+        self.assertIn("X-DB-Duplicate-Queries", response)
+        self.assertIn("X-Response-Time-ms", response)
+
+    def test_headers_not_added_without_debug(self):
+        response = self.client.get(reverse("query-metrics"))
+        self.assertNotIn("X-DB-Query-Count", response)
+
+    def test_endpoint_aggregates_by_url_name(self):
+        for _ in range(3):
+            self.client.get(reverse("query-metrics"))
+
+        stats = self.client.get(reverse("query-metrics")).json()["query-metrics"]
+        self.assertEqual(3, stats["requests"])
+        self.assertEqual({"p50", "p95", "max"}, set(stats["queries"]))
+
+    def test_endpoint_clears_on_delete(self):
+        self.client.get(reverse("query-metrics"))
+        self.assertEqual({}, self.client.delete(reverse("query-metrics")).json())
+
+    def test_endpoint_requires_staff(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get(reverse("query-metrics"))
+        self.assertEqual(302, response.status_code)
+
+    @override_settings(QUERY_METRICS_ENABLED=False)
+    def test_disabled(self):
+        self.client.get(reverse("query-metrics"))
+        self.assertEqual({}, aggregate.summary())
@@ -0,0 +1,15 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from .middleware import aggregate
+
+
+@staff_member_required
+@require_http_methods(["GET", "DELETE"])
+def query_metrics(request):
+    """Returns the request statistics of this process per URL name, see
+    sportsnet.middleware.query_metrics_middleware. DELETE clears them."""
+    if request.method == "DELETE":
+        aggregate.clear()
+    return JsonResponse(aggregate.summary())
@@ -1,13 +1,38 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.db.models import Exists, Q
 from django.shortcuts import get_object_or_404, redirect
+from django.utils import timezone
+from django.utils.translation import gettext
 
+from core.hierarchy import covers
 
-def permissable_teams(user, season=None):
-    from core.models import Season
-    from team.models import Staff
+TEAM_CHANGED_FLAGS = ("players_has_changed_flag", "staff_has_changed_flag")
+
+_deferred_team_flags = ContextVar("deferred_team_flags", default=None)
+
+
+def permissable_teams(user, season=None, ids_only=False):
+    """Returns every team the user is assigned to, directly or through a
+    League, Division or SubDivision assignment, as a lazy QuerySet.
+
+    Args:
+        user: User or Staff object.
+        season: Season to limit staff assignments to, defaults to the current season.
+        ids_only: Return a values_list of Team ids instead of Team objects.
+
+    Returns:
+        QuerySet
+    """
+    from core.models import PermissionOverrides, Season
+    from team.models import Staff, Team
 
     if isinstance(user, Staff):
         user = user.user
@@ -15,34 +40,103 @@ def permissable_teams(user, season=None):
     if season is None:
         season = Season.get_current()
 
-    def get_staff_teams(staff):
-        teams = set()
-        qs = None
-        if staff.team_id:
-            teams.add(staff.team)
-        elif staff.subdivision_id:
-            qs = staff.subdivision.teams.all()
-        elif staff.division_id:
-            qs = staff.division.teams.all()
-        elif staff.league_id:
-            qs = staff.league.teams.all()
-        else:
-            qs = staff.season.teams.all()
-
-        if qs:
-            for team in qs:
-                teams.add(team)
-        return teams
-
-    users_teams = set()
-
-    for staff in user.staff_assignments.filter(season=season):
-        users_teams.update(get_staff_teams(staff))
-
-    for staff in user.overridden_permissions.all():
-        users_teams.update(get_staff_teams(staff))
-
-    return users_teams
+    scope = covers(Team)
+    staff = Staff.objects.filter(scope, user=user, season=season)
+    overrides = PermissionOverrides.objects.filter(scope, user=user)
+
+    teams = Team.objects.filter(Q(Exists(staff)) | Q(Exists(overrides)))
+
+    if ids_only:
+        return teams.values_list("pk", flat=True)
+    return teams
+
+
+def _team_flag_values(flag_name):
+    values = {flag_name: True}
+    if not getattr(settings, "INSERTED_UPDATED_SKIP_DEFAULTS", False):
+        values["updated"] = timezone.now()
+    return values
+
+
+def mark_team_changed(team, flag_name):
+    """Sets one of the team changed flags without going through Team.save().
+
+    The flag is written with a single UPDATE, or when called inside
+    defer_team_changed_flags(), collected and written when the block exits.
+
+    Args:
+        team: Team object, the in-memory object is updated as well.
+        flag_name: players_has_changed_flag or staff_has_changed_flag
+    """
+    if flag_name not in TEAM_CHANGED_FLAGS:
+        raise ValueError(
+            gettext("%(flag_name)s is not a valid team flag") % {"flag_name": flag_name}
+        )
+
+    values = _team_flag_values(flag_name)
+    for name, value in values.items():
+        setattr(team, name, value)
+    team._remember_values(values)
+
+    mark_team_ids_changed([team.pk], flag_name)
+
+
+def mark_team_ids_changed(team_ids, flag_name):
+    """Same as mark_team_changed() for teams that are not loaded.
+
+    Args:
+        team_ids: Iterable of Team ids.
+        flag_name: players_has_changed_flag or staff_has_changed_flag
+    """
+    from team.models import Team
+
+    if flag_name not in TEAM_CHANGED_FLAGS:
+        raise ValueError(
+            gettext("%(flag_name)s is not a valid team flag") % {"flag_name": flag_name}
+        )
+
+    team_ids = set(team_ids)
+    if not team_ids:
+        return
+
+    pending = _deferred_team_flags.get()
+    if pending is not None:
+        pending[flag_name].update(team_ids)
+    else:
+        Team.objects.filter(pk__in=team_ids).update(**_team_flag_values(flag_name))
+
+
+@contextmanager
+def defer_team_changed_flags(using=None):
+    """Collects the teams marked by Player and Staff saves inside the block
+    and writes their flags with one UPDATE per flag before the transaction
+    commits.
+
+    Nested blocks join the outermost one.
+
+    Usage:
+        with defer_team_changed_flags():
+            for player in roster:
+                player.save()
+    """
+    from team.models import Team
+
+    if _deferred_team_flags.get() is not None:
+        yield
+        return
+
+    pending = defaultdict(set)
+    token = _deferred_team_flags.set(pending)
+    try:
+        with transaction.atomic(using=using):
+            yield
+
+            for flag_name, team_ids in pending.items():
+                Team.objects.filter(pk__in=team_ids).update(
+                    **_team_flag_values(flag_name)
+                )
+    finally:
+        _deferred_team_flags.reset(token)
 
 
 def add_selected_team(func):
@@ -0,0 +1,74 @@
+import csv
+import json
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from team.models import Player
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates players in bulk from a CSV or JSON Lines file of Player field values"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path)
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="Defaults to the file extension.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def read_rows(self, path, file_format):
+        with path.open(newline="", encoding="utf-8") as fo:
+            if file_format == "csv":
+                yield from csv.DictReader(fo)
+            else:
+                for line in fo:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def clean_row(self, row, fields):
+        """Converts raw values to the Player field types, blanks are left out
+        so the import applies the defaults."""
+        cleaned = {}
+        for key, value in row.items():
+            if value in ("", None):
+                continue
+            if key not in fields:
+                raise CommandError(f"{key} is not a Player field")
+            field = fields[key]
+            cleaned[field.attname] = field.to_python(value)
+        return cleaned
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        if file_format not in ("csv", "jsonl"):
+            raise CommandError(f"Unable to determine the format of {path}")
+
+        # Columns may be named by field name or attname, team or team_id.
+        fields = {}
+        for field in Player._meta.concrete_fields:
+            fields[field.name] = fields[field.attname] = field
+
+        rows = []
+        for line_number, row in enumerate(self.read_rows(path, file_format), 1):
+            try:
+                rows.append(self.clean_row(row, fields))
+            except ValidationError as e:
+                raise CommandError(f"Row {line_number}: {e}")
+
+        created, conflicts = Player.objects.bulk_import(
+            rows, batch_size=options["batch_size"]
+        )
+
+        for conflict in conflicts:
+            self.stderr.write(
+                f"Row {conflict['row'] + 1} {conflict['data']}: {conflict['reason']}"
+            )
+
+        self.stdout.write(f"Created {len(created)} players, {len(conflicts)} skipped.")
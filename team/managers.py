@@ -1,7 +1,21 @@
-from django.db import models
-from django.db.models import Q
+from django.db import IntegrityError, models, transaction
 from django.utils.translation import gettext, gettext_lazy
 
+from core import hierarchy
+from core.managers import PositionedQuerySet
+from core.perms import filter_permitted
+
+from .helpers import mark_team_ids_changed
+
+
+class TeamObjectsManager(models.Manager):
+    pass
+
+
+class TeamManagerCustomQuerySet(PositionedQuerySet):
+    def permitted_for(self, user, permission_name):
+        return filter_permitted(self, user, permission_name)
+
 
 class StaffObjectsManagerWithDetails(models.Manager):
     def head_coach(self, *args, **kwargs):
@@ -10,71 +24,26 @@ class StaffObjectsManagerWithDetails(models.Manager):
         raise TypeError(gettext_lazy("head_coach is available on the Team instance."))
 
     def own(self, *args, **kwargs):
-        instance_type = self.instance.__class__.__name__
-        extras = {}
-        if instance_type == "Season":
-            extras = {
-                "league_id__isnull": True,
-                "division_id__isnull": True,
-                "subdivision_id__isnull": True,
-                "team_id__isnull": True,
-            }
-        elif instance_type == "League":
-            extras = {
-                "division_id__isnull": True,
-                "subdivision_id__isnull": True,
-                "team_id__isnull": True,
-            }
-        elif instance_type == "Division":
-            extras = {
-                "subdivision_id__isnull": True,
-                "team_id__isnull": True,
-            }
-        elif instance_type == "SubDivision":
-            extras = {
-                "team_id__isnull": True,
-            }
-        return self.filter(*args, **extras, **kwargs)
+        level = self.instance._meta.model_name
+        if level in hierarchy.HIERARCHY_LEVELS:
+            args += (hierarchy.assigned_at(level),)
+        return self.filter(*args, **kwargs)
 
     def vps(self):
         if self.instance.__class__.__name__ == "Season":
-            return self.filter(
-                division_id__isnull=True,
-                subdivision_id__isnull=True,
-                team_id__isnull=True,
-            ).exclude(league_id__isnull=True)
+            return self.filter(hierarchy.assigned_at("league"))
         raise TypeError(gettext("vps is available on the Season instance."))
 
     def senior_convenors(self):
-        if self.instance.__class__.__name__ == "Season":
-            return self.filter(
-                subdivision_id__isnull=True,
-                team_id__isnull=True,
-            ).exclude(Q(league_id__isnull=True) | Q(division_id__isnull=True))
-        elif self.instance.__class__.__name__ == "League":
-            return self.filter(
-                subdivision_id__isnull=True,
-                team_id__isnull=True,
-            ).exclude(Q(league_id__isnull=True) | Q(division_id__isnull=True))
+        if self.instance.__class__.__name__ in ["Season", "League"]:
+            return self.filter(hierarchy.assigned_at("division"))
         raise TypeError(
             gettext("senior_convenors is available on the Season or League instance.")
         )
 
     def convenors(self):
-        if self.instance.__class__.__name__ == "Season":
-            return self.filter(team_id__isnull=True).exclude(
-                Q(league_id__isnull=True)
-                | Q(division_id__isnull=True)
-                | Q(subdivision_id__isnull=True)
-            )
-        elif self.instance.__class__.__name__ == "League":
-            return self.filter(team_id__isnull=True).exclude(
-                Q(division_id__isnull=True) | Q(subdivision_id__isnull=True)
-            )
-        elif self.instance.__class__.__name__ == "Division":
-            return self.filter(team_id__isnull=True).exclude(
-                subdivision_id__isnull=True,
-            )
+        if self.instance.__class__.__name__ in ["Season", "League", "Division"]:
+            return self.filter(hierarchy.assigned_at("subdivision"))
         raise TypeError(
             gettext(
                 "convenors is available on the Season, League, or Division instance."
@@ -125,6 +94,219 @@ class PlayerObjectsManager(models.Manager):
     def affiliates(self):
         return self.filter(affiliate=True)
 
+    def _team_members(self, team_ids):
+        """Returns {(team_id, member_id)} of the players of the teams."""
+        return set(
+            self.filter(team_id__in=team_ids).values_list("team_id", "member_id")
+        )
+
+    def bulk_import(self, rows, batch_size=1000, user=None):
+        """Creates many players at once without going through Player.save().
+
+        Each row is a dict of Player field values keyed by attname, team_id,
+        member_id and position_id are required. type_id, status_id and
+        status_reason_id fall back to their defaults the same way save() does,
+        the season, league, division and subdivision are copied from the team.
+
+        Rows that cannot be created, including those that would break
+        player_team_member_uniqueness, are reported instead of raising. That
+        includes players inserted by someone else while the rows are imported.
+
+        Args:
+            rows: Iterable of dicts.
+            batch_size: Number of rows per INSERT.
+            user: Stored as inserted_by and updated_by.
+
+        Returns:
+            (created, conflicts) where created is the list of new Player objects
+            and conflicts is a list of {"row": index, "data": row, "reason": str}
+        """
+        from core.models import Member
+
+        from .models import (
+            PlayerPosition,
+            PlayerStatus,
+            PlayerStatusLog,
+            PlayerStatusReason,
+            PlayerType,
+            Team,
+        )
+
+        rows = list(rows)
+
+        teams = Team.objects.only(
+            "season_id", "league_id", "division_id", "subdivision_id"
+        ).in_bulk({row.get("team_id") for row in rows} - {None})
+        member_ids = set(
+            Member.objects.filter(
+                pk__in={row.get("member_id") for row in rows} - {None}
+            ).values_list("pk", flat=True)
+        )
+        position_ids = set(PlayerPosition.objects.values_list("pk", flat=True))
+        type_ids = set(PlayerType.objects.values_list("pk", flat=True))
+        default_type_id = getattr(PlayerType.get_default(), "pk", None)
+
+        # {status_id: causes the team flag}, statuses are a short list.
+        statuses = PlayerStatus.objects.in_bulk()
+        status_flags = {
+            pk: status.change_causes_player_flag_on_team_to_enable
+            for pk, status in statuses.items()
+        }
+        default_reasons = {
+            pk: getattr(status.default_reason(), "pk", None)
+            for pk, status in statuses.items()
+        }
+        default_status_id = getattr(PlayerStatus.get_default(), "pk", None)
+        reason_statuses = dict(
+            PlayerStatusReason.objects.values_list("pk", "status_id")
+        )
+
+        taken = self._team_members(teams)
+
+        players = []
+        indexes = []
+        conflicts = []
+
+        def conflict(index, row, reason):
+            conflicts.append({"row": index, "data": row, "reason": reason})
+
+        for index, row in enumerate(rows):
+            team = teams.get(row.get("team_id"))
+            if team is None:
+                conflict(index, row, gettext("Team does not exist."))
+                continue
+
+            if row.get("member_id") not in member_ids:
+                conflict(index, row, gettext("Member does not exist."))
+                continue
+
+            if (team.pk, row["member_id"]) in taken:
+                conflict(
+                    index, row, gettext("Member is already a player on this team.")
+                )
+                continue
+
+            if row.get("position_id") not in position_ids:
+                conflict(index, row, gettext("Player Position does not exist."))
+                continue
+
+            type_id = row.get("type_id") or default_type_id
+            if type_id not in type_ids:
+                conflict(index, row, gettext("Player Type does not exist."))
+                continue
+
+            status_id = row.get("status_id") or default_status_id
+            if status_id not in status_flags:
+                conflict(index, row, gettext("Player Status does not exist."))
+                continue
+
+            status_reason_id = row.get("status_reason_id") or default_reasons.get(
+                status_id
+            )
+            if status_reason_id is None:
+                conflict(
+                    index, row, gettext("Player Status does not have a default reason.")
+                )
+                continue
+
+            if reason_statuses.get(status_reason_id) != status_id:
+                conflict(
+                    index,
+                    row,
+                    gettext(
+                        "Player Status Reason is not a reason of the Player Status."
+                    ),
+                )
+                continue
+
+            taken.add((team.pk, row["member_id"]))
+
+            indexes.append((index, row))
+            players.append(
+                self.model(
+                    **{
+                        **row,
+                        "season_id": team.season_id,
+                        "league_id": team.league_id,
+                        "division_id": team.division_id,
+                        "subdivision_id": team.subdivision_id,
+                        "type_id": type_id,
+                        "status_id": status_id,
+                        "status_reason_id": status_reason_id,
+                        "inserted_by": user,
+                        "updated_by": user,
+                    }
+                )
+            )
+
+        with transaction.atomic(using=self.db):
+            created = []
+            for start in range(0, len(players), batch_size):
+                end = start + batch_size
+                batch = list(zip(indexes[start:end], players[start:end]))
+                while batch:
+                    try:
+                        with transaction.atomic(using=self.db):
+                            created += self.bulk_create([player for _, player in batch])
+                        break
+                    except IntegrityError:
+                        # Players added since taken was read, by another
+                        # import running at the same time, are reported as
+                        # conflicts and the rest of the batch is inserted again.
+                        taken = self._team_members(
+                            {player.team_id for _, player in batch}
+                        )
+                        remaining = []
+                        for (index, row), player in batch:
+                            if (player.team_id, player.member_id) in taken:
+                                conflict(
+                                    index,
+                                    row,
+                                    gettext("Member is already a player on this team."),
+                                )
+                            else:
+                                remaining.append(((index, row), player))
+                        if len(remaining) == len(batch):
+                            raise
+                        batch = remaining
+            conflicts.sort(key=lambda conflict: conflict["row"])
+
+            # Backends that cannot return ids from a bulk insert.
+            if created and created[0].pk is None:
+                ids = {
+                    (team_id, member_id): pk
+                    for pk, team_id, member_id in self.filter(
+                        team_id__in={player.team_id for player in created}
+                    ).values_list("pk", "team_id", "member_id")
+                }
+                for player in created:
+                    player.pk = ids[(player.team_id, player.member_id)]
+
+            PlayerStatusLog.objects.using(self.db).bulk_create(
+                [
+                    PlayerStatusLog(
+                        player_id=player.pk,
+                        new_status_id=player.status_id,
+                        new_status_reason_id=player.status_reason_id,
+                        inserted_by=user,
+                        updated_by=user,
+                    )
+                    for player in created
+                ],
+                batch_size=batch_size,
+            )
+
+            mark_team_ids_changed(
+                {
+                    player.team_id
+                    for player in created
+                    if status_flags[player.status_id]
+                },
+                "players_has_changed_flag",
+            )
+
+        return created, conflicts
+
 
 class PlayerManagerCustomQuerySet(models.QuerySet):
     pass
@@ -4,13 +4,25 @@ from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy
 from positions.fields import PositionField
 
-from core.model_helpers import _BaseModel, _BaseModelWithCommonIDs, _BasePermissions
+from core import hierarchy
+from core.model_helpers import (
+    _BaseModel,
+    _BaseModelWithCommonIDs,
+    _BasePermissions,
+    _DefaultLookupMixin,
+    _StatusWithReasonsMixin,
+)
 from core.perms import add_override_permission, has_perm
 
 from . import managers
+from .helpers import mark_team_changed
 
 
 class Team(_BaseModelWithCommonIDs):
+    objects = managers.TeamObjectsManager.from_queryset(
+        managers.TeamManagerCustomQuerySet
+    )()
+
     season = models.ForeignKey(
         "core.Season", on_delete=models.PROTECT, related_name="teams"
     )
@@ -78,35 +90,40 @@ class Team(_BaseModelWithCommonIDs):
 
     def save(self, *args, **kwargs):
 
+        # Fields changed here on top of what the caller changed.
+        changed_fields = set()
+
         if not self.pk and self.subdivision_id:
-            self.season = self.subdivision.season
-            self.league = self.subdivision.league
-            self.division = self.subdivision.division
+            hierarchy.place_under(self, self.subdivision)
 
         # Reset status_reason on status change.
         if self.pk:
-            original_instance = Team.objects.get(pk=self.pk)
+            original = self.get_original_values("status_id", "status_reason_id")
 
-            if self.status_id != original_instance.status_id:
+            if self.status_id != original["status_id"]:
 
                 if any([self.staff_has_changed_flag, self.players_has_changed_flag]):
 
                     if self.status.clear_changed_staff_players_flag:
                         self.players_has_changed_flag = False
                         self.staff_has_changed_flag = False
+                        changed_fields.update(
+                            ["players_has_changed_flag", "staff_has_changed_flag"]
+                        )
 
                 # status has changed, now we need to ensure the
                 # status_reason is a reason of the newly assigned status.
-                if not self.status.reasons.filter(pk=self.status_reason.pk).exists():
+                if not self.status.reasons.filter(pk=self.status_reason_id).exists():
                     self.status_reason = None
+                    changed_fields.add("status_reason")
 
-            if (self.status_id != original_instance.status_id) or (
-                self.status_reason_id != original_instance.status_reason_id
+            if (self.status_id != original["status_id"]) or (
+                self.status_reason_id != original["status_reason_id"]
             ):
                 TeamStatusLog.objects.create(
                     team=self,
-                    old_status=original_instance.status,
-                    old_status_reason=original_instance.status_reason,
+                    old_status_id=original["status_id"],
+                    old_status_reason_id=original["status_reason_id"],
                     new_status=self.status,
                     new_status_reason=self.status_reason,
                 )
@@ -114,15 +131,16 @@ class Team(_BaseModelWithCommonIDs):
         # On new objects or those without a status_reason,
         # assign the default reason for the specific status.
         if not self.status_reason_id or (not self.status_reason_id and not self.pk):
-            try:
-                self.status_reason = self.status.reasons.get(default=True)
-            except TeamStatusReason.DoesNotExist:
-                self.status_reason = None
+            self.status_reason = self.status.default_reason()
+            changed_fields.add("status_reason")
+
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = set(kwargs["update_fields"]) | changed_fields
 
         return super().save(*args, **kwargs)
 
 
-class TeamStatus(_BaseModel):
+class TeamStatus(_StatusWithReasonsMixin, _BaseModel):
     class Meta:
         ordering = ["weight"]
         verbose_name = gettext_lazy("Team Status")
@@ -355,28 +373,15 @@ class Staff(_BaseModel):
     def save(self, *args, **kwargs):
 
         if not self.pk:
-            if self.team_id:
-                self.season = self.team.season
-                self.league = self.team.league
-                self.division = self.team.division
-                self.subdivision = self.team.subdivision
-
-            elif self.subdivision_id:
-                self.season = self.subdivision.season
-                self.league = self.subdivision.league
-                self.division = self.subdivision.division
-
-            elif self.division_id:
-                self.season = self.division.season
-                self.league = self.division.league
-
-            elif self.league_id:
-                self.season = self.league.season
+            # The narrowest level assigned fills in the ones above it.
+            for level in reversed(hierarchy.SCOPE_LEVELS):
+                if getattr(self, f"{level}_id"):
+                    hierarchy.place_under(self, getattr(self, level))
+                    break
 
         # TODO: Add same same to Player model whenever that is in place.
         if self.team_id and self.type.change_causes_staff_flag_on_team_to_enable:
-            self.team.staff_has_changed_flag = True
-            self.team.save()
+            mark_team_changed(self.team, "staff_has_changed_flag")
 
         return super().save(*args, **kwargs)
 
@@ -406,7 +411,7 @@ class PlayerPosition(_BaseModel):
     defence = models.BooleanField(default=False)
 
 
-class PlayerType(_BaseModel):
+class PlayerType(_DefaultLookupMixin, _BaseModel):
     class Meta:
         ordering = ["weight"]
         verbose_name = gettext_lazy("Player Type")
@@ -429,7 +434,7 @@ class PlayerType(_BaseModel):
         return super().save(*args, **kwargs)
 
 
-class PlayerStatus(_BaseModel):
+class PlayerStatus(_DefaultLookupMixin, _StatusWithReasonsMixin, _BaseModel):
     class Meta:
         ordering = ["weight"]
         verbose_name = gettext_lazy("Player Status")
@@ -595,35 +600,34 @@ class Player(_BaseModelWithCommonIDs):
 
     def save(self, *args, **kwargs):
 
+        # Fields changed here on top of what the caller changed.
+        changed_fields = set()
+
         if not self.pk and self.team_id:
-            self.season = self.team.season
-            self.league = self.team.league
-            self.division = self.team.division
-            self.subdivision = self.team.subdivision
+            hierarchy.place_under(self, self.team)
 
         # Reset status_reason on status change.
         if self.pk:
-            original_instance = Player.objects.get(pk=self.pk)
+            original = self.get_original_values("status_id", "status_reason_id")
 
-            if self.status_id != original_instance.status_id:
+            if self.status_id != original["status_id"]:
 
                 # status has changed, now we need to ensure the
                 # status_reason is a reason of the newly assigned status.
                 if not self.status.reasons.filter(pk=self.status_reason_id).exists():
                     self.status_reason = None
+                    changed_fields.add("status_reason")
 
             if not self.status_reason_id:
-                try:
-                    self.status_reason = self.status.reasons.get(default=True)
-                except PlayerStatusReason.DoesNotExist:
-                    self.status_reason = None
+                self.status_reason = self.status.default_reason()
+                changed_fields.add("status_reason")
 
-            if (self.status_id != original_instance.status_id) or (
-                self.status_reason_id != original_instance.status_reason_id
+            if (self.status_id != original["status_id"]) or (
+                self.status_reason_id != original["status_reason_id"]
             ):
                 self.status_log.create(
-                    old_status_id=original_instance.status_id,
-                    old_status_reason_id=original_instance.status_reason_id,
+                    old_status_id=original["status_id"],
+                    old_status_reason_id=original["status_reason_id"],
                     new_status_id=self.status_id,
                     new_status_reason_id=self.status_reason_id,
                 )
@@ -632,15 +636,14 @@ class Player(_BaseModelWithCommonIDs):
             # On new objects or those without a status_reason,
             # assign the default reason for the specific status.
             if not self.status_reason_id or (not self.status_reason_id and not self.pk):
-                try:
-                    self.status_reason = self.status.reasons.get(default=True)
-                except PlayerStatusReason.DoesNotExist:
-                    self.status_reason = None
+                self.status_reason = self.status.default_reason()
 
         # TODO: Does any change to a player cause this to become true?
         if self.status.change_causes_player_flag_on_team_to_enable:
-            self.team.players_has_changed_flag = True
-            self.team.save()
+            mark_team_changed(self.team, "players_has_changed_flag")
+
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = set(kwargs["update_fields"]) | changed_fields
 
         return super().save(*args, **kwargs)
 
@@ -1,3 +1,5 @@
+from unittest import mock
+
 from django.db.utils import IntegrityError
 from django.test import TestCase
 from django.utils import timezone
@@ -14,7 +16,7 @@ from core.models import (
     User,
 )
 from core.perms import add_override_permission
-from core.test_helpers import FixtureBasedTestCase
+from core.test_helpers import FixtureBasedTestCase, query_budget
 
 from . import helpers
 from .models import (
@@ -165,6 +167,28 @@ class StaffAccessTests(FixtureBasedTestCase):
         self.assertIs(True, team1.can_access(team1_coach))
         self.assertIs(False, team2.can_access(team1_coach))
 
+    def test_permitted_for_matches_can_edit(self):
+        team1 = Team.objects.first()
+        convenor = team1.subdivision.staff.own().first()
+
+        expected = [team for team in Team.objects.all() if team.can_edit(convenor)]
+
+        self.assertEqual(
+            sorted(team.pk for team in expected),
+            sorted(
+                Team.objects.permitted_for(convenor, "team_can_edit").values_list(
+                    "pk", flat=True
+                )
+            ),
+        )
+
+    def test_permitted_for_raises_valueerror_on_invalid_permission_name(self):
+        team1_coach = Team.objects.first().staff.first()
+
+        self.assertRaises(
+            ValueError, Team.objects.permitted_for, team1_coach, "invalid_name"
+        )
+
     def test_helper_permissiable_teams_for_coach(self):
         season = Season.get_current()
         team1 = Team.objects.filter(season=season).first()
@@ -249,6 +273,29 @@ class StaffAccessTests(FixtureBasedTestCase):
         self.assertIn(team1, allowed_teams)
         self.assertIn(team2, allowed_teams)
 
+    def test_helper_permissiable_teams_is_a_single_query(self):
+        season = Season.objects.first()
+        admin = season.staff.own().first()
+        user = admin.user
+
+        with self.assertNumQueries(1):
+            allowed_teams = list(helpers.permissable_teams(user, season))
+
+        self.assertEqual(season.teams.count(), len(allowed_teams))
+
+    def test_helper_permissiable_teams_ids_only(self):
+        season = Season.objects.first()
+        team1 = season.teams.first()
+
+        allowed_ids = helpers.permissable_teams(
+            team1.subdivision.staff.own().first(), season, ids_only=True
+        )
+
+        self.assertEqual(
+            sorted(team1.subdivision.teams.values_list("pk", flat=True)),
+            sorted(allowed_ids),
+        )
+
 
 class StaffAccessExtraPermissionsTests(FixtureBasedTestCase):
     def test_coach1_with_extra_permissions_stafftype_can_edit_team2(self):
@@ -552,11 +599,16 @@ class TeamSignalsTests(TestCase):
         self.create_staff(team=self.team)
 
         self.team.staff_has_changed_flag = False
-        self.team.save()
+        # Only the update, the season the position is kept in is compared
+        # with the value the team was loaded with instead of selected again.
+        with query_budget(1):
+            self.team.save()
 
         staff = self.team.staff.first()
         staff.first_name = "test"
-        staff.save()
+        # Load the type, flag the team and update.
+        with query_budget(3):
+            staff.save()
 
         self.assertIs(True, self.team.staff_has_changed_flag)
 
@@ -584,9 +636,32 @@ class TeamSignalsTests(TestCase):
 
         self.assertIs(False, self.team.staff_has_changed_flag)
 
+    def test_staff_changes_write_team_staff_changed_flag_to_database(self):
+        self.create_staff(team=self.team)
+
+        self.assertIs(True, Team.objects.get(pk=self.team.pk).staff_has_changed_flag)
+
+    def test_deferred_team_changed_flags_are_written_when_block_exits(self):
+        with helpers.defer_team_changed_flags():
+            self.create_staff(team=self.team)
+            self.team.staff.first().save()
+
+            self.assertIs(True, self.team.staff_has_changed_flag)
+            self.assertIs(
+                False, Team.objects.get(pk=self.team.pk).staff_has_changed_flag
+            )
+
+        self.assertIs(True, Team.objects.get(pk=self.team.pk).staff_has_changed_flag)
+
+    def test_mark_team_changed_raises_valueerror_on_invalid_flag(self):
+        with self.assertRaises(ValueError):
+            helpers.mark_team_changed(self.team, "name")
+
     def test_change_team_status_reason_set_to_none_if_reason_is_not_assigned(self):
         self.team.status = TeamStatus.objects.create(name="new status")
-        self.team.save()
+        # Check the reason, log, find the default reason and update.
+        with query_budget(4):
+            self.team.save()
 
         self.assertIsNone(self.team.status_reason)
 
@@ -633,6 +708,43 @@ class TeamSignalsTests(TestCase):
 
         self.assertIsNone(team.status_reason)
 
+    def test_team_original_values_are_known_without_a_query(self):
+        team = Team.objects.get(pk=self.team.pk)
+        team.status = self.team_status_clear_flag_true
+
+        with self.assertNumQueries(0):
+            original = team.get_original_values("status_id", "status_reason_id")
+
+        self.assertEqual(self.team_status_approved.pk, original["status_id"])
+        self.assertEqual(
+            self.team_status_approved_reason.pk, original["status_reason_id"]
+        )
+        self.assertEqual(
+            {"status_id": self.team_status_approved.pk}, team.get_dirty_fields()
+        )
+
+    def test_team_original_values_follow_saves(self):
+        team_status = TeamStatus.objects.create(name="REJECTED")
+
+        self.team.status = team_status
+        self.team.save()
+        self.team.name = "Team 1 renamed"
+        self.team.save()
+
+        # Only the status change is logged, not the later save.
+        self.assertEqual(1, TeamStatusLog.objects.count())
+        self.assertEqual({}, self.team.get_dirty_fields())
+
+    def test_team_save_with_update_fields_includes_reset_status_reason(self):
+        team_status = TeamStatus.objects.create(name="REJECTED")
+
+        self.team.status = team_status
+        self.team.save(update_fields=["status"])
+
+        self.team.refresh_from_db()
+        self.assertEqual(team_status, self.team.status)
+        self.assertIsNone(self.team.status_reason)
+
 
 class StaffManagerTests(FixtureBasedTestCase):
     def test_staff_objects_head_coach_raises_on_all_but_team_model(self):
@@ -1059,13 +1171,16 @@ class PlayerTests(FixtureBasedTestCase):
 
         team = Team.objects.first()
 
-        player = Player.objects.create(
-            team=team,
-            member=member,
-            status=status,
-            position=pos,
-            type=ptype,
-        )
+        # Find the default reason, flag the team and insert, the hierarchy
+        # ids are copied from the team without loading its ancestors.
+        with query_budget(3):
+            player = Player.objects.create(
+                team=team,
+                member=member,
+                status=status,
+                position=pos,
+                type=ptype,
+            )
         self.assertIs(True, player.team.players_has_changed_flag)
 
     def test_adding_player_without_flag_changing_status_keeps_team_player_changed_flag_setting_as_false(
@@ -1092,6 +1207,110 @@ class PlayerTests(FixtureBasedTestCase):
         )
         self.assertIs(False, player.team.players_has_changed_flag)
 
+    def test_bulk_import_resolves_hierarchy_and_defaults(self):
+        members = Member.objects.all()[:2]
+        status = PlayerStatus.objects.filter(
+            reasons__default=True, change_causes_player_flag_on_team_to_enable=True
+        ).first()
+        pos = PlayerPosition.objects.first()
+        ptype = PlayerType.objects.first()
+
+        team = Team.objects.first()
+
+        created, conflicts = Player.objects.bulk_import(
+            [
+                {
+                    "team_id": team.pk,
+                    "member_id": member.pk,
+                    "position_id": pos.pk,
+                    "type_id": ptype.pk,
+                    "status_id": status.pk,
+                }
+                for member in members
+            ]
+        )
+
+        self.assertEqual([], conflicts)
+        self.assertEqual(2, team.players.count())
+        self.assertEqual(2, team.subdivision.players.count())
+        self.assertEqual(2, PlayerStatusLog.objects.filter(player__team=team).count())
+
+        player = created[0]
+        self.assertEqual(team.season_id, player.season_id)
+        self.assertEqual(status.reasons.get(default=True).pk, player.status_reason_id)
+        self.assertIs(True, Team.objects.get(pk=team.pk).players_has_changed_flag)
+
+    def test_bulk_import_reports_team_member_conflicts(self):
+        member = Member.objects.first()
+        status = PlayerStatus.objects.filter(reasons__default=True).first()
+        pos = PlayerPosition.objects.first()
+        ptype = PlayerType.objects.first()
+
+        team = Team.objects.first()
+
+        row = {
+            "team_id": team.pk,
+            "member_id": member.pk,
+            "position_id": pos.pk,
+            "type_id": ptype.pk,
+            "status_id": status.pk,
+        }
+
+        created, conflicts = Player.objects.bulk_import([row, row])
+        self.assertEqual(1, len(created))
+        self.assertEqual([1], [conflict["row"] for conflict in conflicts])
+
+        created, conflicts = Player.objects.bulk_import([row, {**row, "team_id": 0}])
+        self.assertEqual([], created)
+        self.assertEqual([0, 1], [conflict["row"] for conflict in conflicts])
+        self.assertEqual(1, team.players.count())
+
+    def test_bulk_import_reports_players_added_while_importing(self):
+        first, second, third = Member.objects.all()[:3]
+        status = PlayerStatus.objects.filter(reasons__default=True).first()
+        pos = PlayerPosition.objects.first()
+        ptype = PlayerType.objects.first()
+
+        team = Team.objects.first()
+
+        rows = [
+            {
+                "team_id": team.pk,
+                "member_id": member.pk,
+                "position_id": pos.pk,
+                "type_id": ptype.pk,
+                "status_id": status.pk,
+            }
+            for member in (first, second, third)
+        ]
+
+        # Another import adds a player each time the team's players have been
+        # read, outside of the savepoint the batch is inserted in. The third
+        # one collides while the batch is retried.
+        meanwhile = [first, third]
+        team_members = Player.objects._team_members
+
+        def add_player_after_reading(team_ids):
+            taken = team_members(team_ids)
+            if meanwhile:
+                Player.objects.create(
+                    team=team,
+                    member=meanwhile.pop(0),
+                    status=status,
+                    position=pos,
+                    type=ptype,
+                )
+            return taken
+
+        with mock.patch.object(
+            Player.objects, "_team_members", side_effect=add_player_after_reading
+        ):
+            created, conflicts = Player.objects.bulk_import(rows)
+
+        self.assertEqual([second.pk], [player.member_id for player in created])
+        self.assertEqual([0, 2], [conflict["row"] for conflict in conflicts])
+        self.assertEqual(3, team.players.count())
+
     def test_editing_player_status_changes_reason(self):
         member = Member.objects.first()
         status = PlayerStatus.objects.filter(reasons__default=True).first()